@@ -1,5 +1,7 @@
 from ortools.math_opt.python import mathopt
 
+from progress import ProgressSink, as_progress
+
 # EXERCISES:
 # 1. Terminate the column generation procedure if the improvement in the last x iterations is under a tolerance. 
 # 2. Use the packing obtained with the first-fit-decreasing procedure as in initial packing for column generation.
@@ -35,7 +37,8 @@ def first_fit_decreasing( capacity:int, items:list[int] ) -> list[list[int]]:
 
     return bins
 
-def column_generation_binpacking( capacity:int, items:list[int], initial_packings:list[list[int]]= None, solver_type:mathopt.SolverType= mathopt.SolverType.HIGHS ) -> list[list[int]]:
+def column_generation_binpacking( capacity:int, items:list[int], initial_packings:list[list[int]]= None, solver_type:mathopt.SolverType= mathopt.SolverType.HIGHS,
+                                  progress:ProgressSink= None ) -> list[list[int]]:
     """
     Solves the given instance for the **Bin Packing Problem** with **column generation**
     with **OR-Tools MathOpt**.
@@ -50,6 +53,8 @@ def column_generation_binpacking( capacity:int, items:list[int], initial_packing
         Initial packings (columns) to start with. Optional.
     solver_type: mathopt.SolverType
         The underlying solver to use (HIGHS, Gurobi).
+    progress: ProgressSink
+        Progress sink receiving 'iteration', 'objective', 'reduced_cost' per iteration (optional, default: console table, see progress).
 
     Returns
     -------
@@ -61,6 +66,7 @@ def column_generation_binpacking( capacity:int, items:list[int], initial_packing
     # INIT
     n = len(items)
     N = range(n)
+    progress = as_progress( progress )
 
     # initial columns
     initial_columns = [ [ int(i==j) for j in N ] for i in N ] if not initial_packings else initial_packings
@@ -94,6 +100,9 @@ def column_generation_binpacking( capacity:int, items:list[int], initial_packing
         # solve subproblem (pricing problem)
         sub_objval, column = solve_knapsack_mip( dual_values, items, capacity, binary= True )
 
+        # update progress
+        progress.report( iteration= iter, objective= master_objval, reduced_cost= sub_objval )
+
         # add new pattern to the problem, if any
         if sub_objval <= 1 + 1e-6:
             break
@@ -104,9 +113,8 @@ def column_generation_binpacking( capacity:int, items:list[int], initial_packing
         model.objective.add_linear( x_new )
         x.append( x_new )
 
-        # update progress bar
-        print( f'[Column Generation] Iteration: {iter:3d} | Objective value: {master_objval:8.4f} | Reduced cost: {sub_objval:.4f}' )
-    
+    progress.close()
+
     # retrieve integer solution
     for var in x:
         var.integer = True
@@ -0,0 +1,146 @@
+import json
+
+# Pool of cuts for branch-and-cut separators.
+#
+# A cut is identified by a subset (e.g., a node subset of a subtour-elimination constraint, or a job subset of a parallel inequality),
+# and the separator knows how to build its constraint and how to compute its violation for a solution.
+# The pool is keyed by the canonical form of the subsets (sorted tuples), hence duplicates are filtered.
+# Before running an expensive separation, the separator re-checks the pooled cuts (which is cheap),
+# and it separates only if none of them is violated. The age of a cut is the number of re-checks since it was last violated.
+# The pool can be saved to a JSON file, and loaded for the next solve of the same instance.
+
+class CutPool:
+    """
+    Pool of cuts given by subsets, with violation and age statistics.
+
+    Args
+    ----
+    max_age: int
+        Cuts not violated in this many re-checks are dropped (optional).
+    """
+    def __init__( self, max_age:int= None ):
+        self.max_age:int = max_age
+        self.entries:dict[tuple,dict] = {} # canonical subset -> statistics
+
+        self.nadded:int = 0      # number of new cuts
+        self.nduplicates:int = 0 # number of filtered duplicates
+        self.nhits:int = 0       # number of violated cuts found by re-checks
+
+    def __len__( self ) -> int:
+        return len(self.entries)
+
+    def __contains__( self, subset ) -> bool:
+        return _canonical( subset ) in self.entries
+
+    def add( self, subset, violation:float ) -> bool:
+        """
+        Adds a cut with its violation, and returns whether it is new (the statistics of a duplicate are updated).
+        """
+        key = _canonical( subset )
+        entry = self.entries.get( key )
+
+        if entry is not None:
+            entry['count'] += 1
+            entry['age'] = 0
+            entry['max_violation'] = max( entry['max_violation'], violation )
+            self.nduplicates += 1
+            return False
+
+        self.entries[key] = { 'count' : 1, 'age' : 0, 'max_violation' : violation }
+        self.nadded += 1
+        return True
+
+    def violated( self, violation, min_violation:float, max_cuts:int= None ) -> list[tuple[tuple,float]]:
+        """
+        Re-checks the pooled cuts, and returns the violated ones.
+
+        Args
+        ----
+        violation: callable
+            Violation of a cut (given by its subset) for the current solution.
+        min_violation: float
+            Minimum violation of the returned cuts.
+        max_cuts: int
+            Maximum number of returned cuts (optional).
+
+        Returns
+        -------
+        : list[tuple[tuple,float]]
+            Subsets (as sorted tuples) with their violations, in non-increasing order of violation.
+        """
+        cuts = []
+
+        for (key,entry) in list( self.entries.items() ):
+            value = violation( key )
+
+            if min_violation < value:
+                entry['count'] += 1
+                entry['age'] = 0
+                entry['max_violation'] = max( entry['max_violation'], value )
+                cuts.append( ( key, value ) )
+            else:
+                entry['age'] += 1
+
+                if self.max_age is not None and self.max_age < entry['age']:
+                    del self.entries[key]
+
+        cuts.sort( key= lambda cut : cut[1], reverse= True )
+
+        if max_cuts is not None:
+            cuts = cuts[:max_cuts]
+
+        self.nhits += len(cuts)
+
+        return cuts
+
+    def statistics( self ) -> dict:
+        """
+        Returns the statistics of the pool.
+        """
+        return { 'size' : len(self.entries),
+                 'added' : self.nadded,
+                 'duplicates' : self.nduplicates,
+                 'hits' : self.nhits,
+                 'max_age' : max( ( entry['age'] for entry in self.entries.values() ), default= 0 ),
+                 'max_violation' : max( ( entry['max_violation'] for entry in self.entries.values() ), default= 0.0 ) }
+
+    def save( self, path:str ) -> None:
+        """
+        Writes the cuts (with their statistics) to a JSON file.
+        """
+        with open( path, 'w' ) as file:
+            json.dump( { 'max_age' : self.max_age,
+                         'cuts' : [ { 'subset' : list(key), **entry } for (key,entry) in self.entries.items() ] }, file )
+
+    @staticmethod
+    def load( path:str ) -> 'CutPool':
+        """
+        Reads the cuts (with their statistics) from a JSON file written by save.
+        """
+        with open( path ) as file:
+            data = json.load( file )
+
+        pool = CutPool( data['max_age'] )
+
+        for cut in data['cuts']:
+            subset = cut.pop( 'subset' )
+            pool.entries[_canonical( _to_tuple( item ) for item in subset )] = cut
+
+        return pool
+
+def _canonical( subset ) -> tuple:
+    """
+    Returns the canonical form of a subset: its items as a sorted tuple.
+    """
+    items = list( subset )
+
+    try:
+        return tuple( sorted( items ) )
+    except TypeError: # mixed types
+        return tuple( sorted( items, key= repr ) )
+
+def _to_tuple( item ):
+    """
+    Converts the lists of JSON back to tuples (e.g., for nodes labelled by tuples).
+    """
+    return tuple( _to_tuple( value ) for value in item ) if isinstance( item, list ) else item
@@ -4,6 +4,8 @@ import itertools as it
 
 from time import perf_counter
 
+from progress import ProgressSink, as_progress
+
 # EXERCISES
 # 1.1 Implement a solution procedure for the subproblems which is also efficient for larger instances.
 
@@ -149,7 +151,8 @@ def solve_subproblem_by_enumeration( processing_times:list[int], setup_times:lis
 
     return best_makespan, best_sequence
 
-def solve_upmsp_with_lbbd( proc_times:list[list[int]], setup_times:list[list[list[int]]], solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP ):
+def solve_upmsp_with_lbbd( proc_times:list[list[int]], setup_times:list[list[list[int]]], solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP,
+                           progress:ProgressSink= None ):
     """
     Solves the given instance for the Unrelated Parallel Machine Scheduling Problem (UPMSP) with machine- and sequence-dependent setup times
     with a **Logic-Based Benders Decomposition (LBBD)** based on:
@@ -167,10 +170,14 @@ def solve_upmsp_with_lbbd( proc_times:list[list[int]], setup_times:list[list[lis
         where setup_times[i][n][k] refers to the case when job k is the first job to be processed on machine i.
     solver_type: mathopt.SolverType
         The underlying solver to use (e.g., GSCIP, HIGHS, GUROBI).
+    progress: ProgressSink
+        Progress sink receiving 'iteration', 'status', 'time', 'total_time', 'makespan' (of the master problem),
+        'infeasible' (number of machines with violated makespan) per iteration (optional, default: console table, see progress).
     """
     # INIT
     m = len(proc_times)
     n = len(proc_times[0])
+    progress = as_progress( progress )
 
     JOBS = range(n)
     EXTENDED_JOBS = range(n+1) # EXTENDED_JOBS[n] (or EXTENDED_JOBS[-1]) refers to the dummy job
@@ -223,22 +230,20 @@ def solve_upmsp_with_lbbd( proc_times:list[list[int]], setup_times:list[list[lis
     # SOLVE PROBLEM
     opt_start = perf_counter()
     for iter in range(1,1000):
-        print( f'iteration: {iter}' )
-
         # SOLVE MASTER PROBLEM
         iter_start = perf_counter()
         result = mathopt.solve( model, solver_type= solver_type )
         iter_end = perf_counter()
-        print( f'  status: {result.termination.reason.name} | time: {iter_end-iter_start:.2f} (total: {iter_end-opt_start:.2f})')
 
         if result.termination.reason != mathopt.TerminationReason.OPTIMAL:
+            progress.report( force= True, iteration= iter, status= result.termination.reason.name, time= iter_end-iter_start, total_time= iter_end-opt_start, makespan= None, infeasible= None )
             break
 
         master_makespan = int(round(result.objective_value()))
-        print( f'  makespan: {master_makespan}' )
 
         # SOLVE SUBPROBLEMS
         are_subproblems_feasible = True
+        ninfeasible = 0
 
         for i in MACHINES:
             # solve subproblem
@@ -249,19 +254,23 @@ def solve_upmsp_with_lbbd( proc_times:list[list[int]], setup_times:list[list[lis
             # check feasibility
             feasible = machine_makespan <= master_makespan
 
-            print( f'  [{"FEAS" if feasible else "INF "}] machine {i} | makespan: {machine_makespan} | jobs: {" -> ".join( map( str, machine_sequence ) )} ' )
-
             if feasible:
                 continue
 
             are_subproblems_feasible = False
+            ninfeasible += 1
 
             # add Benders cut
             model.add_linear_constraint( Cmax >= machine_makespan - sum( (1 - x[i][j]) * (proc_times[i][j] + max( setup_times[i][k][j] for k in assigned_jobs )) for j in assigned_jobs ) )
 
+        progress.report( force= are_subproblems_feasible, iteration= iter, status= result.termination.reason.name, time= iter_end-iter_start, total_time= iter_end-opt_start,
+                         makespan= master_makespan, infeasible= ninfeasible )
+
         if are_subproblems_feasible:
             break
 
+    progress.close()
+
 if __name__ == '__main__':
     from scheduling_instances import random_upmsp_instance
 
@@ -0,0 +1,151 @@
+import json
+import time
+
+# Progress sinks for iterative solvers.
+#
+# Solvers report a record (keyword arguments) per iteration, and the sink decides what to do with it:
+# NullProgress drops it, ConsoleProgress prints it as a table row, MemoryProgress stores it, JsonlProgress writes it to a file.
+# Records can be sampled: only every k-th record is kept, and at most one record per 'interval' seconds
+# (forced records, e.g., new best solutions, are always kept, and the last skipped record is kept on close).
+
+class ProgressSink:
+    """
+    Base class of progress sinks.
+
+    Args
+    ----
+    every: int
+        Only every k-th record is kept.
+    interval: float
+        Minimum time between kept records in seconds.
+    """
+    def __init__( self, every:int= 1, interval:float= 0.0 ):
+        self.every:int = every
+        self.interval:float = interval
+
+        self._start:float = time.perf_counter()
+        self._last:float = -float('inf')
+        self._count:int = 0
+        self._pending:dict = None
+
+    def report( self, force:bool= False, **record ) -> None:
+        """
+        Reports a record (e.g., iteration= 10, best= 123.4). Forced records are never skipped.
+        """
+        self._count += 1
+        now = time.perf_counter()
+
+        if not force and ( self._count % self.every != 0 or now - self._last < self.interval ):
+            self._pending = record
+            return
+
+        self._pending = None
+        self._last = now
+        self.emit( record, now - self._start )
+
+    def emit( self, record:dict, elapsed:float ) -> None:
+        """
+        Handles a kept record (reported 'elapsed' seconds after the creation of the sink).
+        """
+        raise NotImplementedError
+
+    def close( self ) -> None:
+        """
+        Flushes the last skipped record.
+        """
+        if self._pending is not None:
+            self.emit( self._pending, time.perf_counter() - self._start )
+            self._pending = None
+
+    def __enter__( self ) -> 'ProgressSink':
+        return self
+
+    def __exit__( self, *args ) -> None:
+        self.close()
+
+class NullProgress( ProgressSink ):
+    """
+    Progress sink dropping all records (at near-zero cost).
+    """
+    def report( self, force:bool= False, **record ) -> None:
+        pass
+
+    def close( self ) -> None:
+        pass
+
+class ConsoleProgress( ProgressSink ):
+    """
+    Progress sink printing the records as rows of a table (the header is given by the keys of the first record).
+    """
+    def __init__( self, every:int= 1, interval:float= 0.0 ):
+        super().__init__( every, interval )
+        self._widths:list[int] = None
+
+    def emit( self, record:dict, elapsed:float ) -> None:
+        if self._widths is None:
+            self._widths = [ max( len(key), 10 ) for key in record ]
+            print( '┬'.join( '─' * (width+2) for width in self._widths ) )
+            print( '│'.join( f' {key:{width}s} ' for key, width in zip( record, self._widths ) ) )
+            print( '┼'.join( '─' * (width+2) for width in self._widths ) )
+
+        print( '│'.join( f' {_format( value, width )} ' for value, width in zip( record.values(), self._widths ) ) )
+
+    def close( self ) -> None:
+        super().close()
+
+        if self._widths is not None:
+            print( '┴'.join( '─' * (width+2) for width in self._widths ) )
+            self._widths = None
+
+class MemoryProgress( ProgressSink ):
+    """
+    Progress sink storing the records (with their elapsed time in the field 'time') in the list 'records'.
+    """
+    def __init__( self, every:int= 1, interval:float= 0.0 ):
+        super().__init__( every, interval )
+        self.records:list[dict] = []
+
+    def emit( self, record:dict, elapsed:float ) -> None:
+        self.records.append( { 'time' : elapsed, **record } )
+
+class JsonlProgress( ProgressSink ):
+    """
+    Progress sink writing the records (with their elapsed time in the field 'time') to a file as JSON lines.
+    """
+    def __init__( self, path:str, every:int= 1, interval:float= 0.0 ):
+        super().__init__( every, interval )
+        self._file = open( path, 'w' )
+
+    def emit( self, record:dict, elapsed:float ) -> None:
+        self._file.write( json.dumps( { 'time' : elapsed, **record }, default= _to_builtin ) + '\n' )
+
+    def close( self ) -> None:
+        super().close()
+        self._file.close()
+
+def _format( value, width:int ) -> str:
+    """
+    Returns the value formatted for a table cell.
+    """
+    if isinstance( value, bool ) or value is None:
+        return f'{"+" if value else "":{width}s}'
+
+    if isinstance( value, int ):
+        return f'{value:{width}d}'
+
+    if isinstance( value, float ):
+        return f'{value:{width}.2f}'
+
+    return f'{str(value):{width}s}'
+
+def _to_builtin( value ):
+    """
+    Converts NumPy scalars (and other objects) for JSON serialization.
+    """
+    return value.item() if hasattr( value, 'item' ) else str( value )
+
+def as_progress( progress:ProgressSink ) -> ProgressSink:
+    """
+    Returns the given progress sink, or a console sink, if it is not given.
+    """
+    return progress if progress is not None else ConsoleProgress()
@@ -4,6 +4,8 @@ from ortools.math_opt.python import mathopt
 
 import itertools as it
 
+from cut_pool import CutPool
+
 def _log( model:mathopt.Model, result:mathopt.SolveResult, *, ncuts:int= 0 ) -> None:
     """
     Prints log.
@@ -33,10 +35,12 @@ def _log( model:mathopt.Model, result:mathopt.SolveResult, *, ncuts:int= 0 ) ->
 class SchedulingCutSeparator:
     """
     Callable class to seperate the parallel inequalities.
+    If a cut pool is given, the pooled cuts are re-checked first, and the separation runs only if none of them is violated.
     """
-    def __init__( self, processing_times:list[int], C:list[mathopt.Variable] ):
+    def __init__( self, processing_times:list[int], C:list[mathopt.Variable], pool:CutPool= None ):
         self.p:list[int] = processing_times
         self.C:list[mathopt.Variable] = C
+        self.pool:CutPool = pool
 
         self.JOBS = range(len(self.p))
         self.ncuts:int = 0
@@ -54,6 +58,15 @@ class SchedulingCutSeparator:
 
         c_values = [ callback_data.solution[var] for var in self.C ]
 
+        # violated cuts of the pool, if any
+        if self.pool is not None:
+            violation = lambda jobs : 0.5 * ( sum( self.p[j]**2 for j in jobs ) + sum( self.p[j] for j in jobs )**2 ) - sum( self.p[j]*c_values[j] for j in jobs )
+            cuts = self.pool.violated( violation, self.MINIMUM_VIOLATION, max_cuts= 1 )
+
+            if cuts:
+                self._add_cut( result, cuts[0][0] )
+                return result
+
         for j in sorted( self.JOBS, key= lambda i : c_values[i] ):
             curr_set.append(j)
             delta += self.p[j]
@@ -66,14 +79,22 @@ class SchedulingCutSeparator:
         if not best_set:
             return result        
 
-        # add violated cut to the model
+        if self.pool is not None:
+            self.pool.add( best_set, best_value )
+
+        self._add_cut( result, best_set )
+
+        return result
+
+    def _add_cut( self, result:mathopt.CallbackResult, best_set:list[int] ) -> None:
+        """
+        Adds the parallel inequality of the given job subset to the model.
+        """
         self.ncuts += 1
         
         result.add_user_cut( 0.5 * ( sum( self.p[j]**2 for j in best_set ) + sum( self.p[j] for j in best_set )**2 ) <= sum( self.p[j]*self.C[j] for j in best_set ) )
 
-        return result
-
-def schedule_jobs_on_a_single_machine( processing_times:list[int], weights:list[int], release_times:list[int], separation:bool= False, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, params:mathopt.SolveParameters= None ) -> None:
+def schedule_jobs_on_a_single_machine( processing_times:list[int], weights:list[int], release_times:list[int], separation:bool= False, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, params:mathopt.SolveParameters= None, cut_pool:CutPool= None ) -> None:
     """
     Solves scheduling problem "1 | r_j | sum w_jC_j" (or "1 || sum w_jC_j") as an MIP with OR-Tools MathOpt.
 
@@ -95,6 +116,8 @@ def schedule_jobs_on_a_single_machine( processing_times:list[int], weights:list[
         NOTE that HIGHS does not support branch-and-cut.
     params: mathopt.SolveParameters
         Configuration of the underlying solver.
+    cut_pool: CutPool
+        Pool of the separated inequalities (optional), e.g., to reuse them in the next solve of the same instance.
     """
     # INIT
     n = len(processing_times)
@@ -120,7 +143,7 @@ def schedule_jobs_on_a_single_machine( processing_times:list[int], weights:list[
         model.add_linear_constraint( C[j] <= C[i] - processing_times[i] + M*y[i][j] )
     
     callback_reg = mathopt.CallbackRegistration( events={mathopt.Event.MIP_NODE}, add_cuts= True ) if separation else None # TODO: MIP_NODE: GUROBI only ?
-    cb = SchedulingCutSeparator( processing_times, C ) if separation else None
+    cb = SchedulingCutSeparator( processing_times, C, cut_pool ) if separation else None
 
     result = mathopt.solve(
         model,
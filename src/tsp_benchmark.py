@@ -0,0 +1,248 @@
+import numpy as np
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+
+from progress import NullProgress
+from tsp_construction import christofides_tour, greedy_edge_tour, insertion_tour, nearest_neighbor_tour, space_filling_curve_tour
+from tsp_instances import random_euclidean_matrix, tetrahedron_matrix, RANDOM_EUCLIDEAN_OPTIMA
+from tsp_lk import lin_kernighan
+from tsp_ls_1 import local_search, variable_neighborhood_search
+from tsp_ls_2 import genetic_algorithm, simulated_annealing, tabu_search
+from tsp_matrix import CostMatrix
+from tsp_neighbors import neighbor_lists
+from tsp_parallel import island_genetic_algorithm, multi_start
+from tsp_trace import Trace
+
+# Benchmark of the TSP methods on instances with known optima.
+#
+# Each method is run on each instance of a size grid with each seed, and a row is recorded per run:
+# wall time, evaluations (see tsp_trace) per second, gap to the reference cost, and peak memory.
+# The unit of evaluations depends on the method (see EVALUATION_UNITS), hence evaluations per second can be compared
+# only between runs of the same method (e.g., across versions), not between methods.
+# Peak memory is traced by tracemalloc in a separate run with the same seed, since tracing distorts the wall time
+# (NOTE: the memory of the worker processes of the parallel methods is not traced).
+# The reference cost is the optimum, if it is known (RANDOM_EUCLIDEAN_OPTIMA), otherwise the best cost found by any run.
+# Reports are written as CSV or JSON files (with the environment), which can be compared across versions for regression tracking.
+#
+# NOTE: The MIP models of tsp_mip do not return solutions (and they do not scale to the grid), hence they are not benchmarked.
+#       The other methods (tsp_construction, tsp_ls_1, tsp_ls_2, tsp_lk, tsp_parallel) are all benchmarked, with fixed settings.
+
+def _random_solution( instance:CostMatrix, seed:int ) -> list:
+    """
+    Returns a random permutation of the nodes.
+    """
+    return instance.nodes_of( np.random.default_rng( seed ).permutation( len(instance) ).tolist() )
+
+# methods: (instance, seed, trace) -> solution
+SOLVERS = {
+    'nearest neighbor'    : lambda instance, seed, trace: nearest_neighbor_tour( instance ),
+    'greedy edge'         : lambda instance, seed, trace: greedy_edge_tour( instance ),
+    'space-filling curve' : lambda instance, seed, trace: space_filling_curve_tour( instance ),
+    'farthest insertion'  : lambda instance, seed, trace: insertion_tour( instance, rule= 'farthest', seed= seed ),
+    'christofides-like'   : lambda instance, seed, trace: christofides_tour( instance ),
+    'local search'        : lambda instance, seed, trace: local_search( instance, neighbors= neighbor_lists( instance, 10 ), first_improvement= True,
+                                                                        initial_solution= _random_solution( instance, seed ), draw_progress= False ),
+    'tabu search'         : lambda instance, seed, trace: tabu_search( instance, max_iterations= 10*len(instance), tabu_length= len(instance)//5,
+                                                                       neighbors= neighbor_lists( instance, 10 ), move= '2-opt',
+                                                                       initial_solution= _random_solution( instance, seed ), progress= NullProgress(), trace= trace ),
+    'simulated annealing' : lambda instance, seed, trace: simulated_annealing( instance, temperature= 100, cooling_rate= 0.9999, move= '2-opt', seed= seed,
+                                                                               initial_solution= _random_solution( instance, seed ), silent= True, trace= trace ),
+    'genetic algorithm'   : lambda instance, seed, trace: genetic_algorithm( instance, population_size= 50, generations= 100, mutation_rate= 0.1, crossover= 'eax',
+                                                                             seed= seed, progress= NullProgress(), trace= trace ),
+    'vns'                 : lambda instance, seed, trace: variable_neighborhood_search( instance, operators= [ '2-opt', 'or-opt' ], max_iterations= 50, seed= seed,
+                                                                                        neighbors= neighbor_lists( instance, 10 ), first_improvement= True, trace= trace )[0],
+    'lin-kernighan'       : lambda instance, seed, trace: lin_kernighan( instance, seed= seed, trace= trace )[0],
+    'multi-start sa'      : lambda instance, seed, trace: multi_start( instance, simulated_annealing, nruns= 4, seed= seed,
+                                                                         temperature= 100, cooling_rate= 0.9999, move= '2-opt', silent= True )[0],
+    'island ga'           : lambda instance, seed, trace: island_genetic_algorithm( instance, nislands= 4, population_size= 50, generations= 100, crossover= 'eax',
+                                                                                    deterministic= True, seed= seed )[0],
+}
+
+# unit of the evaluations of the traced methods (the others have no evaluations)
+EVALUATION_UNITS = {
+    'tabu search'         : 'evaluated moves',
+    'simulated annealing' : 'evaluated moves',
+    'genetic algorithm'   : 'evaluated individuals',
+    'vns'                 : 'evaluated moves',
+    'lin-kernighan'       : 'local searches',
+}
+
+def benchmark_instance( family:str, size:int ) -> tuple[CostMatrix,float]:
+    """
+    Returns an instance of the benchmark and its optimum (None, if it is not known).
+
+    Args
+    ----
+    family: str
+        Instance family: 'random' (random_euclidean_matrix with the default seed)
+        or 'tetrahedron' (tetrahedron_matrix with n = m, and with 3(n+m)-2 nodes close to the size).
+    size: int
+        Number of nodes.
+    """
+    assert family in ( 'random', 'tetrahedron' ), f'unknown instance family: {family}'
+
+    if family == 'random':
+        return random_euclidean_matrix( size, lazy= False ), RANDOM_EUCLIDEAN_OPTIMA.get( size )
+
+    k = max( 1, round( (size+2) / 6 ) )
+    return tetrahedron_matrix( k, k, lazy= False ), None
+
+def _measure( solver, instance:CostMatrix, seed:int, memory:bool ) -> dict:
+    """
+    Runs a method (with its output suppressed), and returns its measures.
+    If memory is traced, the method is run again with tracemalloc.
+    """
+    trace = Trace()
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout( io.StringIO() ):
+        solution = solver( instance, seed, trace )
+
+    wall_time = time.perf_counter() - start
+
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+
+        with contextlib.redirect_stdout( io.StringIO() ):
+            solver( instance, seed, Trace() )
+
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    evaluations = trace.points[-1][1] if trace.points else None
+
+    return { 'cost' : instance.tour_cost( instance.indices( solution ) ),
+             'time' : wall_time,
+             'evaluations' : evaluations,
+             'evaluations_per_second' : evaluations / wall_time if evaluations is not None and 0 < wall_time else None,
+             'peak_memory' : peak_memory }
+
+def run_benchmark( solvers:list[str]= None, families:list[str]= ( 'random', ), sizes:list[int]= ( 50, 100, 150 ), seeds:list[int]= ( 0, 1, 2 ),
+                   memory:bool= True, verbose:bool= True ) -> list[dict]:
+    """
+    Runs the methods on the instances of the size grid with the given seeds.
+
+    Args
+    ----
+    solvers: list[str]
+        Names of the methods (optional, default: all methods, see SOLVERS).
+    families: list[str]
+        Instance families: 'random' and/or 'tetrahedron' (see benchmark_instance).
+    sizes: list[int]
+        Numbers of nodes.
+    seeds: list[int]
+        Seeds of the runs.
+    memory: bool
+        Should we trace the peak memory? (NOTE: each run is repeated with tracing.)
+    verbose: bool
+        Should we print a row per run?
+
+    Returns
+    -------
+    rows: list[dict]
+        A row per run: 'family', 'size' (number of nodes), 'method', 'seed', 'cost', 'reference' (reference cost),
+        'reference_type' ('optimum' or 'best found'), 'gap' (%), 'time' (wall-clock seconds), 'evaluations',
+        'evaluations_per_second' (comparable only within a method), 'evaluation_unit' (see EVALUATION_UNITS), 'peak_memory' (bytes).
+    """
+    solvers = list( SOLVERS ) if solvers is None else solvers
+    rows = []
+
+    if verbose:
+        print( '────────────┬───────┬──────────────────────┬──────┬────────────┬─────────┬──────────' )
+        print( 'family      │     n │ method               │ seed │ cost       │ gap (%) │ time (s) ' )
+        print( '────────────┼───────┼──────────────────────┼──────┼────────────┼─────────┼──────────' )
+
+    for family in families:
+        for size in sizes:
+            instance, optimum = benchmark_instance( family, size )
+            instance_rows = []
+
+            for name in solvers:
+                for seed in seeds:
+                    row = { 'family' : family, 'size' : len(instance), 'method' : name, 'seed' : seed }
+                    row.update( _measure( SOLVERS[name], instance, seed, memory ) )
+                    row['evaluation_unit'] = EVALUATION_UNITS.get( name )
+                    instance_rows.append( row )
+
+            # gaps to the optimum, or to the best found cost
+            reference = optimum if optimum is not None else min( row['cost'] for row in instance_rows )
+
+            for row in instance_rows:
+                row['reference'] = reference
+                row['reference_type'] = 'optimum' if optimum is not None else 'best found'
+                row['gap'] = 100 * (row['cost'] / reference - 1) if 0 < reference else 0.0
+
+                if verbose:
+                    print( f'{row["family"]:11s} │ {row["size"]:5d} │ {row["method"][:20]:20s} │ {row["seed"]:4d} │ {row["cost"]:10.2f} │ {row["gap"]:7.2f} │ {row["time"]:8.2f}' )
+
+            rows.extend( instance_rows )
+
+    if verbose:
+        print( '────────────┴───────┴──────────────────────┴──────┴────────────┴─────────┴──────────' )
+
+    return rows
+
+def summarize( rows:list[dict] ) -> list[dict]:
+    """
+    Returns the mean measures of the runs per family, size and method.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault( ( row['family'], row['size'], row['method'] ), [] ).append( row )
+
+    def mean( values ):
+        values = [ value for value in values if value is not None ]
+        return statistics.fmean( values ) if values else None
+
+    return [ { 'family' : family, 'size' : size, 'method' : method, 'runs' : len(group),
+               'gap' : mean( row['gap'] for row in group ), 'best_gap' : min( row['gap'] for row in group ),
+               'time' : mean( row['time'] for row in group ), 'evaluations_per_second' : mean( row['evaluations_per_second'] for row in group ),
+               'evaluation_unit' : group[0]['evaluation_unit'],
+               'peak_memory' : mean( row['peak_memory'] for row in group ) }
+             for ((family,size,method),group) in groups.items() ]
+
+def write_report( rows:list[dict], path:str ) -> None:
+    """
+    Writes the rows to a CSV file ('*.csv') or to a JSON file ('*.json', with the environment and the summary).
+    """
+    extension = os.path.splitext( path )[1]
+    assert extension in ( '.csv', '.json' ), f'unknown file type: {extension}'
+
+    if extension == '.csv':
+        with open( path, 'w', newline= '' ) as file:
+            writer = csv.DictWriter( file, fieldnames= list( rows[0] ) if rows else [] )
+            writer.writeheader()
+            writer.writerows( rows )
+        return
+
+    report = { 'created' : time.strftime( '%Y-%m-%dT%H:%M:%S' ),
+               'environment' : { 'python' : platform.python_version(), 'numpy' : np.__version__, 'platform' : platform.platform(), 'cpus' : os.cpu_count() },
+               'runs' : rows,
+               'summary' : summarize( rows ) }
+
+    with open( path, 'w' ) as file:
+        json.dump( report, file, indent= 2 )
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser( description= 'Benchmark of the TSP methods.' )
+    parser.add_argument( 'reports', nargs= '*', help= 'paths of the reports to write (*.csv or *.json), e.g., tsp_benchmark.csv tsp_benchmark.json' )
+    args = parser.parse_args()
+
+    for path in args.reports:
+        if os.path.splitext( path )[1] not in ( '.csv', '.json' ):
+            parser.error( f'unknown file type: {path}' ) # before the (long) runs
+
+    rows = run_benchmark( sizes= [ 50, 100 ], seeds= [ 0, 1 ] )
+
+    for path in args.reports:
+        write_report( rows, path )
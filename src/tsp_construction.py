@@ -0,0 +1,343 @@
+import networkx as nx
+import numpy as np
+
+from tsp_instances import random_euclidean_matrix, RANDOM_EUCLIDEAN_OPTIMA
+from tsp_matrix import CostMatrix, as_cost_matrix
+from tsp_neighbors import neighbor_lists
+
+# Construction heuristics for the TSP.
+# Each heuristic returns a Hamiltonian tour as a permutation of the nodes, which can be passed as 'initial_solution' to the solvers.
+
+def nearest_neighbor_tour( instance:nx.DiGraph|CostMatrix, start= None, k:int= 10 ) -> list:
+    """
+    Returns the nearest neighbor tour: starting from a node, the nearest unvisited node is always visited next.
+
+    The nearest unvisited node is searched among the k nearest neighbors first (see tsp_neighbors.neighbor_lists),
+    and all unvisited nodes are scanned only if all of them are visited.
+
+    Args
+    ----
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or its cost matrix.
+    start:
+        First node of the tour (optional, default: first node of the instance).
+    k: int
+        Number of neighbors per node.
+
+    Returns
+    -------
+    : list
+        A Hamiltonian tour as a permutation of the nodes.
+    """
+    costs = as_cost_matrix( instance )
+    matrix = costs.matrix
+    n = len(costs)
+
+    neighbors = neighbor_lists( costs, k ) if 1 < n else np.zeros( (n,0), dtype= np.intp )
+
+    # unvisited nodes in an array (removal by swapping with the last one)
+    unvisited = np.arange( n )
+    where = np.arange( n )
+    nunvisited = n
+
+    def visit( v:int ) -> None:
+        nonlocal nunvisited
+        nunvisited -= 1
+        last = unvisited[nunvisited]
+        unvisited[where[v]], where[last] = last, where[v]
+        unvisited[nunvisited], where[v] = v, nunvisited
+
+    order = [ costs.index[start] if start is not None else 0 ]
+    visit( order[0] )
+
+    while nunvisited:
+        u = order[-1]
+
+        candidates = neighbors[u][where[neighbors[u]] < nunvisited]
+        if len(candidates) == 0:
+            candidates = unvisited[:nunvisited]
+
+        v = int( candidates[np.argmin( matrix[u,candidates] )] )
+
+        order.append( v )
+        visit( v )
+
+    return costs.nodes_of( order )
+
+def greedy_edge_tour( instance:nx.DiGraph|CostMatrix, k:int= 10 ) -> list:
+    """
+    Returns the greedy edge tour: edges are added in increasing order of cost,
+    if both endpoints have degree less than 2 and no subtour is closed.
+
+    Only the edges to the k nearest neighbors are considered (see tsp_neighbors.neighbor_lists),
+    and the resulting paths are joined by the nearest neighbor rule on their endpoints.
+
+    Args
+    ----
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with symmetric 'cost' edge attributes) or its cost matrix.
+    k: int
+        Number of neighbors per node.
+
+    Returns
+    -------
+    : list
+        A Hamiltonian tour as a permutation of the nodes.
+    """
+    costs = as_cost_matrix( instance )
+    matrix = costs.matrix
+    n = len(costs)
+
+    if n < 3:
+        return costs.nodes[:]
+
+    # CANDIDATE EDGES
+    neighbors = neighbor_lists( costs, k )
+
+    u = np.repeat( np.arange(n), neighbors.shape[1] )
+    v = neighbors.ravel()
+    edges = np.unique( np.minimum( u, v ) * n + np.maximum( u, v ) )
+    u, v = edges // n, edges % n
+
+    order = np.argsort( matrix[u,v], kind= 'stable' )
+
+    # GREEDY MATCHING (with union-find on the paths)
+    adj = np.full( (n,2), -1, dtype= np.intp )
+    degree = np.zeros( n, dtype= np.intp )
+    parent = list(range(n))
+
+    def find( x:int ) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for (a,b) in zip( u[order].tolist(), v[order].tolist() ):
+        if degree[a] < 2 and degree[b] < 2:
+            ra, rb = find(a), find(b)
+
+            if ra != rb:
+                parent[ra] = rb
+                adj[a,degree[a]], adj[b,degree[b]] = b, a
+                degree[a] += 1
+                degree[b] += 1
+
+    # JOIN PATHS (nearest neighbor on endpoints)
+    endpoints = np.flatnonzero( degree < 2 )
+
+    tour = []
+    visited = np.zeros( n, dtype= bool )
+    curr = int( endpoints[0] )
+
+    while True:
+        # walk the path from curr
+        prev = -1
+        while True:
+            tour.append( curr )
+            visited[curr] = True
+
+            nxt = [ w for w in adj[curr,:degree[curr]].tolist() if w != prev and not visited[w] ]
+            if not nxt:
+                break
+
+            prev, curr = curr, nxt[0]
+
+        # jump to the nearest endpoint of another path
+        remaining = endpoints[~visited[endpoints]]
+        if len(remaining) == 0:
+            break
+
+        curr = int( remaining[np.argmin( matrix[tour[-1],remaining] )] )
+
+    return costs.nodes_of( tour )
+
+def _hilbert_index( x:np.ndarray, y:np.ndarray, order:int ) -> np.ndarray:
+    """
+    Returns the indices of the given grid points on the Hilbert curve of the given order (grid size 2^order).
+    """
+    x, y = x.copy(), y.copy()
+    d = np.zeros( len(x), dtype= np.int64 )
+
+    s = 1 << (order-1)
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+
+        # rotate the quadrant
+        flip = ~ry & rx
+        x[flip], y[flip] = s-1 - x[flip], s-1 - y[flip]
+
+        swap = ~ry
+        x[swap], y[swap] = y[swap], x[swap]
+
+        s >>= 1
+
+    return d
+
+def space_filling_curve_tour( instance:nx.DiGraph|CostMatrix, order:int= 16 ) -> list:
+    """
+    Returns the nodes in the order of their positions on a Hilbert curve (the instance needs coordinates).
+
+    The tour is built in O(n log n) time without computing any distance,
+    and it is about 25% longer than the optimum on uniform random instances.
+
+    Args
+    ----
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'pos' node attributes) or its cost matrix (with coordinates).
+    order: int
+        Order of the Hilbert curve (the points are rounded to a grid of size 2^order).
+
+    Returns
+    -------
+    : list
+        A Hamiltonian tour as a permutation of the nodes.
+    """
+    if isinstance( instance, CostMatrix ):
+        nodes, coords = instance.nodes, instance.coords
+    else:
+        pos = nx.get_node_attributes( instance, 'pos' )
+        nodes = list(instance.nodes)
+        coords = np.array( [ pos[node] for node in nodes ], dtype= np.float64 ) if len(pos) == len(nodes) else None
+
+    assert coords is not None, 'coordinates are needed!'
+
+    lower = coords.min( axis= 0 )
+    extent = max( float( (coords.max( axis= 0 ) - lower).max() ), 1e-9 )
+    grid = np.minimum( ((coords - lower) / extent * (1 << order)).astype( np.int64 ), (1 << order) - 1 )
+
+    return [ nodes[i] for i in np.argsort( _hilbert_index( grid[:,0], grid[:,1], order ), kind= 'stable' ).tolist() ]
+
+def insertion_tour( instance:nx.DiGraph|CostMatrix, rule:str= 'farthest', seed:int= 0 ) -> list:
+    """
+    Returns an insertion tour: starting from a single node, the node selected by the rule is inserted into the tour
+    at the cheapest position, until all nodes are inserted. It takes O(n^2) time.
+
+    Args
+    ----
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or its cost matrix.
+    rule: str
+        Node selection rule: 'nearest' (nearest to the tour), 'farthest' (farthest from the tour), or 'random'.
+    seed: int
+        Random seed (for the 'random' rule).
+
+    Returns
+    -------
+    : list
+        A Hamiltonian tour as a permutation of the nodes.
+    """
+    assert rule in ( 'nearest', 'farthest', 'random' ), f'unknown rule: {rule}'
+
+    costs = as_cost_matrix( instance )
+    matrix = costs.matrix
+    n = len(costs)
+
+    rng = np.random.default_rng( seed )
+
+    tour = np.array( [ 0 ], dtype= np.intp )
+    inserted = np.zeros( n, dtype= bool )
+    inserted[0] = True
+
+    distance = np.minimum( matrix[0], matrix[:,0] ) # distance of the nodes to the tour
+    random_order = iter( rng.permutation( np.arange(1,n) ).tolist() )
+
+    for _ in range(n-1):
+        # select node
+        if rule == 'random':
+            v = next( random_order )
+        else:
+            candidates = np.where( inserted, np.nan, distance )
+            v = int( np.nanargmin( candidates ) if rule == 'nearest' else np.nanargmax( candidates ) )
+
+        # insert node at the cheapest position: between tour[i] and tour[i+1]
+        nxt = np.roll( tour, -1 )
+        i = int( np.argmin( matrix[tour,v] + matrix[v,nxt] - matrix[tour,nxt] ) )
+        tour = np.insert( tour, i+1, v )
+
+        inserted[v] = True
+        distance = np.minimum( distance, np.minimum( matrix[v], matrix[:,v] ) )
+
+    return costs.nodes_of( tour.tolist() )
+
+def christofides_tour( instance:nx.DiGraph|CostMatrix ) -> list:
+    """
+    Returns a Christofides-like tour: a minimum spanning tree is extended by a matching of its odd-degree nodes,
+    and an Euler tour of the resulting multigraph is shortcut to a Hamiltonian tour.
+
+    NOTE: The matching is built greedily (instead of a minimum-weight perfect matching), hence the 3/2 guarantee is lost,
+    but it runs in O(n^2) time.
+
+    Args
+    ----
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with symmetric 'cost' edge attributes) or its cost matrix.
+
+    Returns
+    -------
+    : list
+        A Hamiltonian tour as a permutation of the nodes.
+    """
+    costs = as_cost_matrix( instance )
+    matrix = costs.matrix
+    n = len(costs)
+
+    if n < 3:
+        return costs.nodes[:]
+
+    multigraph = nx.MultiGraph()
+    multigraph.add_nodes_from( range(n) )
+
+    # MINIMUM SPANNING TREE (Prim)
+    in_tree = np.zeros( n, dtype= bool )
+    key = np.full( n, np.inf )
+    parent = np.full( n, -1, dtype= np.intp )
+    key[0] = 0
+
+    for _ in range(n):
+        v = int( np.argmin( np.where( in_tree, np.inf, key ) ) )
+        in_tree[v] = True
+
+        if parent[v] >= 0:
+            multigraph.add_edge( int( parent[v] ), v )
+
+        closer = ~in_tree & (matrix[v] < key)
+        key[closer] = matrix[v][closer]
+        parent[closer] = v
+
+    # GREEDY MATCHING OF ODD-DEGREE NODES
+    odd = np.array( [ v for v, degree in multigraph.degree() if degree % 2 == 1 ], dtype= np.intp )
+
+    i, j = np.triu_indices( len(odd), 1 )
+    order = np.argsort( matrix[odd[i],odd[j]], kind= 'stable' )
+
+    matched = np.zeros( n, dtype= bool )
+    for (u,v) in zip( odd[i[order]].tolist(), odd[j[order]].tolist() ):
+        if not matched[u] and not matched[v]:
+            matched[u] = matched[v] = True
+            multigraph.add_edge( u, v )
+
+    # SHORTCUT EULER TOUR
+    tour = list( dict.fromkeys( u for (u,_) in nx.eulerian_circuit( multigraph, source= 0 ) ) )
+
+    return costs.nodes_of( tour )
+
+if __name__ == '__main__':
+    instance = random_euclidean_matrix( 150 )
+    optimum = RANDOM_EUCLIDEAN_OPTIMA[150]
+
+    print( '─────────────────────┬────────────┬─────────' )
+    print( 'heuristic            │ cost       │ gap (%) ' )
+    print( '─────────────────────┼────────────┼─────────' )
+
+    for name, heuristic in [ ( 'nearest neighbor', nearest_neighbor_tour ),
+                             ( 'greedy edge', greedy_edge_tour ),
+                             ( 'space-filling curve', space_filling_curve_tour ),
+                             ( 'farthest insertion', insertion_tour ),
+                             ( 'christofides-like', christofides_tour ) ]:
+        cost = instance.tour_cost( instance.indices( heuristic( instance ) ) )
+
+        print( f'{name:20s} │ {cost:10.2f} │ {100*(cost/optimum-1):7.2f}' )
+
+    print( '─────────────────────┴────────────┴─────────' )
@@ -1,8 +1,73 @@
 import networkx as nx
+import numpy as np
 import itertools as it
 import random
 import math
 
+from tsp_matrix import CostMatrix
+
+# optimal solution values for random_euclidean_graph(n) and random_euclidean_matrix(n) with the default seed
+RANDOM_EUCLIDEAN_OPTIMA = {
+      3: 191.11,   4: 193.70,   5: 244.41,   6: 249.96,   7: 251.18,   8: 251.18,   9: 256.84,  10: 281.54,  11: 284.65,  12: 296.56,
+     13: 297.13,  14: 297.81,  15: 300.48,  16: 305.05,  17: 306.31,  18: 324.09,  19: 332.72,  20: 346.15,  21: 354.40,  22: 354.44,
+     23: 354.45,  24: 370.30,  25: 404.66,  26: 416.62,  27: 449.81,  28: 455.02,  29: 473.85,  30: 477.89,  31: 488.63,  32: 491.26,
+     33: 491.67,  34: 491.71,  35: 492.12,  36: 501.79,  37: 502.62,  38: 510.96,  39: 511.20,  40: 511.21,  41: 511.48,  42: 512.28,
+     43: 515.49,  44: 522.10,  45: 522.28,  46: 534.62,  47: 536.01,  48: 547.35,  49: 549.40,  50: 558.00,  60: 598.22,  70: 627.60,
+     80: 687.79,  90: 722.55, 100: 758.56, 110: 791.41, 120: 838.39, 130: 876.79, 140: 921.44, 150: 941.17,
+}
+
+def _random_coordinates( nnodes:int, seed:int ) -> list[tuple[int,int]]:
+    """
+    Returns random integer coordinates in [0,100]x[0,100].
+
+    Args
+    ----
+    nnodes: int
+        Desired number of points.
+    seed: int
+        Random seed.
+
+    Returns
+    -------
+    coords: list[tuple[int,int]]
+        Coordinates of the points.
+    """
+    random.seed( seed )
+
+    return [ (random.randint(0,100),random.randint(0,100)) for _ in range(nnodes) ]
+
+def _tetrahedron_coordinates( n:int, m:int ) -> list[tuple[float,float]]:
+    """
+    Returns the coordinates of the tetrahedron instance (with 3(n+m)-2 points).
+
+    Args
+    ----
+    n: int
+        The n-parameter of the tetrahedron graph.
+    m: int
+        The m-parameter of the tetrahedron graph.
+
+    Returns
+    -------
+    coords: list[tuple[float,float]]
+        Coordinates of the points.
+    """
+    coords = []
+
+    for i in range(n):
+        coords.append( (n - i/2, i*math.sqrt(3)/2) )
+        coords.append( (n/2 - i/2, (n-i)*math.sqrt(3)/2) )
+        coords.append( (i, 0) )
+
+    for j in range(1,m):
+        coords.append( (j*n/(2*m), j*n/(2*math.sqrt(3)*m) ) )
+        coords.append( (n - j*n/(2*m), j*n/(2*math.sqrt(3)*m) ) )
+        coords.append( (n/2, n*math.sqrt(3)/2 - j*n/(math.sqrt(3)*m) ) )
+
+    coords.append( (n/2, n/(2*math.sqrt(3)) ) )
+
+    return coords
+
 def random_euclidean_graph( nnodes:int, seed:int= 0 ) -> nx.DiGraph:
     """
     Returns a random directed complete graph with the given number of nodes.
@@ -22,15 +87,13 @@ def random_euclidean_graph( nnodes:int, seed:int= 0 ) -> nx.DiGraph:
         Directed complete graph with node attributes 'pos', and edge attributes 'cost'.
     """
     # initialize
-    random.seed( seed )
-
     NODES = range(nnodes)
 
     # CREATE GRAPH
     graph = nx.DiGraph()
 
     # generate random coordinates 
-    coords = { u : (random.randint(0,100),random.randint(0,100)) for u in NODES }
+    coords = dict( enumerate( _random_coordinates( nnodes, seed ) ) )
 
     # add nodes to the graph with attribute 'pos'
     for u in NODES:
@@ -65,17 +128,8 @@ def tetrahedron_instance( n:int, m:int ) -> nx.DiGraph:
     graph = nx.DiGraph()
 
     # nodes
-    for i in range(n):
-        graph.add_node( len(graph.nodes), pos= (n - i/2, i*math.sqrt(3)/2) )
-        graph.add_node( len(graph.nodes), pos= (n/2 - i/2, (n-i)*math.sqrt(3)/2) )
-        graph.add_node( len(graph.nodes), pos= (i, 0) )
-
-    for j in range(1,m):
-        graph.add_node( len(graph.nodes), pos= (j*n/(2*m), j*n/(2*math.sqrt(3)*m) ) )
-        graph.add_node( len(graph.nodes), pos= (n - j*n/(2*m), j*n/(2*math.sqrt(3)*m) ) )
-        graph.add_node( len(graph.nodes), pos= (n/2, n*math.sqrt(3)/2 - j*n/(math.sqrt(3)*m) ) )
-
-    graph.add_node( len(graph.nodes), pos= (n/2, n/(2*math.sqrt(3)) ) )
+    for u, coord in enumerate( _tetrahedron_coordinates( n, m ) ):
+        graph.add_node( u, pos= coord )
 
     # edges
     pos = nx.get_node_attributes( graph, 'pos' )
@@ -83,3 +137,53 @@ def tetrahedron_instance( n:int, m:int ) -> nx.DiGraph:
         graph.add_edge( u, v, cost= math.dist( pos[u], pos[v] ) )
 
     return graph
+
+def random_euclidean_matrix( nnodes:int, seed:int= 0, dtype:np.dtype= np.float64, lazy:bool= True, storage:str= 'dense' ) -> CostMatrix:
+    """
+    Returns the same instance as random_euclidean_graph, but as a cost matrix built from the coordinates.
+    No networkx graph is built; call CostMatrix.to_graph() if a caller really needs one.
+
+    Args
+    ----
+    nnodes: int
+        Desired number of nodes.
+    seed: int
+        Random seed.
+    dtype: np.dtype
+        Data type of the distance matrix (e.g., np.float32 or np.float64).
+    lazy: bool
+        Should we postpone computing the distances until the matrix is first accessed?
+    storage: str
+        Storage of the matrix: 'dense', 'memmap' (temporary file), or 'coordinates' (computed on the fly), see CostMatrix.from_coordinates.
+
+    Returns
+    -------
+    : CostMatrix
+        Euclidean distance matrix with coordinates.
+    """
+    return CostMatrix.from_coordinates( _random_coordinates( nnodes, seed ), dtype= dtype, lazy= lazy, storage= storage )
+
+def tetrahedron_matrix( n:int, m:int, dtype:np.dtype= np.float64, lazy:bool= True, storage:str= 'dense' ) -> CostMatrix:
+    """
+    Returns the same instance as tetrahedron_instance, but as a cost matrix built from the coordinates.
+    No networkx graph is built; call CostMatrix.to_graph() if a caller really needs one.
+
+    Args
+    ----
+    n: int
+        The n-parameter of the tetrahedron graph.
+    m: int
+        The m-parameter of the tetrahedron graph.
+    dtype: np.dtype
+        Data type of the distance matrix (e.g., np.float32 or np.float64).
+    lazy: bool
+        Should we postpone computing the distances until the matrix is first accessed?
+    storage: str
+        Storage of the matrix: 'dense', 'memmap' (temporary file), or 'coordinates' (computed on the fly), see CostMatrix.from_coordinates.
+
+    Returns
+    -------
+    : CostMatrix
+        Euclidean distance matrix with coordinates.
+    """
+    return CostMatrix.from_coordinates( _tetrahedron_coordinates( n, m ), dtype= dtype, lazy= lazy, storage= storage )
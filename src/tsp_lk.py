@@ -0,0 +1,297 @@
+import networkx as nx
+import numpy as np
+import collections
+import time
+
+from tsp_instances import random_euclidean_matrix, RANDOM_EUCLIDEAN_OPTIMA
+from tsp_matrix import CostMatrix, as_cost_matrix
+from tsp_neighbors import neighbor_lists
+from tsp_tour import Tour
+from tsp_trace import Trace
+
+# Lin-Kernighan style variable-depth search
+#
+# A move is a sequence of 2-opt steps sharing the base node t1. In each step, edge (t1,t2) of the tour is removed,
+# and edge (t2,t3) is added, where t3 is a neighbor of t2. Then the tour is closed by removing edge (t3,t4) and adding edge (t4,t1),
+# i.e., the path between t2 and t4 is reversed. The next step continues with t2 := t4 (the closing edge is removed again).
+# The chain is extended while the cumulative gain (without the closing edge) is positive,
+# and the best closed tour of the chain is kept.
+
+def _flip( tour:Tour, t1:int, t2:int, t3:int ) -> int:
+    """
+    Removes edges (t1,t2) and (t3,t4), and adds edges (t2,t3) and (t4,t1), where t4 is the neighbor of t3 on the path from t2.
+
+    Args
+    ----
+    tour: Tour
+        A Hamiltonian tour over the node indices (modified in place).
+    t1: int
+        Base node.
+    t2: int
+        A neighbor of t1 in the tour.
+    t3: int
+        A node which is neither t1, t2, nor the neighbor of t2 on the path from t1.
+
+    Returns
+    -------
+    t4: int
+        The new neighbor of t1.
+    """
+    if tour.succ[t1] == t2:
+        t4 = int( tour.pred[t3] )
+        tour.reverse( t2, t4 )
+    else:
+        t4 = int( tour.succ[t3] )
+        tour.reverse( t4, t2 )
+
+    return t4
+
+def _lk_move( costs:np.ndarray, tour:Tour, t1:int, neighbors:np.ndarray, max_depth:int ) -> tuple[float,list[int]]:
+    """
+    Tries to improve the tour by a variable-depth move with base node t1.
+
+    All candidates t3 are tried in the first step (in decreasing order of d(t3,t4) - d(t2,t3)),
+    while the best candidate is taken greedily in the further steps.
+    Added edges are never removed in the same move.
+
+    Args
+    ----
+    costs: np.ndarray
+        Cost matrix (symmetric).
+    tour: Tour
+        A Hamiltonian tour over the node indices (modified in place, if an improving move is found).
+    t1: int
+        Base node.
+    neighbors: np.ndarray
+        Neighbor lists.
+    max_depth: int
+        Maximum number of 2-opt steps in a move.
+
+    Returns
+    -------
+    gain: float
+        Cost decrease of the applied move (0, if no improving move is found).
+    touched: list[int]
+        Endpoints of the changed edges.
+    """
+    for t2 in ( int( tour.succ[t1] ), int( tour.pred[t1] ) ):
+        for t3 in _lk_candidates( costs, tour, t1, t2, costs[t1,t2], neighbors, set() ):
+            # variable-depth chain starting with (t1,t2,t3)
+            g = costs[t1,t2]
+            added = set()
+            steps = []
+            best_gain, best_nsteps = 0.001, 0
+
+            u2, u3 = t2, t3
+            while u3 is not None:
+                g -= costs[u2,u3]
+                added.add( (min(u2,u3),max(u2,u3)) )
+
+                u4 = _flip( tour, t1, u2, u3 )
+                steps.append( (u2,u3,u4) )
+                g += costs[u3,u4]
+
+                # closing the tour
+                if best_gain < g - costs[u4,t1]:
+                    best_gain, best_nsteps = g - costs[u4,t1], len(steps)
+
+                if max_depth <= len(steps):
+                    break
+
+                u2 = u4
+                u3 = next( iter( _lk_candidates( costs, tour, t1, u2, g, neighbors, added ) ), None )
+
+            # roll back to the best closed tour
+            for (u2,u3,u4) in reversed( steps[best_nsteps:] ):
+                _flip( tour, t1, u4, u3 )
+
+            if best_nsteps:
+                return float( best_gain ), [ t1 ] + [ u for step in steps[:best_nsteps] for u in step ]
+
+    return 0.0, []
+
+def _lk_candidates( costs:np.ndarray, tour:Tour, t1:int, t2:int, g:float, neighbors:np.ndarray, added:set ) -> list[int]:
+    """
+    Returns the candidate nodes t3 for the next step in decreasing order of d(t3,t4) - d(t2,t3),
+    where the partial gain g - d(t2,t3) is positive, and the removed edge (t3,t4) was not added before.
+    """
+    t3 = neighbors[t2]
+    t4 = tour.pred[t3] if tour.succ[t1] == t2 else tour.succ[t3]
+
+    g1 = g - costs[t2,t3]
+    valid = (0 < g1) & (t3 != t1) & (t4 != t2) & (t4 != t1)
+
+    t3, t4 = t3[valid], t4[valid]
+    order = np.argsort( costs[t2,t3] - costs[t3,t4], kind= 'stable' )
+
+    return [ u3 for (u3,u4) in zip( t3[order].tolist(), t4[order].tolist() ) if (min(u3,u4),max(u3,u4)) not in added ]
+
+def _lk_local_search( costs:np.ndarray, tour:Tour, neighbors:np.ndarray, max_depth:int, dont_look_bits:np.ndarray, stop ) -> float:
+    """
+    Applies improving variable-depth moves until no base node (with don't-look bit off) gives an improvement.
+
+    Args
+    ----
+    costs: np.ndarray
+        Cost matrix (symmetric).
+    tour: Tour
+        A Hamiltonian tour over the node indices (modified in place).
+    neighbors: np.ndarray
+        Neighbor lists.
+    max_depth: int
+        Maximum number of 2-opt steps in a move.
+    dont_look_bits: np.ndarray
+        Boolean array of don't-look bits (modified in place).
+    stop:
+        Returns whether the search should be interrupted.
+
+    Returns
+    -------
+    gain: float
+        Total cost decrease.
+    """
+    queue = collections.deque( np.flatnonzero( ~dont_look_bits ).tolist() )
+    queued = ~dont_look_bits
+
+    total_gain = 0.0
+
+    while queue and not stop():
+        t1 = queue.popleft()
+        queued[t1] = False
+
+        gain, touched = _lk_move( costs, tour, t1, neighbors, max_depth )
+
+        if gain == 0:
+            dont_look_bits[t1] = True
+            continue
+
+        total_gain += gain
+
+        for u in touched:
+            dont_look_bits[u] = False
+
+            if not queued[u]:
+                queued[u] = True
+                queue.append( u )
+
+    return total_gain
+
+def _double_bridge( tour:Tour, rng:np.random.Generator, max_length:int= 50 ) -> tuple[Tour,list[int]]:
+    """
+    Returns the tour perturbed by a random (segment-local) double-bridge move:
+    the sequence A B C D is replaced with A C B D, where B and C are consecutive segments of total length at most max_length.
+
+    Returns
+    -------
+    tour: Tour
+        New tour.
+    touched: list[int]
+        Endpoints of the changed edges.
+    """
+    order = np.roll( tour.order, -int( rng.integers( len(tour) ) ) )
+    n = len(order)
+
+    i, j, k = np.sort( rng.choice( np.arange( 1, min( n, max_length+1 ) ), size= 3, replace= False ) ).tolist()
+    order = np.concatenate( [ order[:i], order[j:k], order[i:j], order[k:] ] )
+
+    touched = [ order[i-1], order[i], order[i+k-j-1], order[i+k-j], order[k-1], order[k % n] ]
+
+    return Tour( order ), [ int(u) for u in touched ]
+
+def lin_kernighan( graph:nx.DiGraph|CostMatrix, neighbors:np.ndarray= None, max_depth:int= 50,
+                   max_time:float= None, max_kicks:int= None, seed:int= None, initial_solution:list= None,
+                   trace:Trace= None ) -> tuple[list,list[tuple[float,int,float]]]:
+    """
+    Solves (symmetric) TSP with a Lin-Kernighan style variable-depth local search,
+    iterated with segment-local double-bridge kicks (chained Lin-Kernighan) until the time or kick limit is reached.
+
+    Args
+    ----
+    graph: nx.DiGraph | CostMatrix
+        A networkx directed graph or its cost matrix (with symmetric costs).
+    neighbors: np.ndarray
+        Neighbor lists (optional, default: 8 nearest neighbors, see tsp_neighbors.neighbor_lists).
+    max_depth: int
+        Maximum number of 2-opt steps in a move.
+    max_time: float
+        Time limit in seconds (optional).
+    max_kicks: int
+        Limit on the number of kicks (optional, if no limit is given, n kicks are performed).
+    seed: int
+        Random seed (optional).
+    initial_solution: list
+        Initial solution as a permutation of the nodes (optional, default: random permutation, see tsp_construction).
+    trace: Trace
+        Anytime trace of the incumbent cost, where evaluations are the local searches (optional, see tsp_trace).
+
+    Returns
+    -------
+    best_solution: list
+        Best found solution (a permutation of the nodes).
+    history: list[tuple[float,int,float]]
+        Best-so-far cost over time as (elapsed seconds, local searches, best cost) triples (i.e., the points of the trace).
+    """
+    # INIT
+    start = time.perf_counter()
+    rng = np.random.default_rng( seed )
+
+    trace = trace if trace is not None else Trace()
+    trace.start()
+
+    costs = as_cost_matrix( graph )
+    matrix = costs.matrix
+    n = len(costs)
+
+    if neighbors is None:
+        neighbors = neighbor_lists( costs, 8 )
+
+    if max_time is None and max_kicks is None:
+        max_kicks = n
+
+    def stop() -> bool:
+        return max_time is not None and max_time <= time.perf_counter() - start
+
+    # INITIAL SOLUTION
+    best_tour = Tour( costs.indices( initial_solution ) if initial_solution is not None else rng.permutation( n ) )
+
+    _lk_local_search( matrix, best_tour, neighbors, max_depth, np.zeros( n, dtype= bool ), stop )
+    best_cost = best_tour.cost( matrix )
+
+    trace.record( 1, best_cost )
+
+    # KICKS
+    kicks = 0
+
+    while 8 <= n and not stop() and ( max_kicks is None or kicks < max_kicks ):
+        kicks += 1
+
+        tour, touched = _double_bridge( best_tour, rng )
+
+        dont_look_bits = np.ones( n, dtype= bool )
+        dont_look_bits[touched] = False
+
+        _lk_local_search( matrix, tour, neighbors, max_depth, dont_look_bits, stop )
+        cost = tour.cost( matrix )
+
+        if cost < best_cost - 0.001:
+            best_tour, best_cost = tour, cost
+            trace.record( kicks+1, best_cost )
+
+    trace.finish( kicks+1 )
+
+    return costs.nodes_of( best_tour.to_list() ), trace.points
+
+if __name__ == '__main__':
+    print( '─────┬────────────┬────────────┬─────────┬──────────' )
+    print( '   n │ optimal    │ LK         │ gap (%) │ time (s)' )
+    print( '─────┼────────────┼────────────┼─────────┼──────────' )
+
+    for n in [ 50, 100, 150 ]:
+        instance = random_euclidean_matrix( n )
+
+        solution, history = lin_kernighan( instance, max_kicks= 5*n, seed= 0 ) # NOTE: kick-limited (not time-limited), hence reproducible
+        cost = instance.tour_cost( instance.indices( solution ) )
+
+        print( f'{n:4d} │ {RANDOM_EUCLIDEAN_OPTIMA[n]:10.2f} │ {cost:10.2f} │ {100*(cost/RANDOM_EUCLIDEAN_OPTIMA[n]-1):7.2f} │ {history[-1][0]:8.2f}' )
+
+    print( '─────┴────────────┴────────────┴─────────┴──────────' )
@@ -1,17 +1,19 @@
 import networkx as nx
 import random
-import itertools as it
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
+import numpy as np
+import collections
+import typing
+import time
 
 VERBOSITY_LEVEL = 1 # 0: off, 1: relevant, 2: detailed
 
-from tsp_instances import random_euclidean_graph, tetrahedron_instance
-
-# EXERCISES
-# 1. Implement function _improve_by_node_swaps to improve the solution by swapping two nodes.
-# 2. Implement function _improve_by_2_opt to improve the solution by 2-opt.
-# 3. Use operators node relocation, node swap, and 2-opt in a variable neighborhood search (VNS) procedure.
+from tsp_instances import random_euclidean_matrix
+from tsp_matrix import CostMatrix, as_cost_matrix
+from tsp_recorder import TourRecorder
+from tsp_tour import Tour
+from tsp_trace import Trace
 
 def _edgelist( nodes:list[int] ) -> list[tuple[int,int]]:
     """
@@ -29,14 +31,14 @@ def _edgelist( nodes:list[int] ) -> list[tuple[int,int]]:
     """
     return [ (nodes[i-1],nodes[i]) for i in range(1,len(nodes)) ] + [ (nodes[-1],nodes[0]) ]
 
-def _evaluate_solution( graph:nx.DiGraph, solution:list[int] ) -> float:
+def _evaluate_solution( graph:nx.DiGraph|CostMatrix, solution:list[int] ) -> float:
     """
     Returns the cost of the given solution.
     
     Args
     ----
-    graph: nx.DiGraph
-        A networkx digraph (with 'cost' edge attribute).
+    graph: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attribute) or its cost matrix.
     solution: list[int]
         A permutation of the nodes.
 
@@ -45,6 +47,9 @@ def _evaluate_solution( graph:nx.DiGraph, solution:list[int] ) -> float:
     : float
         Sum of the edge costs.
     """
+    if isinstance( graph, CostMatrix ):
+        return graph.tour_cost( graph.indices( solution ) )
+
     return sum( graph.edges[edge]['cost'] for edge in _edgelist(solution) )
 
 def _log( operator:str, objval:float ) -> None:
@@ -82,143 +87,934 @@ def _log_table( config:str= 'm' ) -> None:
         elif c == 'b':        
             print( '─────────────────────┴────────────' )
 
-def _animate_search( graph:nx.DiGraph, solutions:list[list[int]] ) -> None:
+def _animate_search( graph:nx.DiGraph|CostMatrix, recorder:TourRecorder ) -> None:
     """
-    Creates an animation from the given solutions and shows it.
+    Creates an animation from the recorded solutions and shows it (frames are decoded one by one).
+    On a headless machine, use TourRecorder.render to save the animation to a file instead.
     
     Args
     ----
-    graph: nx.DiGraph
-        A networkx digraph (with 'pos' and 'cost' attributes).
-    solutions: list[list[int]]
-        A list of Hamiltonian tours given as permutations of the nodes.
+    graph: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'pos' and 'cost' attributes) or its cost matrix (with coordinates).
+    recorder: TourRecorder
+        Recorded Hamiltonian tours.
     """
     fig, ax = plt.subplots()
 
-    pos = nx.get_node_attributes( graph, 'pos' )
+    drawing = graph.to_graph( edges= False ) if isinstance( graph, CostMatrix ) else graph
+    pos = nx.get_node_attributes( drawing, 'pos' )
+    nodes = recorder.costs.nodes
 
     def update(frame):
+        succ, cost = frame
         ax.clear()    
-        nx.draw_networkx_nodes( graph, pos, node_size= 50, ax= ax )
-        nx.draw_networkx_edges( graph, pos, edgelist= _edgelist(solutions[frame]), ax= ax )
-        plt.xlabel( f'Length: {_evaluate_solution( graph, solutions[frame] ):.2f}' )
+        nx.draw_networkx_nodes( drawing, pos, node_size= 50, ax= ax )
+        nx.draw_networkx_edges( drawing, pos, edgelist= list( zip( nodes, recorder.costs.nodes_of( succ.tolist() ) ) ), ax= ax )
+        plt.xlabel( f'Length: {cost:.2f}' )
 
-    _ = animation.FuncAnimation( fig, update, frames= len(solutions), interval= 500, repeat= False )
+    _ = animation.FuncAnimation( fig, update, frames= recorder.frames, interval= 500, repeat= False, cache_frame_data= False )
 
     plt.show()
 
-def _improve_by_node_relocations( graph:nx.digraph, solution:list ):
+def _relocation_delta( costs:np.ndarray, tour:Tour, v, p ):
     """
-    Tries to improve the given solution by node relocations.
+    Returns the cost change of relocating node v right after node p.
+    Only the (at most six) touched edges are evaluated.
 
     Args
     ----
-    graph: nx.DiGraph
-        A networkx directed graph.
-    solution: list[int]
-        A Hamiltonian tour as a permutation of the nodes.
+    costs: np.ndarray
+        Cost matrix.
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    v: int | np.ndarray
+        Node(s) to relocate.
+    p: int | np.ndarray
+        Node(s) after which the relocated nodes are inserted (p is neither v nor the predecessor of v).
 
     Returns
     -------
-    best_solution: list[int]
-        Best found solution (a permutation of the nodes).
-    best_cost: float
-        Cost of the best solution.
-    improved: bool
-        Whether the solution was improved.
+    : float | np.ndarray
+        Cost of the new tour minus cost of the current tour (for each move).
     """
-    assert len(graph) == len(solution), 'solution does not fit to graph!'
+    a, b, q = tour.pred[v], tour.succ[v], tour.succ[p]
+
+    return costs[a,b] + costs[p,v] + costs[v,q] - costs[a,v] - costs[v,b] - costs[p,q]
+
+def _swap_delta( costs:np.ndarray, tour:Tour, u, v ):
+    """
+    Returns the cost change of swapping nodes u and v (u != v).
+    Only the (at most four) touched edges are evaluated, adjacent nodes are handled as well.
+
+    Args
+    ----
+    costs: np.ndarray
+        Cost matrix.
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    u: int | np.ndarray
+        First node(s).
+    v: int | np.ndarray
+        Second node(s).
+
+    Returns
+    -------
+    : float | np.ndarray
+        Cost of the new tour minus cost of the current tour (for each move).
+    """
+    pu, nu = tour.pred[u], tour.succ[u]
+    pv, nv = tour.pred[v], tour.succ[v]
+
+    general  = costs[pu,v] + costs[v,nu] + costs[pv,u] + costs[u,nv] - costs[pu,u] - costs[u,nu] - costs[pv,v] - costs[v,nv]
+    adjacent = costs[pu,v] + costs[v,u] + costs[u,nv] - costs[pu,u] - costs[u,v] - costs[v,nv] # u directly precedes v
+    wrapped  = costs[pv,u] + costs[u,v] + costs[v,nu] - costs[pv,v] - costs[v,u] - costs[u,nu] # v directly precedes u
+
+    return np.where( nu == v, adjacent, np.where( nv == u, wrapped, general ) )
+
+def _2_opt_delta( costs:np.ndarray, tour:Tour, a, c ):
+    """
+    Returns the cost change of replacing edges (a,succ a) and (c,succ c) with edges (a,c) and (succ a,succ c).
+
+    NOTE: The cost of the reversed path itself is assumed to be unchanged, that is, costs are assumed to be symmetric.
+
+    Args
+    ----
+    costs: np.ndarray
+        Cost matrix (symmetric).
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    a: int | np.ndarray
+        First node(s).
+    c: int | np.ndarray
+        Second node(s) (c is neither a nor a neighbor of a in the tour).
+
+    Returns
+    -------
+    : float | np.ndarray
+        Cost of the new tour minus cost of the current tour (for each move).
+    """
+    b, d = tour.succ[a], tour.succ[c]
+
+    return costs[a,c] + costs[b,d] - costs[a,b] - costs[c,d]
+
+def _or_opt_delta( costs:np.ndarray, tour:Tour, s, length, c, reverse ):
+    """
+    Returns the cost change of moving the segment of the given length starting at node s right after node c
+    (in reversed orientation, if requested).
+
+    Args
+    ----
+    costs: np.ndarray
+        Cost matrix.
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    s: int | np.ndarray
+        First node(s) of the segment.
+    length: int | np.ndarray
+        Length(s) of the segment (1, 2 or 3).
+    c: int | np.ndarray
+        Node(s) after which the segment is inserted (c is neither in the segment nor the predecessor of s).
+    reverse: bool | np.ndarray
+        Whether the segment is reversed.
+
+    Returns
+    -------
+    : float | np.ndarray
+        Cost of the new tour minus cost of the current tour (for each move).
+    """
+    e = _segment_end( tour, s, length )
+    p, f, d = tour.pred[s], tour.succ[e], tour.succ[c]
+
+    return costs[p,f] + np.where( reverse, costs[c,e] + costs[s,d], costs[c,s] + costs[e,d] ) - costs[p,s] - costs[e,f] - costs[c,d]
+
+def _3_opt_delta( costs:np.ndarray, tour:Tour, a, d, e, reverse ):
+    """
+    Returns the cost change of moving the path from node d to node e right after node a
+    (in reversed orientation, if requested), that is, of the 3-opt move
+    replacing edges (a,b), (c,d) and (e,f) with (a,d), (e,b) and (c,f) (or (a,e), (d,b) and (c,f)),
+    where b is the successor of a, c is the predecessor of d, and f is the successor of e.
+
+    NOTE: The other 3-opt reconnections are sequences of 2-opt moves.
+
+    Args
+    ----
+    costs: np.ndarray
+        Cost matrix.
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    a: int | np.ndarray
+        Node(s) after which the path is inserted.
+    d: int | np.ndarray
+        First node(s) of the path (on the path from the successor of a, but not the successor of a).
+    e: int | np.ndarray
+        Last node(s) of the path (on the path from d, but not the predecessor of a).
+    reverse: bool | np.ndarray
+        Whether the path is reversed.
+
+    Returns
+    -------
+    : float | np.ndarray
+        Cost of the new tour minus cost of the current tour (for each move).
+    """
+    b, c, f = tour.succ[a], tour.pred[d], tour.succ[e]
+
+    return costs[c,f] + np.where( reverse, costs[a,e] + costs[d,b], costs[a,d] + costs[e,b] ) - costs[a,b] - costs[c,d] - costs[e,f]
+
+def _segment_end( tour:Tour, s, length ):
+    """
+    Returns the last node(s) of the segment(s) of the given length(s) (at most 3) starting at node(s) s.
+    """
+    s2 = tour.succ[s]
+
+    return np.where( length == 1, s, np.where( length == 2, s2, tour.succ[s2] ) )
+
+def _relocation_candidates( tour:Tour, neighbors:np.ndarray= None, nodes= None ):
+    """
+    Yields the candidate relocation moves as chunks of node arrays (v,p).
+
+    Without neighbor lists, all (node,insertion point) pairs are generated (one chunk per node),
+    otherwise each node is inserted only right after or right before one of its neighbors (a single chunk).
+
+    Args
+    ----
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    neighbors: np.ndarray
+        Neighbor lists (optional).
+    nodes: list[int]
+        Nodes to relocate (optional, default: all nodes).
+
+    Yields
+    ------
+    v: int | np.ndarray
+        Node(s) to relocate.
+    p: np.ndarray
+        Nodes after which the relocated nodes are inserted.
+    """
+    n = len(tour)
+
+    if neighbors is None:
+        for v in ( range(n) if nodes is None else nodes ):
+            p = np.arange(n)
+            yield v, p[(p != v) & (p != tour.pred[v])]
+        return
+
+    nodes = np.arange(n) if nodes is None else np.asarray( nodes )
+
+    v = np.repeat( nodes, 2*neighbors.shape[1] )
+    p = np.concatenate( [ neighbors[nodes], tour.pred[neighbors[nodes]] ], axis= 1 ).ravel() # insert after or before the neighbor
+
+    valid = (p != v) & (p != tour.pred[v])
+    yield v[valid], p[valid]
+
+def _swap_candidates( tour:Tour, neighbors:np.ndarray= None, nodes= None ):
+    """
+    Yields the candidate swap moves as chunks of node arrays (u,v).
+
+    Without neighbor lists, all node pairs are generated (one chunk per node),
+    otherwise each node is swapped only with its neighbors (a single chunk).
+
+    Args
+    ----
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    neighbors: np.ndarray
+        Neighbor lists (optional).
+    nodes: list[int]
+        Nodes to swap (optional, default: all nodes).
+
+    Yields
+    ------
+    u: int | np.ndarray
+        First node(s).
+    v: np.ndarray
+        Second nodes.
+    """
+    n = len(tour)
+
+    if neighbors is None:
+        if nodes is None:
+            for u in range(n-1):
+                yield u, np.arange(u+1,n)
+        else:
+            for u in nodes:
+                v = np.arange(n)
+                yield u, v[v != u]
+        return
+
+    nodes = np.arange(n) if nodes is None else np.asarray( nodes )
+
+    yield np.repeat( nodes, neighbors.shape[1] ), neighbors[nodes].ravel()
+
+def _2_opt_candidates( tour:Tour, neighbors:np.ndarray= None, nodes= None ):
+    """
+    Yields the candidate 2-opt moves as chunks of node arrays (a,c), see _2_opt_delta.
+
+    Without neighbor lists, all moves are generated (one chunk per node),
+    otherwise only moves introducing an edge between a node and one of its neighbors (a single chunk).
+
+    Args
+    ----
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    neighbors: np.ndarray
+        Neighbor lists (optional).
+    nodes: list[int]
+        Nodes whose (incident) edges are replaced (optional, default: all nodes).
+
+    Yields
+    ------
+    a: int | np.ndarray
+        First node(s).
+    c: np.ndarray
+        Second nodes.
+    """
+    n = len(tour)
+
+    if neighbors is None:
+        if nodes is None:
+            for a in range(n-1):
+                c = np.arange(a+1,n)
+                yield a, c[(c != tour.succ[a]) & (c != tour.pred[a])]
+        else:
+            for a in set( nodes ) | set( tour.pred[nodes].tolist() ):
+                c = np.arange(n)
+                yield a, c[(c != a) & (c != tour.succ[a]) & (c != tour.pred[a])]
+        return
+
+    nodes = np.arange(n) if nodes is None else np.asarray( nodes )
+
+    # new edges (a,c) and (succ a,succ c), or (a,c) and (pred a,pred c), where c is a neighbor of a
+    a = np.repeat( nodes, neighbors.shape[1] )
+    c = neighbors[nodes].ravel()
+
+    a = np.concatenate( [ a, tour.pred[a] ] )
+    c = np.concatenate( [ c, tour.pred[c] ] )
+
+    valid = (a != c) & (c != tour.succ[a]) & (c != tour.pred[a])
+    yield a[valid], c[valid]
+
+def _or_opt_candidates( tour:Tour, neighbors:np.ndarray= None, nodes= None ):
+    """
+    Yields the candidate Or-opt moves as chunks of arrays (s,length,c,reverse), see _or_opt_delta.
+
+    Without neighbor lists, all moves are generated (one chunk per node),
+    otherwise the segment is inserted only next to a neighbor of one of its end nodes (a single chunk).
+
+    Args
+    ----
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    neighbors: np.ndarray
+        Neighbor lists (optional).
+    nodes: list[int]
+        First nodes of the segments to move (optional, default: all nodes).
+
+    Yields
+    ------
+    s: np.ndarray
+        First nodes of the segments.
+    length: np.ndarray
+        Lengths of the segments.
+    c: np.ndarray
+        Nodes after which the segments are inserted.
+    reverse: np.ndarray
+        Whether the segments are reversed.
+    """
+    n = len(tour)
+    lengths = [ length for length in (1,2,3) if length <= n-3 ]
+
+    if neighbors is None:
+        for v in ( range(n) if nodes is None else nodes ):
+            c = np.tile( np.arange(n), 2*len(lengths) )
+            length = np.repeat( lengths, 2*n )
+            reverse = np.tile( np.repeat( [ False, True ], n ), len(lengths) ) & (length > 1)
+            s = np.full( len(c), v )
+
+            valid = _or_opt_valid( tour, s, length, c )
+            yield s[valid], length[valid], c[valid], reverse[valid]
+        return
+
+    nodes = np.arange(n) if nodes is None else np.asarray( nodes )
+    k = neighbors.shape[1]
+
+    s, length, c, reverse = [], [], [], []
+    for l in lengths:
+        ns = neighbors[nodes]
+        ne = neighbors[_segment_end( tour, nodes, l )]
+
+        # c -> s, s -> succ c, c -> e, e -> succ c
+        s.append( np.repeat( nodes, 4*k ) )
+        length.append( np.full( 4*k*len(nodes), l ) )
+        c.append( np.concatenate( [ ns, tour.pred[ns], ne, tour.pred[ne] ], axis= 1 ).ravel() )
+        reverse.append( np.tile( np.repeat( [ False, True, True, False ], k ), len(nodes) ) & (1 < l) )
+
+    s, length, c, reverse = np.concatenate( s ), np.concatenate( length ), np.concatenate( c ), np.concatenate( reverse )
+
+    valid = _or_opt_valid( tour, s, length, c )
+    yield s[valid], length[valid], c[valid], reverse[valid]
+
+def _or_opt_valid( tour:Tour, s:np.ndarray, length:np.ndarray, c:np.ndarray ) -> np.ndarray:
+    """
+    Returns whether the segments can be inserted after the given nodes (c is neither in the segment nor the predecessor of s).
+    """
+    s2 = tour.succ[s]
+    s3 = tour.succ[s2]
+
+    return (c != s) & (c != tour.pred[s]) & ((length < 2) | (c != s2)) & ((length < 3) | (c != s3))
+
+def _3_opt_candidates( tour:Tour, neighbors:np.ndarray= None, nodes= None ):
+    """
+    Yields the candidate 3-opt moves as chunks of arrays (a,d,e,reverse), see _3_opt_delta.
+
+    Without neighbor lists, all moves are generated (one chunk per node),
+    otherwise only moves whose new edges (a,d) and (e,b), or (a,e) and (d,b), connect neighbors (a single chunk).
+
+    Args
+    ----
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    neighbors: np.ndarray
+        Neighbor lists (optional).
+    nodes: list[int]
+        Nodes after which the paths are inserted (optional, default: all nodes).
+
+    Yields
+    ------
+    a: np.ndarray
+        Nodes after which the paths are inserted.
+    d: np.ndarray
+        First nodes of the paths.
+    e: np.ndarray
+        Last nodes of the paths.
+    reverse: np.ndarray
+        Whether the paths are reversed.
+    """
+    n = len(tour)
+    pos = tour.pos
+
+    def moves( a:np.ndarray, d:np.ndarray, e:np.ndarray, reverse:np.ndarray ):
+        """ Returns the valid moves: d and e are in this order on the path from succ a to pred a."""
+        b = tour.succ[a]
+        rd, re = (pos[d] - pos[b]) % n, (pos[e] - pos[b]) % n
+
+        valid = (1 <= rd) & (rd <= re) & (re <= n-2)
+        return a[valid], d[valid], e[valid], reverse[valid]
+
+    if neighbors is None:
+        for a in ( range(n) if nodes is None else nodes ):
+            d, e = np.meshgrid( np.arange(n), np.arange(n), indexing= 'ij' )
+            d, e = d.ravel(), e.ravel()
+            yield moves( np.full( 2*len(d), a ), np.concatenate( [ d, d ] ), np.concatenate( [ e, e ] ), np.repeat( [ False, True ], len(d) ) )
+        return
+
+    nodes = np.arange(n) if nodes is None else np.asarray( nodes )
+    k = neighbors.shape[1]
+
+    na = neighbors[nodes][:,:,None]               # (a,d) or (a,e)
+    nb = neighbors[tour.succ[nodes]][:,None,:]    # (e,b) or (d,b)
+
+    a = np.repeat( nodes, k*k )
+    d = np.concatenate( [ np.broadcast_to( na, (len(nodes),k,k) ).ravel(), np.broadcast_to( nb, (len(nodes),k,k) ).ravel() ] )
+    e = np.concatenate( [ np.broadcast_to( nb, (len(nodes),k,k) ).ravel(), np.broadcast_to( na, (len(nodes),k,k) ).ravel() ] )
+
+    yield moves( np.concatenate( [ a, a ] ), d, e, np.repeat( [ False, True ], len(a) ) )
+
+def _2_opt_apply( tour:Tour, a:int, c:int ) -> None:
+    """ Applies the 2-opt move (a,c): reverses the path from succ a to c."""
+    tour.reverse( tour.next( a ), c )
+
+def _or_opt_apply( tour:Tour, s:int, length:int, c:int, reverse:bool ) -> None:
+    """ Applies the Or-opt move (s,length,c,reverse)."""
+    tour.move_segment( s, int( _segment_end( tour, s, length ) ), c, reverse )
+
+def _3_opt_apply( tour:Tour, a:int, d:int, e:int, reverse:bool ) -> None:
+    """ Applies the 3-opt move (a,d,e,reverse)."""
+    tour.move_segment( d, e, a, reverse )
+
+def _relocation_sample( tour:Tour, rng:np.random.Generator ) -> tuple:
+    """ Returns a random relocation move (v,p)."""
+    v = int( rng.integers( len(tour) ) )
+    p = tour.pred[v]
+
+    while p == v or p == tour.pred[v]:
+        p = int( rng.integers( len(tour) ) )
+
+    return v, p
+
+def _swap_sample( tour:Tour, rng:np.random.Generator ) -> tuple:
+    """ Returns a random swap move (u,v)."""
+    u, v = rng.choice( len(tour), size= 2, replace= False ).tolist()
+
+    return u, v
+
+def _2_opt_sample( tour:Tour, rng:np.random.Generator ) -> tuple:
+    """ Returns a random 2-opt move (a,c)."""
+    n, pos, order = len(tour), tour.pos, tour.order
+
+    a = int( rng.integers( n ) )
+    c = int( order[(pos[a] + rng.integers( 2, n-1 )) % n] ) # neither a, nor its successor or predecessor
+
+    return a, c
+
+def _or_opt_sample( tour:Tour, rng:np.random.Generator ) -> tuple:
+    """ Returns a random Or-opt move (s,length,c,reverse)."""
+    n, pos, order = len(tour), tour.pos, tour.order
+
+    length = int( rng.integers( 1, min( 3, n-3 )+1 ) )
+    s = int( rng.integers( n ) )
+    c = int( order[(pos[s] + rng.integers( length, n-1 )) % n] ) # after the segment, but not the predecessor of s
+
+    return s, length, c, bool( 1 < length and rng.random() < 0.5 )
+
+def _3_opt_sample( tour:Tour, rng:np.random.Generator ) -> tuple:
+    """ Returns a random 3-opt move (a,d,e,reverse)."""
+    n, pos, order = len(tour), tour.pos, tour.order
+
+    a = int( rng.integers( n ) )
+    rd, re = np.sort( rng.integers( 1, n-1, size= 2 ) ).tolist() # positions of d and e relative to succ a
+
+    return a, int( order[(pos[a]+1+rd) % n] ), int( order[(pos[a]+1+re) % n] ), bool( rng.random() < 0.5 )
+
+class _Operator( typing.NamedTuple ):
+    """
+    Local search operator: delta cost function, candidate move generator, move application, touched nodes of a move,
+    and random move generator (for shaking).
+    """
+    name: str
+    delta: typing.Callable
+    candidates: typing.Callable
+    apply: typing.Callable
+    touched: typing.Callable
+    sample: typing.Callable
+
+_RELOCATION = _Operator( 'relocate node', _relocation_delta, _relocation_candidates, Tour.relocate,
+                         lambda tour, v, p: [ tour.pred[v], v, tour.succ[v], p, tour.succ[p] ], _relocation_sample )
+_SWAP       = _Operator( 'swap nodes', _swap_delta, _swap_candidates, Tour.swap,
+                         lambda tour, u, v: [ tour.pred[u], u, tour.succ[u], tour.pred[v], v, tour.succ[v] ], _swap_sample )
+_2_OPT      = _Operator( '2-opt', _2_opt_delta, _2_opt_candidates, _2_opt_apply,
+                         lambda tour, a, c: [ a, tour.succ[a], c, tour.succ[c] ], _2_opt_sample )
+_OR_OPT     = _Operator( 'or-opt', _or_opt_delta, _or_opt_candidates, _or_opt_apply,
+                         lambda tour, s, length, c, reverse: [ tour.pred[s], s, _segment_end( tour, s, length ), tour.succ[_segment_end( tour, s, length )], c, tour.succ[c] ], _or_opt_sample )
+_3_OPT      = _Operator( '3-opt', _3_opt_delta, _3_opt_candidates, _3_opt_apply,
+                         lambda tour, a, d, e, reverse: [ a, tour.succ[a], tour.pred[d], d, e, tour.succ[e] ], _3_opt_sample )
+
+OPERATORS = { operator.name : operator for operator in ( _RELOCATION, _SWAP, _2_OPT, _OR_OPT, _3_OPT ) }
+
+def _best_move( delta, costs:np.ndarray, tour:Tour, candidates, first_improvement:bool= False, stats:collections.Counter= None ) -> tuple[tuple,float]:
+    """
+    Returns the best (or the first) improving move among the candidates.
+
+    Args
+    ----
+    delta:
+        Delta cost function of the moves (e.g., _swap_delta).
+    costs: np.ndarray
+        Cost matrix.
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    candidates:
+        Chunks of candidate moves given by arrays.
+    first_improvement: bool
+        Should we return the first improving move?
+    stats: collections.Counter
+        Statistics (optional): the number of evaluated moves is added to 'evaluations'.
+
+    Returns
+    -------
+    best_move: tuple
+        Arguments of the best move (None, if there is no improving move).
+    best_delta: float
+        Cost change of the best move.
+    """
+    best_move, best_delta = None, -0.001
+
+    for move in candidates:
+        deltas = np.asarray( delta( costs, tour, *move ) )
+
+        if stats is not None:
+            stats['evaluations'] += deltas.size
+
+        if deltas.size == 0:
+            continue
+
+        if first_improvement:
+            improving = np.flatnonzero( deltas < best_delta )
+            t = int( improving[0] ) if len(improving) else None
+        else:
+            t = int( np.argmin( deltas ) )
+            t = t if deltas[t] < best_delta else None
+
+        # update best move, if possible
+        if t is not None:
+            best_move, best_delta = tuple( np.broadcast_to( arg, deltas.shape )[t].item() for arg in move ), float( deltas[t] )
 
-    init_cost     = _evaluate_solution( graph, solution )
-    best_cost     = init_cost
-    best_solution = solution[:] # copy !
-    improved      = False
-
-    # check all index permutations
-    for (i,j) in it.permutations( range(1,len(solution)), 2 ): # NOTE : keep 0 in the first place!
-        # relocate node from position i to position j
-        working_solution = solution[:i] + solution[i+1:]                               # "remove" element from position i
-        working_solution = working_solution[:j] + [solution[i]] + working_solution[j:] # "insert" element to position j
-
-        # evaluate solution
-        working_cost = _evaluate_solution( graph, working_solution )
-
-        # update best solution, if possible
-        if working_cost + 0.001 < best_cost:
-            best_cost     = working_cost
-            best_solution = working_solution[:] # copy !
-            improved      = True
-            
             if 2 <= VERBOSITY_LEVEL:
-                _log( '', best_cost )
+                _log( 'delta', best_delta )
 
-    if improved:
-        _log( 'relocate node', best_cost )
-    
-    return best_solution, best_cost, improved
+            if first_improvement:
+                break
 
-def _improve_by_node_swaps( graph:nx.digraph, solution:list ):
+    return best_move, best_delta
+
+def _sweep( operator:_Operator, costs:np.ndarray, tour:Tour, neighbors:np.ndarray, first_improvement:bool, dont_look_bits:np.ndarray, stats:collections.Counter= None, stop:typing.Callable= None ) -> tuple[float,int]:
     """
-    Tries to improve the given solution by node swaps.
+    Improves the tour node by node: for each node whose don't-look bit is off, the first (or best) improving move of the node is applied,
+    and the bits of the nodes touched by the move are turned off. If a node has no improving move, its bit is turned on.
+    Hence, nodes in unchanged regions of the tour are skipped.
 
     Args
     ----
-    graph: nx.DiGraph
-        A networkx directed graph.
-    solution: list[int]
-        A Hamiltonian tour as a permutation of the nodes.
+    operator: _Operator
+        Local search operator.
+    costs: np.ndarray
+        Cost matrix.
+    tour: Tour
+        A Hamiltonian tour over the node indices (modified in place).
+    neighbors: np.ndarray
+        Neighbor lists (optional).
+    first_improvement: bool
+        Should we apply the first improving move of the nodes (instead of the best one)?
+    dont_look_bits: np.ndarray
+        Boolean array of don't-look bits (modified in place).
+    stats: collections.Counter
+        Statistics (optional), see _best_move.
+    stop: typing.Callable
+        Returns whether the sweep should be interrupted, e.g., due to a time limit (optional).
 
     Returns
     -------
-    best_solution: list[int]
-        Best found solution (a permutation of the nodes).
+    total_delta: float
+        Total cost change.
+    nmoves: int
+        Number of applied moves.
+    """
+    queue = collections.deque( np.flatnonzero( ~dont_look_bits ).tolist() )
+    queued = ~dont_look_bits
+
+    total_delta, nmoves = 0.0, 0
+
+    while queue:
+        if stop is not None and stop():
+            break
+
+        v = queue.popleft()
+        queued[v] = False
+
+        move, delta = _best_move( operator.delta, costs, tour, operator.candidates( tour, neighbors, [v] ), first_improvement, stats )
+
+        if move is None:
+            dont_look_bits[v] = True
+            continue
+
+        touched = operator.touched( tour, *move )
+        operator.apply( tour, *move )
+        total_delta += delta
+        nmoves += 1
+
+        for u in touched:
+            dont_look_bits[u] = False
+
+            if not queued[u]:
+                queued[u] = True
+                queue.append( int(u) )
+
+    return total_delta, nmoves
+
+def _as_tour( costs:CostMatrix, solution:list|Tour ) -> Tour:
+    """
+    Returns the given solution as a tour over the node indices.
+    """
+    return solution if isinstance( solution, Tour ) else Tour( costs.indices( solution ) )
+
+def _from_tour( costs:CostMatrix, tour:Tour, solution:list|Tour ) -> list|Tour:
+    """
+    Returns the tour in the same representation as the given solution.
+    """
+    return tour if isinstance( solution, Tour ) else costs.nodes_of( tour.to_list() )
+
+def _improve( operator:_Operator, graph:nx.DiGraph|CostMatrix, solution:list|Tour, neighbors:np.ndarray= None, first_improvement:bool= False, dont_look_bits:np.ndarray= None,
+              stats:collections.Counter= None, stop:typing.Callable= None, log:bool= True ):
+    """
+    Tries to improve the given solution by the given operator (see OPERATORS).
+    Each move is evaluated by its delta cost. By default, only the best move of the whole neighborhood is applied.
+    In first-improvement mode (or if don't-look bits are given), the nodes are processed one by one,
+    and the first (or best) improving move of each node is applied, see _sweep.
+
+    Args
+    ----
+    operator: _Operator
+        Move operator.
+    graph: nx.DiGraph | CostMatrix
+        A networkx directed graph or its cost matrix.
+    solution: list[int] | Tour
+        A Hamiltonian tour as a permutation of the nodes (or as a tour over the node indices, modified in place).
+    neighbors: np.ndarray
+        Neighbor lists to restrict the moves to (optional).
+    first_improvement: bool
+        Should we apply the first improving move of the nodes?
+    dont_look_bits: np.ndarray
+        Boolean array of don't-look bits indexed by node indices (optional, modified in place).
+    stats: collections.Counter
+        Statistics (optional): the number of evaluated moves is added to 'evaluations'.
+    stop: typing.Callable
+        Stopping condition of the sweep (optional).
+    log: bool
+        Should we print a log line on improvement?
+
+    Returns
+    -------
+    best_solution: list[int] | Tour
+        Best found solution (in the same representation as the given solution).
     best_cost: float
         Cost of the best solution.
     improved: bool
         Whether the solution was improved.
     """
-    raise NotImplementedError( 'operator is not implemented')
+    assert len(graph) == len(solution), 'solution does not fit to graph!'
+
+    costs = as_cost_matrix( graph )
+    tour  = _as_tour( costs, solution )
+
+    best_cost = tour.cost( costs.matrix )
+
+    if first_improvement or dont_look_bits is not None:
+        # node by node with don't-look bits
+        if dont_look_bits is None:
+            dont_look_bits = np.zeros( len(tour), dtype= bool )
+
+        delta, nmoves = _sweep( operator, costs.matrix, tour, neighbors, first_improvement, dont_look_bits, stats, stop )
+
+        if nmoves == 0:
+            return solution, best_cost, False
+    else:
+        # best move of the whole neighborhood
+        move, delta = _best_move( operator.delta, costs.matrix, tour, operator.candidates( tour, neighbors ), stats= stats )
+
+        if move is None:
+            return solution, best_cost, False
+
+        operator.apply( tour, *move )
+
+    best_cost += delta
+
+    if log:
+        _log( operator.name, best_cost )
+
+    return _from_tour( costs, tour, solution ), best_cost, True
+
+def _improve_by_node_relocations( graph:nx.DiGraph|CostMatrix, solution:list|Tour, neighbors:np.ndarray= None, first_improvement:bool= False, dont_look_bits:np.ndarray= None ):
+    """ Tries to improve the given solution by node relocations, see _improve."""
+    return _improve( _RELOCATION, graph, solution, neighbors, first_improvement, dont_look_bits )
+
+def _improve_by_node_swaps( graph:nx.DiGraph|CostMatrix, solution:list|Tour, neighbors:np.ndarray= None, first_improvement:bool= False, dont_look_bits:np.ndarray= None ):
+    """ Tries to improve the given solution by node swaps, see _improve."""
+    return _improve( _SWAP, graph, solution, neighbors, first_improvement, dont_look_bits )
+
+def _improve_by_2_opt( graph:nx.DiGraph|CostMatrix, solution:list|Tour, neighbors:np.ndarray= None, first_improvement:bool= False, dont_look_bits:np.ndarray= None ):
+    """ Tries to improve the given solution by 2-opt (symmetric costs are assumed), see _improve."""
+    return _improve( _2_OPT, graph, solution, neighbors, first_improvement, dont_look_bits )
+
+def _improve_by_or_opt( graph:nx.DiGraph|CostMatrix, solution:list|Tour, neighbors:np.ndarray= None, first_improvement:bool= False, dont_look_bits:np.ndarray= None ):
+    """ Tries to improve the given solution by Or-opt, i.e., by moving segments of 1-3 nodes, possibly reversed (symmetric costs are assumed), see _improve."""
+    return _improve( _OR_OPT, graph, solution, neighbors, first_improvement, dont_look_bits )
+
+def _improve_by_3_opt( graph:nx.DiGraph|CostMatrix, solution:list|Tour, neighbors:np.ndarray= None, first_improvement:bool= False, dont_look_bits:np.ndarray= None ):
+    """ Tries to improve the given solution by 3-opt (segment insertion, see _3_opt_delta); neighbor lists are highly recommended, see _improve."""
+    return _improve( _3_OPT, graph, solution, neighbors, first_improvement, dont_look_bits )
+
+def _variable_neighborhood_descent( costs:CostMatrix, tour:Tour, operators:list[_Operator], neighbors:np.ndarray, dont_look_bits:list[np.ndarray],
+                                    stats:collections.Counter, stop:typing.Callable ) -> float:
+    """
+    Improves the tour by variable neighborhood descent (VND): the operators are applied in the given order,
+    and after each improvement, the descent restarts with the first operator.
 
-def _improve_by_2_opt( graph:nx.digraph, solution:list ):
+    Args
+    ----
+    costs: CostMatrix
+        Cost matrix.
+    tour: Tour
+        A Hamiltonian tour over the node indices (modified in place).
+    operators: list[_Operator]
+        Local search operators.
+    neighbors: np.ndarray
+        Neighbor lists (optional).
+    dont_look_bits: list[np.ndarray]
+        Don't-look bits for each operator (None for best-improvement), modified in place.
+    stats: collections.Counter
+        Statistics, see _best_move.
+    stop: typing.Callable
+        Returns whether the search should be interrupted.
+
+    Returns
+    -------
+    cost: float
+        Cost of the tour.
     """
-    Tries to improve the given solution by 2-opt.
+    cost = tour.cost( costs.matrix )
+    k = 0
+
+    while k < len(operators) and not stop():
+        succ, pred = tour.succ.copy(), tour.pred.copy()
+
+        _, cost, improved = _improve( operators[k], costs, tour, neighbors, dont_look_bits[k] is not None, dont_look_bits[k], stats, stop, log= False )
+
+        if not improved:
+            k += 1
+            continue
+
+        # wake up the changed nodes for the other operators
+        changed = (tour.succ != succ) | (tour.pred != pred)
+        for bits in dont_look_bits:
+            if bits is not None:
+                bits[changed] = False
+
+        k = 0
+
+    return cost
+
+def variable_neighborhood_search( graph:nx.DiGraph|CostMatrix, operators:list[str]= ( 'relocate node', 'swap nodes', '2-opt' ),
+                                  max_time:float= None, max_evaluations:int= None, max_iterations:int= None,
+                                  shaking_strength:int= 1, seed:int= None, neighbors:np.ndarray= None, first_improvement:bool= False,
+                                  initial_solution:list= None, draw_progress:bool= False, trace:Trace= None ) -> tuple[list,list[tuple[float,int,float]]]:
+    """
+    Solves TSP with (general) variable neighborhood search (VNS).
+
+    The incumbent is shaken by random moves of the k-th operator (k*shaking_strength moves)
+    and improved by variable neighborhood descent with all operators.
+    If the result is better than the incumbent, it is accepted and k is reset to the first operator, otherwise k is increased (cyclically).
+    The search stops when any of the limits is reached (checked after each operator call and, in first-improvement mode, after each node).
 
     Args
     ----
-    graph: nx.DiGraph
-        A networkx directed graph.
-    solution: list[int]
-        A Hamiltonian tour as a permutation of the nodes.
+    graph: nx.DiGraph | CostMatrix
+        A networkx directed graph or its cost matrix.
+    operators: list[str]
+        Names of the operators in order (see OPERATORS): 'relocate node', 'swap nodes', '2-opt', 'or-opt', '3-opt'.
+    max_time: float
+        Time limit in seconds (optional).
+    max_evaluations: int
+        Limit on the number of evaluated moves (optional).
+    max_iterations: int
+        Limit on the number of shaking iterations (optional, if no limit is given, 100 iterations are performed).
+    shaking_strength: int
+        Number of random moves per neighborhood level in shaking.
+    seed: int
+        Random seed (optional).
+    neighbors: np.ndarray
+        Neighbor lists to restrict the moves to (optional, see tsp_neighbors.neighbor_lists).
+    first_improvement: bool
+        Should we apply first-improvement moves node by node with don't-look bits (instead of best-improvement moves)?
+    initial_solution: list
+        Initial solution as a permutation of the nodes (optional, default: random permutation, see tsp_construction).
+    draw_progress: bool
+        Should we draw the best cost over time?
+    trace: Trace
+        Anytime trace of the incumbent cost, where evaluations are the evaluated moves (optional, see tsp_trace).
 
     Returns
     -------
-    best_solution: list[int]
+    best_solution: list
         Best found solution (a permutation of the nodes).
-    best_cost: float
-        Cost of the best solution.
-    improved: bool
-        Whether the solution was improved.
+    history: list[tuple[float,int,float]]
+        Best-so-far cost over time as (elapsed seconds, evaluated moves, best cost) triples (i.e., the points of the trace).
     """
-    raise NotImplementedError( 'operator is not implemented')
+    # INIT
+    start = time.perf_counter()
+    rng = np.random.default_rng( seed )
+    stats = collections.Counter()
+
+    trace = trace if trace is not None else Trace()
+    trace.start()
+
+    costs = as_cost_matrix( graph )
+    operators = [ OPERATORS[name] for name in operators ]
+
+    if max_time is None and max_evaluations is None and max_iterations is None:
+        max_iterations = 100
+
+    def stop() -> bool:
+        return ( max_time is not None and max_time <= time.perf_counter() - start ) or ( max_evaluations is not None and max_evaluations <= stats['evaluations'] )
+
+    def new_dont_look_bits() -> list[np.ndarray]:
+        return [ np.zeros( len(costs), dtype= bool ) if first_improvement else None for _ in operators ]
+
+    # INITIAL SOLUTION
+    best_tour = Tour( costs.indices( initial_solution ) if initial_solution is not None else rng.permutation( len(costs) ) )
+    best_bits = new_dont_look_bits()
+    best_cost = _variable_neighborhood_descent( costs, best_tour, operators, neighbors, best_bits, stats, stop )
+
+    trace.record( stats['evaluations'], best_cost )
+    _log( 'vnd', best_cost )
+
+    # SEARCH
+    k, iteration = 0, 0
+
+    while not stop() and ( max_iterations is None or iteration < max_iterations ):
+        iteration += 1
+
+        # shaking
+        tour = best_tour.copy()
+        for _ in range( (k+1) * shaking_strength ):
+            operators[k].apply( tour, *operators[k].sample( tour, rng ) )
+
+        bits = [ bits.copy() if bits is not None else None for bits in best_bits ]
+        changed = (tour.succ != best_tour.succ) | (tour.pred != best_tour.pred)
+        for b in bits:
+            if b is not None:
+                b[changed] = False
+
+        # descent
+        cost = _variable_neighborhood_descent( costs, tour, operators, neighbors, bits, stats, stop )
 
-def local_search( graph:nx.DiGraph, draw_progress:bool= True, draw_solutions:bool= False ) -> list[int]:
+        # move or not
+        if cost < best_cost - 0.001:
+            best_tour, best_bits, best_cost = tour, bits, cost
+
+            trace.record( stats['evaluations'], best_cost )
+            _log( f'vns ({operators[k].name})', best_cost )
+
+            k = 0
+        else:
+            k = (k+1) % len(operators)
+
+    trace.finish( stats['evaluations'] )
+    history = trace.points
+
+    # visualize results
+    if draw_progress:
+        plt.xlabel( 'Time (s)' )
+        plt.ylabel( 'Best cost' )
+        plt.step( [ t for (t,_,_) in history ], [ cost for (_,_,cost) in history ], where= 'post' )
+        plt.show()
+
+    return costs.nodes_of( best_tour.to_list() ), history
+
+def local_search( graph:nx.DiGraph|CostMatrix, neighbors:np.ndarray= None, first_improvement:bool= False, initial_solution:list= None, draw_progress:bool= True, draw_solutions:bool= False,
+                  recorder:TourRecorder= None ) -> list[int]:
     """
     Solves TSP with a simple local-search procedure.
 
     NOTE: This is a proof-of-concept implementation.
-    For efficiency, it would be better
-    - to use, for example, doubly linked lists instead of python lists;
-    - not to copy solutions;
-    - to evaluate only the delta cost of the operation instead of the full tour; etc.
+    Operators evaluate only the delta cost of the moves and apply the best one to the tour (stored in arrays),
+    and solutions are recorded as compact diffs for drawing.
 
     Args
     ----
-    graph: nx.DiGraph
-        A networkx directed graph.
+    graph: nx.DiGraph | CostMatrix
+        A networkx directed graph or its cost matrix.
+    neighbors: np.ndarray
+        Neighbor lists to restrict the moves to (optional, see tsp_neighbors.neighbor_lists).
+    first_improvement: bool
+        Should we apply first-improvement moves node by node with don't-look bits (instead of best-improvement moves)?
+    initial_solution: list
+        Initial solution as a permutation of the nodes (optional, default: random permutation, see tsp_construction).
     draw_progress: bool
         Should we draw the cost evolution over iterations?
     draw_solutions: bool
         Should we draw solutions?
+    recorder: TourRecorder
+        Recorder of the solutions, e.g., for rendering them to a file (optional, see tsp_recorder).
 
     Returns
     -------
@@ -226,56 +1022,68 @@ def local_search( graph:nx.DiGraph, draw_progress:bool= True, draw_solutions:boo
         Best found solution (a permutation of the nodes).
     """
     # init
-    solutions = []
+    costs = as_cost_matrix( graph ) # NOTE: built only once
+    cost_history = []
 
-    # create primitive initial solution
-    solution = list( graph.nodes )
-    random.shuffle( solution )
-    solutions.append( solution[:] )
-    
-    _log( 'initial', _evaluate_solution( graph, solution ) )
+    if recorder is None and draw_solutions:
+        recorder = TourRecorder( costs )
+
+    # create primitive initial solution, if not given
+    if initial_solution is not None:
+        solution = list(initial_solution)
+    else:
+        solution = costs.nodes[:]
+        random.shuffle( solution )
+
+    # improve solution (as a tour over the node indices)
+    tour = Tour( costs.indices( solution ) )
+
+    cost_history.append( tour.cost( costs.matrix ) )
+    if recorder is not None:
+        recorder.record( tour, cost_history[-1] )
+
+    _log( 'initial', cost_history[-1] )
+    dont_look_bits = np.zeros( len(tour), dtype= bool ) if first_improvement else None
 
-    # improve solution
     while True:
-        solution, cost, improved = _improve_by_node_relocations( graph, solution )
-        #solution, cost, improved = _improve_by_node_swaps( graph, solution )
-        #solution, cost, improved = _improve_by_2_opt( graph, solution )
+        tour, cost, improved = _improve_by_node_relocations( costs, tour, neighbors, first_improvement, dont_look_bits )
+        #tour, cost, improved = _improve_by_node_swaps( costs, tour, neighbors, first_improvement, dont_look_bits )
+        #tour, cost, improved = _improve_by_2_opt( costs, tour, neighbors, first_improvement, dont_look_bits )
+        #tour, cost, improved = _improve_by_or_opt( costs, tour, neighbors, first_improvement, dont_look_bits )
+        #tour, cost, improved = _improve_by_3_opt( costs, tour, neighbors, first_improvement, dont_look_bits )
 
         if not improved:
             break
 
-        solutions.append( solution[:] )
+        cost_history.append( cost )
+        if recorder is not None:
+            recorder.record( tour, cost )
+
+    solution = costs.nodes_of( tour.to_list() )
 
     # visualize results
     if draw_progress:
         plt.xlabel( 'Iterations' )
         plt.ylabel( 'Cost' )
-        plt.plot( [ _evaluate_solution( graph, solution ) for solution in solutions ] )
+        plt.plot( cost_history )
         plt.show()
 
     if draw_solutions:        
-        _animate_search( graph, solutions )
+        _animate_search( graph, recorder )
 
     return solution
 
 if __name__ == '__main__':
-    graph = random_euclidean_graph( 30 )
+    graph = random_euclidean_matrix( 30 )
     
     _log_table( 'thm' )
 
     local_search( graph, draw_progress= False, draw_solutions= False )
+
+    _log_table( 'm' )
+
+    variable_neighborhood_search( graph, operators= [ 'relocate node', 'swap nodes', '2-opt' ], max_time= 5.0, seed= 0 )
     
     _log_table( 'b' )
 
-# FYI: optimal solution values for random_euclidean_graph(n):
-#
-#                11: 284.65     21: 354.40     31: 488.63     41: 511.48      60: 598.22
-#                12: 296.56     22: 354.44     32: 491.26     42: 512.28      70: 627.60
-#  3: 191.11     13: 297.13     23: 354.45     33: 491.67     43: 515.49      80: 687.79
-#  4: 193.70     14: 297.81     24: 370.30     34: 491.71     44: 522.10      90: 722.55
-#  5: 244.41     15: 300.48     25: 404.66     35: 492.12     45: 522.28     100: 758.56
-#  6: 249.96     16: 305.05     26: 416.62     36: 501.79     46: 534.62     110: 791.41
-#  7: 251.18     17: 306.31     27: 449.81     37: 502.62     47: 536.01     120: 838.39
-#  8: 251.18     18: 324.09     28: 455.02     38: 510.96     48: 547.35     130: 876.79
-#  9: 256.84     19: 332.72     29: 473.85     39: 511.20     49: 549.40     140: 921.44
-# 10: 281.54     20: 346.15     30: 477.89     40: 511.21     50: 558.00     150: 941.17
+# FYI: optimal solution values for random_euclidean_graph(n) are listed in tsp_instances.RANDOM_EUCLIDEAN_OPTIMA
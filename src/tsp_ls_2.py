@@ -1,197 +1,730 @@
 import networkx as nx
-import itertools as it
 import matplotlib.pyplot as plt
-import random
 import numpy as np
 
-from tsp_instances import random_euclidean_graph
-from tsp_ls_1 import _evaluate_solution
+from tsp_instances import random_euclidean_matrix
+from tsp_matrix import CostMatrix, as_cost_matrix
+from tsp_neighbors import neighbor_lists
+from tsp_tour import Tour
+from tsp_ls_1 import _swap_delta, _2_opt_delta, _or_opt_delta, _or_opt_valid, _2_opt_apply, _or_opt_apply
+from progress import NullProgress, ProgressSink, as_progress
+from tsp_trace import Trace
 
-def tabu_search( graph:nx.DiGraph, max_iterations:int= 100, tabu_length:int= 10, draw_progress:bool= False ) -> list:
+def _candidate_pairs( n:int, neighbors:np.ndarray= None ) -> tuple[np.ndarray,np.ndarray]:
+    """
+    Returns the node pairs (u,v), u < v, of the candidate moves.
+
+    Args
+    ----
+    n: int
+        Number of nodes.
+    neighbors: np.ndarray
+        Neighbor lists to restrict the moves to (optional: all pairs, if not given).
+
+    Returns
+    -------
+    u: np.ndarray
+        First nodes.
+    v: np.ndarray
+        Second nodes.
+    """
+    if neighbors is None:
+        return np.triu_indices( n, 1 )
+
+    # move each node only with its neighbors
+    u = np.repeat( np.arange(n), neighbors.shape[1] )
+    v = neighbors.ravel()
+
+    pairs = np.unique( np.minimum( u, v ) * n + np.maximum( u, v ) )
+
+    return pairs // n, pairs % n
+
+def _pairs_by_node( n:int, u:np.ndarray, v:np.ndarray ) -> tuple[np.ndarray,np.ndarray]:
+    """
+    Returns the indices of the pairs containing each node in CSR format:
+    pairs[start[w]:start[w+1]] are the indices of the pairs containing node w.
+    """
+    nodes = np.concatenate( [ u, v ] )
+    pairs = np.tile( np.arange( len(u) ), 2 )
+
+    order = np.argsort( nodes, kind= 'stable' )
+
+    return pairs[order], np.searchsorted( nodes[order], np.arange( n+1 ) )
+
+def tabu_search( graph:nx.DiGraph|CostMatrix, max_iterations:int= 100, tabu_length:int= 10, neighbors:np.ndarray= None, move:str= 'swap',
+                 initial_solution:list= None, draw_progress:bool= False, progress:ProgressSink= None, trace:Trace= None ) -> list:
     """
     Solves TSP with Tabu Search.
 
+    In each iteration, the best non-tabu move is applied (even if it is not improving), where a move is tabu,
+    if the same node pair was moved in the last 'tabu_length' iterations, unless it leads to a new best solution (aspiration).
+
+    Moves are evaluated by their delta costs, which are cached for all candidate pairs.
+    After a swap, only the pairs containing a node with a changed neighbor are re-evaluated
+    (after a 2-opt move, all pairs are re-evaluated, since the reversed path changes direction).
+    The tabu status is stored as an expiry iteration for each candidate pair.
+
     Args
     ----
-    graph: nx.DiGraph
-        A networkx digraph (with 'cost' edge attributes).
+    graph: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or its cost matrix.
     max_iterations: int
         Maximum number of iterations.
     tabu_length: int
-        Length of the tabu list.
+        Length of the tabu list (tabu tenure in iterations).
+    neighbors: np.ndarray
+        Neighbor lists to restrict the moves to (optional, see tsp_neighbors.neighbor_lists).
+    move: str
+        Type of the moves: 'swap' (node swaps) or '2-opt' (for symmetric costs).
+    initial_solution: list
+        Initial solution as a permutation of the nodes (optional, default: nodes in their order, see tsp_construction).
     draw_progress: bool
         Should we draw the cost evolution over iterations?
+    progress: ProgressSink
+        Progress sink receiving 'iteration', 'current', 'best', 'improved' per iteration
+        (optional, default: console table, see progress).
+    trace: Trace
+        Anytime trace of the incumbent cost, where evaluations are the evaluated moves (optional, see tsp_trace).
 
     Returns
     -------
     best_global_solution: list[int]
         Best found solution (a permutation of the nodes).
     """
-    # create primitive initial solution
-    curr_solution = list(graph.nodes)
+    assert move in ( 'swap', '2-opt' ), f'unknown move: {move}'
 
     # init
-    best_global_solution = curr_solution[:]
-    best_global_cost = _evaluate_solution( graph, curr_solution )
+    costs = as_cost_matrix( graph )
+    n = len(costs)
+    progress = as_progress( progress )
+    trace = trace if trace is not None else Trace()
+    trace.start()
 
-    tabu_list = []
-    costs = [ best_global_cost ]
+    # create primitive initial solution, if not given (as a tour over the node indices)
+    curr_solution = Tour( costs.indices( initial_solution ) if initial_solution is not None else np.arange( n ) )
+    curr_cost = curr_solution.cost( costs.matrix )
 
-    # TABU SEARCH
-    print( '─────┬────────────┬─────────────' )
-    print( 'iter │ current    │ best        ' )
-    print( '─────┼────────────┼─────────────' )
+    best_global_solution = curr_solution.to_list()
+    best_global_cost = curr_cost
 
-    for iterations in range(max_iterations):
-        # find best neighbor w.r.t. swaps
-        best_neighbor = None
-        best_neighbor_cost = float('inf')
-        best_swap = None
-
-        for (i,j) in it.combinations(range(len(curr_solution)),2):
-            # check tabu list
-            if (i,j) in tabu_list:
-                continue
+    # candidate moves, their delta costs, and tabu status (iteration until the pair is tabu)
+    u, v = _candidate_pairs( n, neighbors )
+    pairs, start = _pairs_by_node( n, u, v )
+
+    def evaluate( ids ) -> np.ndarray:
+        a, c = u[ids], v[ids]
+
+        if move == 'swap':
+            return _swap_delta( costs.matrix, curr_solution, a, c )
 
-            # swap nodes i and j
-            neighbor_solution = curr_solution[:]
-            neighbor_solution[j], neighbor_solution[i] = curr_solution[i], curr_solution[j]
+        valid = (c != curr_solution.succ[a]) & (c != curr_solution.pred[a])
+        return np.where( valid, _2_opt_delta( costs.matrix, curr_solution, a, c ), np.inf )
 
-            neighbor_cost = _evaluate_solution( graph, neighbor_solution )
+    deltas = evaluate( np.arange( len(u) ) )
+    tabu_until = np.zeros( len(u), dtype= np.int64 )
 
-            # update best NEIGHBOR solution, if possible
-            if neighbor_cost + 0.001 < best_neighbor_cost:
-                best_neighbor = neighbor_solution[:]
-                best_neighbor_cost = neighbor_cost
-                best_swap = (i,j)
+    evaluations = len(u)
+    trace.record( evaluations, best_global_cost )
 
-        if best_neighbor is None:
+    cost_history = [ best_global_cost ]
+
+    # TABU SEARCH
+    for iterations in range(max_iterations):
+        # find best neighbor: non-tabu, or tabu but better than the best solution (aspiration)
+        allowed = (tabu_until <= iterations) | (curr_cost + deltas + 0.001 < best_global_cost)
+        best = int( np.argmin( np.where( allowed, deltas, np.inf ) ) ) if len(deltas) else -1
+
+        if best < 0 or not allowed[best] or deltas[best] == np.inf:
             break # no valid move
 
+        # update current solution
+        a, c = int( u[best] ), int( v[best] )
+
+        if move == 'swap':
+            touched = [ curr_solution.pred[a], a, curr_solution.succ[a], curr_solution.pred[c], c, curr_solution.succ[c] ]
+            curr_solution.swap( a, c )
+        else:
+            curr_solution.reverse( curr_solution.next( a ), c )
+
+        best_neighbor_cost = curr_cost + float( deltas[best] )
+        curr_cost = best_neighbor_cost
+
         # save cost
-        costs.append( best_neighbor_cost )
+        cost_history.append( best_neighbor_cost )
 
-        # adjust tabu list
-        tabu_list.append( best_swap )
+        # adjust tabu status
+        tabu_until[best] = iterations + 1 + tabu_length
 
-        if len(tabu_list) > tabu_length:
-            tabu_list.pop(0)
+        # update delta costs
+        if move == 'swap':
+            ids = np.concatenate( [ pairs[start[w]:start[w+1]] for w in touched ] ) # NOTE: duplicates are cheaper than np.unique
+            deltas[ids] = evaluate( ids )
+            evaluations += len(ids)
+        else:
+            deltas = evaluate( np.arange( len(u) ) )
+            evaluations += len(u)
 
         # update best GLOBAL solution, if possible
-        log_postfix = ''
-        if best_neighbor_cost + 0.001 < best_global_cost:
-            best_global_solution = best_neighbor[:]
+        improved = best_neighbor_cost + 0.001 < best_global_cost
+        if improved:
+            best_global_solution = curr_solution.to_list()
             best_global_cost = best_neighbor_cost
-            log_postfix += ' +'
+            trace.record( evaluations, best_global_cost )
 
-        # update current solution
-        curr_solution = best_neighbor[:]
-
-        print( f'{iterations:4d} │ {best_neighbor_cost:10.2f} │ {best_global_cost:10.2f}{log_postfix}' )
+        progress.report( force= improved, iteration= iterations, current= best_neighbor_cost, best= best_global_cost, improved= improved )
 
-    print( '─────┴────────────┴─────────────' )
+    progress.close()
+    trace.finish( evaluations )
 
     # draw states
     if draw_progress:
         plt.xlabel( 'Iterations' )
         plt.ylabel( 'Cost' )
-        plt.plot( costs )
-        plt.plot( [ min(costs[:i+1]) for i in range(len(costs)) ] )
+        plt.plot( cost_history )
+        plt.plot( np.minimum.accumulate( cost_history ) )
         plt.show()
 
-    return best_global_solution
+    return costs.nodes_of( best_global_solution )
+
+def _random_moves( move:str, tour:Tour, rng:np.random.Generator, size:int ) -> tuple:
+    """
+    Returns a batch of random valid moves of the given type as arrays (invalid draws are dropped).
+
+    Args
+    ----
+    move: str
+        Type of the moves: 'swap', '2-opt', or 'or-opt'.
+    tour: Tour
+        A Hamiltonian tour over the node indices.
+    rng: np.random.Generator
+        Random number generator.
+    size: int
+        Number of draws.
+
+    Returns
+    -------
+    : tuple[np.ndarray]
+        Arguments of the moves, see _swap_delta, _2_opt_delta, and _or_opt_delta.
+    """
+    n = len(tour)
+    u = rng.integers( n, size= size )
+
+    if move == 'swap':
+        return u, (u + rng.integers( 1, n, size= size )) % n
+
+    c = rng.integers( n, size= size )
+
+    if move == '2-opt':
+        valid = (c != u) & (c != tour.succ[u]) & (c != tour.pred[u])
+        return u[valid], c[valid]
+
+    length = rng.integers( 1, min( 3, n-3 )+1, size= size )
+    reverse = (rng.random( size ) < 0.5) & (1 < length)
+
+    valid = _or_opt_valid( tour, u, length, c )
+    return u[valid], length[valid], c[valid], reverse[valid]
 
-def simulated_annealing( graph:nx.DiGraph, temperature:float, cooling_rate:float, draw_progress:bool = False ) -> list[tuple[int,int]]:
+# moves: ( delta cost, apply, minimum number of nodes with a valid move )
+_MOVES = {
+    'swap'   : ( _swap_delta, Tour.swap, 2 ),
+    '2-opt'  : ( _2_opt_delta, _2_opt_apply, 4 ),
+    'or-opt' : ( _or_opt_delta, _or_opt_apply, 4 ),
+}
+
+def simulated_annealing( graph:nx.DiGraph|CostMatrix, temperature:float, cooling_rate:float, move:str= 'swap', min_temperature:float= 0.1,
+                         schedule:str= 'geometric', window:int= 1000, reheat_after:int= None, max_evaluations:int= None, seed:int= None,
+                         silent:bool= False, initial_solution:list= None, draw_progress:bool = False, progress:ProgressSink= None,
+                         trace:Trace= None ) -> list[tuple[int,int]]:
     """
     Solves TSP with Simulated Annealing.
 
+    Random moves are drawn and evaluated (by their delta costs) in batches,
+    and the first accepted move of a batch is applied (the rest of the batch is discarded, since it may be outdated).
+    The batch size adapts to the acceptance rate.
+
+    Temperature schedules:
+    - 'geometric': the temperature is multiplied by the cooling rate after each move;
+    - 'adaptive': the temperature is updated after each window of moves as T *= max( cooling_rate^window, exp( -0.7 T / sigma ) ),
+      where sigma is the standard deviation of the current costs in the window (Huang et al.), that is,
+      the cooling is slow where the cost fluctuates a lot.
+
     Args
     ----
-    graph: nx.DiGraph
-        A networkx digraph (with 'cost' edge attributes).
+    graph: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or its cost matrix.
     temperature: float
         Initial temperature.
     cooling_rate: float
-        Rate at which temperature is decreased.
+        Rate at which temperature is decreased (per move).
+    move: str
+        Type of the moves: 'swap', '2-opt' (for symmetric costs), or 'or-opt'.
+    min_temperature: float
+        The search stops when the temperature falls below this value.
+    schedule: str
+        Temperature schedule: 'geometric' or 'adaptive'.
+    window: int
+        Number of moves in a window (for the adaptive schedule and for logging).
+    reheat_after: int
+        If the best solution is not improved for this many moves, the temperature is reset to
+        the temperature at which the best solution was found (optional).
+    max_evaluations: int
+        Maximum number of evaluated moves (optional).
+    seed: int
+        Random seed (optional).
+    silent: bool
+        Should we suppress logging? (Same as passing progress= NullProgress().)
+    initial_solution: list
+        Initial solution as a permutation of the nodes (optional, default: nodes in their order, see tsp_construction).
     draw_progress: bool
-        Should we draw the cost evolution over iterations?
+        Should we draw the cost evolution over accepted moves?
+    progress: ProgressSink
+        Progress sink receiving 'evaluations', 'temperature', 'current', 'best', 'accepted' per window
+        (optional, default: console table, see progress).
+    trace: Trace
+        Anytime trace of the incumbent cost, where evaluations are the evaluated moves (optional, see tsp_trace).
 
     Returns
     -------
     best_solution: list[int]
         Best found solution (a permutation of the nodes).
     """
-    # create primitive initial solution
-    curr_solution = list(graph.nodes)
-    curr_cost = _evaluate_solution( graph, curr_solution )
+    assert move in _MOVES, f'unknown move: {move}'
+    assert schedule in ( 'geometric', 'adaptive' ), f'unknown schedule: {schedule}'
 
     # init
-    best_solution = curr_solution[:]
+    costs = as_cost_matrix( graph )
+    rng = np.random.default_rng( seed )
+    delta_cost, apply, min_nodes = _MOVES[move]
+    assert min_nodes <= len(costs), f'move {move} needs at least {min_nodes} nodes!'
+    progress = NullProgress() if silent else as_progress( progress )
+    trace = trace if trace is not None else Trace()
+    trace.start()
+
+    # create primitive initial solution, if not given (as a tour over the node indices)
+    curr_solution = Tour( costs.indices( initial_solution ) if initial_solution is not None else np.arange( len(costs) ) )
+    curr_cost = curr_solution.cost( costs.matrix )
+
+    best_solution = None # None: the current solution is the best one (copied only before it gets worse)
     best_cost = curr_cost
+    best_temperature = temperature
+
+    cost_history = [ curr_cost ]
 
-    costs = [ curr_cost ]
+    evaluations = 0
+    last_improvement = 0
+    batch_size = 16
+
+    window_evaluations, window_sum, window_sqsum, window_accepted = 0, 0.0, 0.0, 0
+
+    trace.record( evaluations, best_cost )
 
     # SIMULATED ANNEALING
-    print( '────────────┬────────────┬───────────────' )
-    print( 'temperature │ current    │ best          ' )
-    print( '────────────┼────────────┼───────────────' )
+    while min_temperature < temperature and ( max_evaluations is None or evaluations < max_evaluations ):
+        # batch size: limited by the window, the evaluation limit, and the geometric schedule
+        size = min( batch_size, window - window_evaluations )
+        if max_evaluations is not None:
+            size = min( size, max_evaluations - evaluations )
+        if schedule == 'geometric' and cooling_rate < 1:
+            size = min( size, max( 1, int( np.ceil( np.log( min_temperature / temperature ) / np.log( cooling_rate ) ) ) ) )
+
+        # random moves and their acceptance (evaluated by delta cost)
+        moves = _random_moves( move, curr_solution, rng, size )
+        deltas = delta_cost( costs.matrix, curr_solution, *moves )
+
+        temperatures = temperature * cooling_rate ** np.arange( len(deltas) ) if schedule == 'geometric' else temperature
+        accepted = np.flatnonzero( (deltas < -0.001) | (rng.random( len(deltas) ) < np.exp( -np.maximum( deltas, 0 ) / temperatures )) )
+
+        # number of evaluated moves (up to the first accepted one)
+        nevaluated = int( accepted[0] ) + 1 if len(accepted) else len(deltas)
+
+        window_sum += nevaluated * curr_cost
+        window_sqsum += nevaluated * curr_cost**2
+
+        evaluations += nevaluated
+        window_evaluations += nevaluated
+
+        if schedule == 'geometric':
+            temperature *= cooling_rate ** nevaluated
+
+        # adapt batch size to the acceptance rate
+        batch_size = int( min( 1 << 16, max( 8, 0.5 * batch_size + nevaluated ) ) ) if len(accepted) else min( 1 << 16, 2 * batch_size )
+
+        # apply accepted move
+        if len(accepted):
+            t = accepted[0]
 
-    while temperature > 0.1:
-        # random neighbor: swap random nodes
-        i, j = random.sample(range(len(curr_solution)),2)
-        new_solution = curr_solution[:]
-        new_solution[j] = curr_solution[i]
-        new_solution[i] = curr_solution[j]
+            if best_solution is None and 0 < deltas[t]:
+                best_solution = curr_solution.to_list() # the current solution gets worse
 
-        new_cost = _evaluate_solution( graph, new_solution )
-        delta_cost = new_cost - curr_cost
+            apply( curr_solution, *( arg[t].item() for arg in moves ) )
+            curr_cost += float( deltas[t] )
+            cost_history.append( curr_cost )
+            window_accepted += 1
 
-        # accept?
-        log_postfix = ''
-        if delta_cost < -0.001 or random.random() < np.exp(-delta_cost / temperature):
-            curr_solution = new_solution[:]
-            curr_cost = new_cost
-            costs.append( new_cost )
-            log_postfix += ' +'
+            if curr_cost + 0.001 < best_cost:
+                best_solution, best_cost, best_temperature = None, curr_cost, temperature
+                last_improvement = evaluations
+                trace.record( evaluations, best_cost )
 
-            if new_cost + 0.001 < best_cost:
-                best_solution = new_solution[:]
-                best_cost = new_cost
-                log_postfix += ' +'
+        # reheating
+        if reheat_after is not None and reheat_after <= evaluations - last_improvement:
+            temperature = max( temperature, best_temperature )
+            last_improvement = evaluations
 
-        # adjust temperature
-        temperature *= cooling_rate
+        # end of window
+        if window <= window_evaluations:
+            if schedule == 'adaptive':
+                sigma = np.sqrt( max( window_sqsum / window_evaluations - (window_sum / window_evaluations)**2, 0.0 ) )
+                temperature *= max( cooling_rate ** window_evaluations, np.exp( -0.7 * temperature / sigma ) if 0 < sigma else 0.0 )
 
-        print( f'{temperature:11.3f} │ {curr_cost:10.2f} │ {best_cost:10.2f}{log_postfix}' )
+            progress.report( evaluations= evaluations, temperature= float( temperature ), current= curr_cost, best= best_cost, accepted= window_accepted )
 
-    print( '────────────┴────────────┴───────────────' )
+            window_evaluations, window_sum, window_sqsum, window_accepted = 0, 0.0, 0.0, 0
+
+    progress.close()
+    trace.finish( evaluations )
+
+    if best_solution is None:
+        best_solution = curr_solution.to_list()
 
     # draw states
     if draw_progress:
-        plt.xlabel( 'Iterations' )
+        plt.xlabel( 'Accepted moves' )
         plt.ylabel( 'Cost' )
-        plt.plot( costs )
-        plt.plot( [ min(costs[:i+1]) for i in range(len(costs)) ] )
+        plt.plot( cost_history )
+        plt.plot( np.minimum.accumulate( cost_history ) )
         plt.show()
 
-    return best_solution
+    return costs.nodes_of( best_solution )
+
+def _fitness( costs:np.ndarray, population:np.ndarray ) -> np.ndarray:
+    """
+    Returns the tour costs of the individuals (rows of the population) by a single vectorized gather.
+    """
+    return costs[population,np.roll( population, -1, axis= 1 )].sum( axis= 1 )
+
+def _canonical_keys( population:np.ndarray ) -> list[bytes]:
+    """
+    Returns hashable keys of the individuals: each tour is rotated to start with node 0.
+    """
+    n = population.shape[1]
+    shift = np.argmax( population == 0, axis= 1 )
+
+    canonical = np.take_along_axis( population, (np.arange(n) + shift[:,None]) % n, axis= 1 )
+
+    return [ row.tobytes() for row in canonical ]
+
+def _one_point_crossover( parent1:np.ndarray, parent2:np.ndarray, rng:np.random.Generator ) -> np.ndarray:
+    """
+    Keeps a prefix of the first parent and extends it according to the second parent.
+    """
+    point = rng.integers( len(parent1) )
+    prefix = parent1[:point]
+
+    return np.concatenate( [ prefix, parent2[~np.isin( parent2, prefix )] ] )
+
+def _ox_crossover( parent1:np.ndarray, parent2:np.ndarray, rng:np.random.Generator ) -> np.ndarray:
+    """
+    Order crossover (OX): keeps a random segment of the first parent at its positions,
+    and fills the other positions with the remaining nodes in the order of the second parent (starting after the segment).
+    """
+    n = len(parent1)
+    i, j = np.sort( rng.choice( n+1, size= 2, replace= False ) )
+
+    in_segment = np.zeros( n, dtype= bool )
+    in_segment[parent1[i:j]] = True
+
+    rest = np.roll( parent2, -j )
+    rest = rest[~in_segment[rest]]
+
+    offspring = np.empty_like( parent1 )
+    offspring[i:j] = parent1[i:j]
+    offspring[np.roll( np.arange(n), -j )[:n-(j-i)]] = rest
 
-def genetic_algorithm( graph:nx.DiGraph, population_size:int, generations:int, mutation_rate:float, draw_progress:bool= False ) -> list[tuple[int,int]]:
+    return offspring
+
+def _pmx_crossover( parent1:np.ndarray, parent2:np.ndarray, rng:np.random.Generator ) -> np.ndarray:
+    """
+    Partially mapped crossover (PMX): keeps a random segment of the first parent at its positions,
+    and the other positions are taken from the second parent, where conflicts are resolved by the mapping defined by the segments.
+    """
+    n = len(parent1)
+    i, j = np.sort( rng.choice( n+1, size= 2, replace= False ) )
+
+    position1 = np.argsort( parent1 )
+    in_segment = np.zeros( n, dtype= bool )
+    in_segment[parent1[i:j]] = True
+
+    offspring = parent2.copy()
+    offspring[i:j] = parent1[i:j]
+
+    for k in np.flatnonzero( in_segment[parent2] ):
+        if k < i or j <= k:
+            v = parent2[k]
+            while in_segment[v]:
+                v = parent2[position1[v]]
+
+            offspring[k] = v
+
+    return offspring
+
+def _adjacency( tour:np.ndarray ) -> list[list[int]]:
+    """
+    Returns the (undirected) neighbors of the nodes in the given tour.
+    """
+    adjacency = [ None ] * len(tour)
+
+    for (p,v,s) in zip( np.roll( tour, 1 ).tolist(), tour.tolist(), np.roll( tour, -1 ).tolist() ):
+        adjacency[v] = [ p, s ]
+
+    return adjacency
+
+def _ab_cycles( adjacency1:list[list[int]], adjacency2:list[list[int]], rng:np.random.Generator ) -> list[list[tuple[int,int,int]]]:
+    """
+    Decomposes the edges of the two tours (except the common ones) into AB-cycles,
+    that is, into cycles alternating between the edges of the first and the second tour.
+
+    Returns
+    -------
+    cycles: list[list[tuple[int,int,int]]]
+        AB-cycles as lists of edges (u,v,parent), where parent is 0 for the first tour and 1 for the second one.
+    """
+    n = len(adjacency1)
+
+    remaining = [ [ [ w for w in adjacency1[v] if w not in adjacency2[v] ] for v in range(n) ],
+                  [ [ w for w in adjacency2[v] if w not in adjacency1[v] ] for v in range(n) ] ]
+
+    cycles = []
+
+    for s in rng.permutation( n ).tolist():
+        while remaining[0][s]:
+            # alternating path from s: the edge leaving path[k] comes from the first tour, iff k is even
+            path = [ s ]
+            index = { (s,0) : 0 }
+
+            while True:
+                k = len(path)-1
+                x, parent = path[k], k % 2
+
+                if not remaining[parent][x]:
+                    break
+
+                y = remaining[parent][x].pop( rng.integers( len(remaining[parent][x]) ) )
+                remaining[parent][y].remove( x )
+                path.append( y )
+
+                # close the cycle
+                i = index.get( (y,(k+1) % 2) )
+                if i is None:
+                    index[(y,(k+1) % 2)] = k+1
+                    continue
+
+                cycles.append( [ (path[t],path[t+1],t % 2) for t in range(i,k+1) ] )
+
+                for t in range(i+1,k+2):
+                    if index.get( (path[t],t % 2) ) == t:
+                        del index[(path[t],t % 2)]
+
+                del path[i+1:]
+
+    return cycles
+
+def _eax_crossover( parent1:np.ndarray, parent2:np.ndarray, rng:np.random.Generator, costs:np.ndarray, neighbors:np.ndarray ) -> np.ndarray:
+    """
+    Edge assembly crossover (EAX) with a single random AB-cycle (for symmetric costs):
+    the first-tour edges of the AB-cycle are replaced with its second-tour edges,
+    and the resulting subtours are merged greedily by 2-opt-like reconnections (using neighbor lists).
+    """
+    n = len(parent1)
+
+    adjacency = _adjacency( parent1 )
+    cycles = _ab_cycles( adjacency, _adjacency( parent2 ), rng )
+
+    if not cycles:
+        return parent1.copy()
+
+    # apply E-set
+    for (u,v,parent) in cycles[rng.integers( len(cycles) )]:
+        if parent == 0:
+            adjacency[u].remove( v )
+            adjacency[v].remove( u )
+        else:
+            adjacency[u].append( v )
+            adjacency[v].append( u )
+
+    # subtours
+    subtour = np.full( n, -1, dtype= np.intp )
+    members = []
+
+    for s in range(n):
+        if subtour[s] < 0:
+            members.append( _walk( adjacency, s ) )
+            subtour[members[-1]] = len(members)-1
+
+    # merge subtours: the smallest one with another one by the cheapest exchange of two edges
+    alive = set( range(len(members)) )
+
+    while 1 < len(alive):
+        U = min( alive, key= lambda t: len(members[t]) )
+        best = ( np.inf, None )
+
+        for u in members[U]:
+            candidates = [ v for v in neighbors[u].tolist() if subtour[v] != U ]
+            if not candidates:
+                continue
+
+            for u2 in adjacency[u]:
+                for v in candidates:
+                    for v2 in adjacency[v]:
+                        for (a,b) in ( (v,v2), (v2,v) ):
+                            delta = costs[u,a] + costs[u2,b] - costs[u,u2] - costs[v,v2]
+                            if delta < best[0]:
+                                best = ( delta, (u,u2,v,v2,a,b) )
+
+        if best[1] is None:
+            # no neighbor in other subtours: connect to any other node
+            u = members[U][0]
+            v = int( np.flatnonzero( subtour != U )[0] )
+            best = ( 0, (u,adjacency[u][0],v,adjacency[v][0],v,adjacency[v][0]) )
+
+        (u,u2,v,v2,a,b) = best[1]
+
+        adjacency[u].remove( u2 )
+        adjacency[u2].remove( u )
+        adjacency[v].remove( v2 )
+        adjacency[v2].remove( v )
+
+        adjacency[u].append( a )
+        adjacency[a].append( u )
+        adjacency[u2].append( b )
+        adjacency[b].append( u2 )
+
+        V = subtour[v]
+        subtour[members[U]] = V
+        members[V] = members[V] + members[U]
+        alive.remove( U )
+
+    return np.array( _walk( adjacency, int( parent1[0] ) ), dtype= parent1.dtype )
+
+def _walk( adjacency:list[list[int]], s:int ) -> list[int]:
+    """
+    Returns the nodes of the cycle containing node s (given by the adjacency lists) in the order of a walk.
+    """
+    cycle = [ s ]
+    prev, curr = s, adjacency[s][0]
+
+    while curr != s:
+        cycle.append( curr )
+        prev, curr = curr, ( adjacency[curr][1] if adjacency[curr][0] == prev else adjacency[curr][0] )
+
+    return cycle
+
+def _mating( crossover:str, costs:CostMatrix, rng:np.random.Generator ):
+    """
+    Returns the crossover operator as a function of the two parents.
+    """
+    assert crossover in ( 'one-point', 'ox', 'pmx', 'eax' ), f'unknown crossover: {crossover}'
+
+    if crossover == 'eax':
+        matrix, neighbors = costs.matrix, neighbor_lists( costs, 10 )
+        return lambda parent1, parent2: _eax_crossover( parent1, parent2, rng, matrix, neighbors )
+
+    operator = { 'one-point' : _one_point_crossover, 'ox' : _ox_crossover, 'pmx' : _pmx_crossover }[crossover]
+    return lambda parent1, parent2: operator( parent1, parent2, rng )
+
+def _select( candidates:np.ndarray, fitness:np.ndarray, population_size:int ) -> tuple[np.ndarray,np.ndarray]:
+    """
+    Returns the fittest candidates (without duplicates) in increasing order of cost, and their fitness values.
+    """
+    first_occurrence = {}
+    for t, key in enumerate( _canonical_keys( candidates ) ):
+        first_occurrence.setdefault( key, t )
+
+    unique = np.fromiter( first_occurrence.values(), dtype= np.intp )
+    order = unique[np.argsort( fitness[unique], kind= 'stable' )][:population_size]
+
+    return candidates[order], fitness[order]
+
+def _next_generation( costs:np.ndarray, population:np.ndarray, fitness:np.ndarray, population_size:int, mutation_rate:float, mate, rng:np.random.Generator ) -> tuple[np.ndarray,np.ndarray]:
+    """
+    Returns the next generation of the population (sorted by fitness) and its fitness values.
+
+    Args
+    ----
+    costs: np.ndarray
+        Cost matrix.
+    population: np.ndarray
+        Individuals as rows of node indices (in increasing order of cost).
+    fitness: np.ndarray
+        Costs of the individuals.
+    population_size: int
+        Size of the population.
+    mutation_rate: float
+        Probability of mutation.
+    mate:
+        Crossover operator, see _mating.
+    rng: np.random.Generator
+        Random number generator.
+
+    Returns
+    -------
+    population: np.ndarray
+        Individuals of the next generation.
+    fitness: np.ndarray
+        Costs of the individuals.
+    """
+    n = population.shape[1]
+
+    # from 50% of the fittest population, individuals will mate to produce offsprings
+    nparents = max( 2, len(population) // 2 )
+    first = rng.integers( nparents, size= population_size // 2 )
+    second = (first + rng.integers( 1, nparents, size= len(first) )) % nparents
+
+    offsprings = np.array( [ mate( population[i], population[j] ) for (i,j) in zip( first.tolist(), second.tolist() ) ], dtype= population.dtype ).reshape( -1, n )
+
+    # mutation: swap two random nodes
+    mutated = np.flatnonzero( rng.random( len(offsprings) ) < mutation_rate )
+    i = rng.integers( n, size= len(mutated) )
+    j = (i + rng.integers( 1, n, size= len(mutated) )) % n
+    offsprings[mutated,i], offsprings[mutated,j] = offsprings[mutated,j], offsprings[mutated,i]
+
+    # the fittest 50% of the population (including the 10% elite) and the offsprings compete (without duplicates)
+    candidates = np.concatenate( [ population[:nparents], offsprings ] )
+    candidate_fitness = np.concatenate( [ fitness[:nparents], _fitness( costs, offsprings ) ] )
+
+    return _select( candidates, candidate_fitness, population_size )
+
+def genetic_algorithm( graph:nx.DiGraph|CostMatrix, population_size:int, generations:int, mutation_rate:float, crossover:str= 'one-point', seed:int= None,
+                       initial_solution:list= None, draw_progress:bool= False, progress:ProgressSink= None, trace:Trace= None ) -> list[tuple[int,int]]:
     """
     Solves TSP with Genetic Algorithm.
 
+    The population is stored as a 2-D array (one permutation of the node indices per row) with cached fitness values,
+    new offsprings are evaluated by a single vectorized gather, and duplicates are detected by hashing (up to rotation).
+
     Args
     ----
-    graph: nx.DiGraph
-        A networkx digraph (with 'cost' edge attributes).
+    graph: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or its cost matrix.
     population_size: int
         Size of the population.
     generations: int
         Number of generations.
     mutation_rate: float
         Probability of mutation.
+    crossover: str
+        Crossover operator: 'one-point' (prefix of the first parent, default), 'ox' (order crossover),
+        'pmx' (partially mapped crossover), or 'eax' (edge assembly crossover, for symmetric costs).
+    seed: int
+        Random seed (optional).
+    initial_solution: list
+        An individual of the initial population as a permutation of the nodes (optional, see tsp_construction).
     draw_progress: bool
         Should we draw the cost evolution over iterations?
+    progress: ProgressSink
+        Progress sink receiving 'generation', 'best', 'worst' per generation (optional, default: console table, see progress).
+    trace: Trace
+        Anytime trace of the incumbent cost, where evaluations are the evaluated individuals (optional, see tsp_trace).
 
     Returns
     -------
@@ -199,52 +732,43 @@ def genetic_algorithm( graph:nx.DiGraph, population_size:int, generations:int, m
         Best found solution (a permutation of the nodes).
     """
     # init
-    population = [ list(graph.nodes) for _ in range(population_size) ]
-    
-    for solution in population:
-        random.shuffle( solution )
+    costs = as_cost_matrix( graph )
+    matrix = costs.matrix
+    n = len(costs)
+    rng = np.random.default_rng( seed )
+    progress = as_progress( progress )
+    trace = trace if trace is not None else Trace()
+    trace.start()
+
+    mate = _mating( crossover, costs, rng )
+
+    population = rng.permuted( np.tile( np.arange(n), (population_size,1) ), axis= 1 ) # individuals as node indices
 
-    population.sort( key= lambda individual: _evaluate_solution( graph, individual ) )
+    if initial_solution is not None:
+        population[0] = costs.indices( initial_solution )
+
+    population, fitness = _select( population, _fitness( matrix, population ), population_size )
+
+    evaluations = population_size
+    trace.record( evaluations, fitness[0] )
 
     best_costs  = []
     worst_costs = []
 
     # GENETIC ALGORITHM
-    print( '───────────┬────────────┬───────────' )
-    print( 'generation │ best       │ worst     ' )
-    print( '───────────┼────────────┼───────────' )
-
-    for generation in range(generations):        
-        # elitism: 10% of the fittest population goes to the next generation
-        new_population = population[:population_size//10]
-
-        # from 50% of the fittest population, individuals will mate to produce offsprings
-        for _ in range( population_size // 2 ):
-            # crossover: keep prefix of the first parent and extend according to the second parent
-            parent1, parent2 = random.sample( population[:population_size//2], 2 )
-            crossover_point = random.randint( 0, len(parent1)-1 )
-            offspring = parent1[:crossover_point] + [gene for gene in parent2 if gene not in parent1[:crossover_point]]
-
-            # mutation: swap two random nodes
-            if random.random() < mutation_rate:
-                i, j = random.sample( range(len(solution)), 2 )
-                offspring[i], offspring[j] = offspring[j], offspring[i]
-
-            # store individuals in population
-            if parent1 not in new_population: new_population.append( parent1 )
-            if parent2 not in new_population: new_population.append( parent2 )
-            if offspring not in new_population: new_population.append( offspring )
-        
-        # adjust population
-        new_population.sort( key= lambda individual: _evaluate_solution( graph, individual ) )
-        population = new_population[:population_size]
-    
-        best_costs.append( _evaluate_solution( graph, population[0] ) )
-        worst_costs.append( _evaluate_solution( graph, population[-1] ) )
+    for generation in range(generations):
+        population, fitness = _next_generation( matrix, population, fitness, population_size, mutation_rate, mate, rng )
+
+        evaluations += population_size // 2 # offsprings
+        trace.record( evaluations, fitness[0] )
+
+        best_costs.append( float( fitness[0] ) )
+        worst_costs.append( float( fitness[-1] ) )
 
-        print( f'{generation:10d} │ {best_costs[-1]:10.2f} │ {worst_costs[-1]:10.2f}' )
+        progress.report( force= 1 < len(best_costs) and best_costs[-1] < best_costs[-2], generation= generation, best= best_costs[-1], worst= worst_costs[-1] )
 
-    print( '───────────┴────────────┴───────────' )
+    progress.close()
+    trace.finish( evaluations )
 
     if draw_progress:
         plt.xlabel( 'Generations' )
@@ -253,12 +777,12 @@ def genetic_algorithm( graph:nx.DiGraph, population_size:int, generations:int, m
         plt.plot( best_costs )
         plt.show()
 
-    return population[0]
+    return costs.nodes_of( population[0].tolist() )
 
 if __name__ == '__main__':
-    graph = random_euclidean_graph( 30 )
+    graph = random_euclidean_matrix( 30 )
     
     tabu_search( graph, tabu_length= len(graph)//5, max_iterations= 10*len(graph), draw_progress= True )
-    # simulated_annealing( graph, temperature= 10000, cooling_rate= 0.99, draw_progress= True )
-    # genetic_algorithm( graph, population_size= len(graph), generations= 10*len(graph), mutation_rate= 0.1, draw_progress= True )
+    # simulated_annealing( graph, temperature= 100, cooling_rate= 0.9999, move= '2-opt', draw_progress= True )
+    # genetic_algorithm( graph, population_size= len(graph), generations= 10*len(graph), mutation_rate= 0.1, crossover= 'ox', draw_progress= True )
     
\ No newline at end of file
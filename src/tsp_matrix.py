@@ -0,0 +1,377 @@
+import networkx as nx
+import numpy as np
+import os
+import tempfile
+import weakref
+
+class CostMatrix:
+    """
+    Compact representation of a TSP instance: a dense cost matrix with a node-index mapping.
+
+    Solvers work with node indices (0,...,n-1) internally and translate them to nodes only at the boundaries.
+
+    Attributes
+    ----------
+    matrix: np.ndarray | CoordinateDistances
+        Cost matrix: matrix[i,j] is the cost of the edge from nodes[i] to nodes[j].
+        If it is built from coordinates lazily, it is computed on first access.
+        It can also be a memory-mapped array (see memmap_distances), or computed on the fly (see CoordinateDistances).
+    nodes: list
+        Nodes of the instance: nodes[i] is the node with index i.
+    index: dict
+        Indices of the nodes: index[nodes[i]] == i.
+    coords: np.ndarray
+        Coordinates of the nodes as an (n,2) array, or None if unknown.
+    """
+    def __init__( self, matrix:np.ndarray, nodes:list= None, coords:np.ndarray= None, dtype:np.dtype= np.float64 ):
+        self._matrix:np.ndarray = matrix
+        self.nodes:list = list(nodes) if nodes is not None else list(range(len(matrix) if matrix is not None else len(coords)))
+        self.index:dict = { node : i for i, node in enumerate(self.nodes) }
+        self.coords:np.ndarray = coords
+        self.dtype:np.dtype = matrix.dtype if matrix is not None else dtype
+
+    @property
+    def matrix( self ) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix = euclidean_distances( self.coords, dtype= self.dtype )
+
+        return self._matrix
+
+    @classmethod
+    def from_graph( cls, graph:nx.DiGraph, dtype:np.dtype= np.float64 ) -> 'CostMatrix':
+        """
+        Builds the cost matrix of the given graph. Missing edges get infinite cost.
+
+        Args
+        ----
+        graph: nx.DiGraph
+            A networkx digraph (with 'cost' edge attributes and optional 'pos' node attributes).
+        dtype: np.dtype
+            Data type of the matrix (e.g., np.float32 or np.float64).
+
+        Returns
+        -------
+        : CostMatrix
+            Cost matrix of the graph.
+        """
+        nodes = list(graph.nodes)
+        index = { node : i for i, node in enumerate(nodes) }
+
+        matrix = np.full( (len(nodes),len(nodes)), np.inf, dtype= dtype )
+        np.fill_diagonal( matrix, 0 )
+
+        for (u,v,cost) in graph.edges( data= 'cost' ):
+            matrix[index[u],index[v]] = cost
+
+        pos = nx.get_node_attributes( graph, 'pos' )
+        coords = np.array( [ pos[node] for node in nodes ], dtype= np.float64 ) if len(pos) == len(nodes) else None
+
+        return cls( matrix, nodes, coords )
+
+    @classmethod
+    def from_coordinates( cls, coords, nodes:list= None, dtype:np.dtype= np.float64, lazy:bool= False,
+                          storage:str= 'dense', path:str= None, scale:float= 1.0, metric= None ) -> 'CostMatrix':
+        """
+        Builds the matrix of Euclidean distances of the given points.
+
+        Storage of the matrix:
+        - 'dense': in memory (n^2 entries);
+        - 'memmap': in a file mapped into memory, which is paged in on demand (see memmap_distances);
+        - 'coordinates': nothing is stored, distances are computed on the fly (see CoordinateDistances).
+        For the latter two, the distances can be quantized to an integer dtype (e.g., np.int32 or np.uint16) with a scale.
+
+        Args
+        ----
+        coords: array-like
+            Coordinates of the points as an (n,2) array.
+        nodes: list
+            Nodes corresponding to the points (optional, default: 0,...,n-1).
+        dtype: np.dtype
+            Data type of the matrix (e.g., np.float32 or np.float64).
+        lazy: bool
+            Should we postpone computing the distances until the matrix is first accessed? (For dense storage.)
+        storage: str
+            Storage of the matrix: 'dense', 'memmap', or 'coordinates'.
+        path: str
+            Path of the file of the memory-mapped matrix (optional, default: a temporary file).
+        scale: float
+            Distances are multiplied by this factor (for memmap and coordinates storage).
+        metric:
+            Distance function of two broadcastable coordinate arrays (optional, default: Euclidean; for memmap and coordinates storage).
+
+        Returns
+        -------
+        : CostMatrix
+            Distance matrix of the points.
+        """
+        assert storage in ( 'dense', 'memmap', 'coordinates' ), f'unknown storage: {storage}'
+
+        coords = np.asarray( coords, dtype= np.float64 )
+
+        if storage == 'coordinates':
+            return cls( CoordinateDistances( coords, dtype= dtype, scale= scale, metric= metric ), nodes, coords )
+
+        if storage == 'memmap':
+            return cls( memmap_distances( coords, path, dtype= dtype, scale= scale, metric= metric ), nodes, coords )
+
+        return cls( None if lazy else euclidean_distances( coords, dtype= dtype ), nodes, coords, dtype= dtype )
+
+    def __len__( self ) -> int:
+        return len(self.nodes)
+
+    def cost( self, u, v ) -> float:
+        """
+        Returns the cost of edge (u,v) given by nodes.
+        """
+        return float( self.matrix[self.index[u],self.index[v]] )
+
+    def indices( self, solution:list ) -> np.ndarray:
+        """
+        Returns the index array of the given sequence of nodes.
+        """
+        return np.fromiter( ( self.index[node] for node in solution ), dtype= np.intp, count= len(solution) )
+
+    def nodes_of( self, order ) -> list:
+        """
+        Returns the sequence of nodes of the given index array.
+        """
+        return [ self.nodes[i] for i in order ]
+
+    def tour_cost( self, order ) -> float:
+        """
+        Returns the cost of the Hamiltonian tour given as an index array.
+        """
+        order = np.asarray( order )
+
+        return float( self.matrix[order,np.roll(order,-1)].sum() )
+
+    def to_graph( self, edges:bool= True ) -> nx.DiGraph:
+        """
+        Converts the matrix to a networkx digraph.
+
+        NOTE: This builds n(n-1) edges; call it only when a networkx graph is really needed (e.g., for MIP models).
+
+        Args
+        ----
+        edges: bool
+            Should we add the edges? (If not, only the nodes are added, e.g., for drawing.)
+
+        Returns
+        -------
+        graph: nx.DiGraph
+            Directed graph with node attributes 'pos' (if known) and edge attributes 'cost'.
+        """
+        graph = nx.DiGraph()
+
+        for i, node in enumerate(self.nodes):
+            if self.coords is not None:
+                graph.add_node( node, pos= tuple( self.coords[i].tolist() ) )
+            else:
+                graph.add_node( node )
+
+        if edges:
+            for i, u in enumerate(self.nodes):
+                row = self.matrix[i].tolist()
+                graph.add_weighted_edges_from( ( (u,v,row[j]) for j, v in enumerate(self.nodes) if j != i and row[j] < float('inf') ), weight= 'cost' )
+
+        return graph
+
+def euclidean_distances( coords:np.ndarray, dtype:np.dtype= np.float64, chunk_size:int= 1024 ) -> np.ndarray:
+    """
+    Returns the matrix of pairwise Euclidean distances of the given points.
+    Distances are computed by NumPy broadcasting in row chunks to keep temporary arrays small.
+
+    Args
+    ----
+    coords: np.ndarray
+        Coordinates of the points as an (n,2) array.
+    dtype: np.dtype
+        Data type of the matrix.
+    chunk_size: int
+        Number of rows computed at once.
+
+    Returns
+    -------
+    matrix: np.ndarray
+        An (n,n) distance matrix.
+    """
+    n = len(coords)
+    matrix = np.empty( (n,n), dtype= dtype )
+
+    for start in range(0,n,chunk_size):
+        diff = coords[start:start+chunk_size,None,:] - coords[None,:,:]
+        matrix[start:start+chunk_size] = np.sqrt( np.einsum( 'ijk,ijk->ij', diff, diff ) )
+
+    return matrix
+
+def _euclidean( a:np.ndarray, b:np.ndarray ) -> np.ndarray:
+    """
+    Returns the Euclidean distances of the (broadcastable) coordinate arrays.
+    """
+    diff = a - b
+    return np.sqrt( np.einsum( '...k,...k->...', diff, diff ) )
+
+class CoordinateDistances:
+    """
+    Distance matrix computed on the fly from coordinates (O(n) memory instead of O(n^2)).
+
+    It supports the indexing used by the solvers on cost matrices: matrix[i,j] with integers or broadcastable index arrays,
+    rows matrix[i] and matrix[i:j], and columns matrix[:,j]. Each access computes the distances (from scratch).
+
+    Args
+    ----
+    coords: np.ndarray
+        Coordinates of the points as an (n,2) array.
+    dtype: np.dtype
+        Data type of the distances: a float type, or an integer type (distances are rounded).
+    scale: float
+        Distances are multiplied by this factor (e.g., before rounding).
+    metric:
+        Distance function of two broadcastable coordinate arrays (optional, default: Euclidean).
+    """
+    ndim = 2
+
+    def __init__( self, coords:np.ndarray, dtype:np.dtype= np.float64, scale:float= 1.0, metric= None ):
+        self.coords:np.ndarray = np.asarray( coords, dtype= np.float64 )
+        self.dtype:np.dtype = np.dtype( dtype )
+        self.scale:float = scale
+        self.metric = metric if metric is not None else _euclidean
+
+    @property
+    def shape( self ) -> tuple[int,int]:
+        return ( len(self.coords), len(self.coords) )
+
+    def __len__( self ) -> int:
+        return len(self.coords)
+
+    def __getitem__( self, key ):
+        rows, cols = key if isinstance( key, tuple ) else ( key, slice(None) )
+        n = len(self.coords)
+
+        i = np.arange(n)[rows] if isinstance( rows, slice ) else np.asarray( rows )
+        j = np.arange(n)[cols] if isinstance( cols, slice ) else np.asarray( cols )
+
+        # slices give outer products (as in NumPy)
+        if isinstance( rows, slice ):
+            i = i.reshape( i.shape + (1,) * j.ndim )
+        elif isinstance( cols, slice ):
+            i = i.reshape( i.shape + (1,) )
+
+        distances = _quantize( self.metric( self.coords[i], self.coords[j] ), self.dtype, self.scale )
+
+        return distances[()] if distances.ndim == 0 else distances
+
+    def __array__( self, dtype= None, copy= None ) -> np.ndarray:
+        matrix = self[:]
+        return matrix if dtype is None else matrix.astype( dtype )
+
+def _quantize( distances:np.ndarray, dtype:np.dtype, scale:float ) -> np.ndarray:
+    """
+    Returns the scaled distances converted to the data type (rounded and clipped, if it is an integer type).
+    """
+    if scale != 1.0:
+        distances = distances * scale
+
+    if np.issubdtype( dtype, np.integer ):
+        return np.clip( np.rint( distances ), 0, np.iinfo( dtype ).max ).astype( dtype )
+
+    return distances.astype( dtype, copy= False )
+
+def memmap_distances( coords:np.ndarray, path:str= None, dtype:np.dtype= np.float32, scale:float= 1.0, metric= None, chunk_size:int= 1024 ) -> np.memmap:
+    """
+    Writes the matrix of pairwise distances of the given points to a '.npy' file in row chunks,
+    and returns it memory-mapped (read-only), i.e., the operating system pages the accessed rows in and out on demand.
+    The file can be reopened by np.load( path, mmap_mode= 'r' ).
+
+    Args
+    ----
+    coords: np.ndarray
+        Coordinates of the points as an (n,2) array.
+    path: str
+        Path of the file (optional, default: a temporary file, which is deleted when the returned matrix
+        and all of its views are garbage collected, or at exit; a given file is kept).
+    dtype: np.dtype
+        Data type of the matrix: a float type, or an integer type (distances are rounded), e.g., np.uint16 takes 2 bytes per entry.
+    scale: float
+        Distances are multiplied by this factor (e.g., before rounding).
+    metric:
+        Distance function of two broadcastable coordinate arrays (optional, default: Euclidean).
+    chunk_size: int
+        Number of rows computed at once.
+
+    Returns
+    -------
+    matrix: np.memmap
+        An (n,n) memory-mapped distance matrix.
+    """
+    temporary = path is None
+
+    if temporary:
+        handle, path = tempfile.mkstemp( suffix= '.npy' )
+        os.close( handle )
+
+    try:
+        n = len(coords)
+        distances = CoordinateDistances( coords, dtype= dtype, scale= scale, metric= metric )
+
+        matrix = np.lib.format.open_memmap( path, mode= 'w+', dtype= distances.dtype, shape= (n,n) )
+
+        for start in range(0,n,chunk_size):
+            matrix[start:start+chunk_size] = distances[start:start+chunk_size]
+
+        matrix.flush()
+        del matrix
+
+        matrix = np.load( path, mmap_mode= 'r' )
+    except BaseException:
+        if temporary:
+            _remove( path )
+        raise
+
+    if temporary:
+        weakref.finalize( matrix, _remove, path ) # NOTE: views keep the matrix (their base) alive
+
+    return matrix
+
+def _remove( path:str ) -> None:
+    """
+    Deletes the given file, if it exists.
+    """
+    try:
+        os.remove( path )
+    except FileNotFoundError:
+        pass
+
+def as_cost_matrix( instance:nx.DiGraph|CostMatrix, dtype:np.dtype= np.float64 ) -> CostMatrix:
+    """
+    Returns the cost matrix of the given instance (the instance itself, if it is already a cost matrix).
+
+    Args
+    ----
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or a cost matrix.
+    dtype: np.dtype
+        Data type of the matrix, if it has to be built.
+
+    Returns
+    -------
+    : CostMatrix
+        Cost matrix of the instance.
+    """
+    return instance if isinstance( instance, CostMatrix ) else CostMatrix.from_graph( instance, dtype= dtype )
+
+def as_graph( instance:nx.DiGraph|CostMatrix ) -> nx.DiGraph:
+    """
+    Returns the networkx digraph of the given instance (the instance itself, if it is already a graph).
+
+    Args
+    ----
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or a cost matrix.
+
+    Returns
+    -------
+    : nx.DiGraph
+        Directed graph with edge attributes 'cost'.
+    """
+    return instance.to_graph() if isinstance( instance, CostMatrix ) else instance
@@ -5,6 +5,9 @@ import matplotlib.pyplot as plt
 from ortools.math_opt.python import mathopt
 from time import perf_counter
 
+from cut_pool import CutPool
+from tsp_matrix import CostMatrix, as_graph
+
 # EXERCISES
 # 1.1 Implement the Gravish-Graves formulation in function solve_tsp_gg.
 # 1.2 Implement the branch-and-cut procedure for the Gravish-Graves formulation.
@@ -56,7 +59,59 @@ def _log( model:mathopt.Model, result:mathopt.SolveResult, *, ncuts:int= 0, buil
     ]
     print( ' │ '.join(buffer) )
 
-def solve_tsp_dfj( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, draw_instance:bool= False, draw_solution:bool= False ) -> None:
+class EdgeIndex:
+    """
+    Index of the edge variables by their tails (a map of out-edges for each node),
+    to collect the variables of the edges induced by a node subset S in O(|S|·min(|S|,degree)) time
+    (instead of scanning all edges).
+
+    Args
+    ----
+    graph: nx.DiGraph
+        Digraph.
+    x: dict
+        Variables of the edges.
+    """
+    def __init__( self, graph:nx.DiGraph, x:dict ):
+        self.out:dict[object,dict] = { u : {} for u in graph.nodes }
+
+        for ((u,v),var) in x.items():
+            self.out[u][v] = var
+
+    def induced( self, subset:set ) -> list[mathopt.Variable]:
+        """
+        Returns the variables of the edges induced by the given node subset.
+        """
+        subset = subset if isinstance( subset, (set,frozenset) ) else set( subset )
+        vars = []
+
+        for u in subset:
+            out = self.out[u]
+
+            if len(subset) < len(out):
+                vars.extend( out[v] for v in subset if v in out )
+            else:
+                vars.extend( var for (v,var) in out.items() if v in subset )
+
+        return vars
+
+    def subtour_elimination( self, subset:set ) -> mathopt.BoundedLinearExpression:
+        """
+        Returns the subtour-elimination constraint x(S) <= |S|-1 for the given node subset (None, if S induces no edge).
+        """
+        vars = self.induced( subset )
+
+        return mathopt.fast_sum( vars ) <= len(subset)-1 if 1 <= len(vars) else None # at least one variable is needed for a constraint
+
+    def subtour_eliminations( self, subsets ) -> list[mathopt.BoundedLinearExpression]:
+        """
+        Returns the subtour-elimination constraints for the given node subsets (subsets inducing no edge are skipped).
+        """
+        constraints = ( self.subtour_elimination( subset ) for subset in subsets )
+
+        return [ constraint for constraint in constraints if constraint is not None ]
+
+def solve_tsp_dfj( graph:nx.DiGraph|CostMatrix, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, draw_instance:bool= False, draw_solution:bool= False ) -> None:
     """
     Solves TSP as a MIP (DFJ formulation) with **OR-Tools MathOpt**.
     All subtour-elimination constraints are added to the model in advance.
@@ -67,8 +122,8 @@ def solve_tsp_dfj( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.Sol
 
     Args
     ----
-    graph: nx.DiGraph
-        A digraph where each edge has the attribute 'cost'.
+    graph: nx.DiGraph | CostMatrix
+        A digraph where each edge has the attribute 'cost' (or its cost matrix).
     solver_type: mathopt.SolverType
         The underlying solver to use (e.g., GSCIP, HIGHS, GUROBI).
     draw_instance: bool
@@ -76,6 +131,8 @@ def solve_tsp_dfj( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.Sol
     draw_solution:
         Should we draw the optimal Hamiltonian tour?
     """
+    graph = as_graph( graph ) # NOTE: the model needs the edges anyway
+
     if draw_instance:
         _draw_graph( graph )
 
@@ -101,11 +158,8 @@ def solve_tsp_dfj( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.Sol
         """ Returns an iterator for the non-trivial node subsets of the given graph."""
         return it.chain.from_iterable( it.combinations( graph.nodes, size ) for size in range(2,graph.number_of_nodes() ) )
 
-    for subset in nodesets(graph):
-        vars = [ x[(u,v)] for (u,v) in graph.edges if u in subset and v in subset ]
-
-        if 1 <= len(vars): # at least one variable is needed for a constraint
-            model.add_linear_constraint( sum(vars) <= len(subset)-1 )
+    for constraint in EdgeIndex( graph, x ).subtour_eliminations( nodesets(graph) ):
+        model.add_linear_constraint( constraint )
 
     build_end = perf_counter()
 
@@ -117,15 +171,36 @@ def solve_tsp_dfj( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.Sol
     if draw_solution and result.termination.reason in [mathopt.TerminationReason.OPTIMAL, mathopt.TerminationReason.FEASIBLE]:
         _draw_graph( graph.edge_subgraph( edge for edge in graph.edges if 0.9 < result.variable_values(x[edge]) ) )
 
-def solve_tsp_dfj_constraint_generation( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, draw_instance:bool= False, draw_solution:bool= False ) -> None:
+def _patch_subtours( graph:nx.DiGraph, subgraph:nx.DiGraph ) -> list[tuple]:
+    """
+    Returns the edges of a Hamiltonian tour obtained by concatenating the subtours of the given subgraph
+    (None, if the graph does not contain the necessary edges).
+    """
+    order = []
+    for component in nx.strongly_connected_components( subgraph ):
+        start = v = min( component )
+        while True: # each component is a cycle (in = out = 1)
+            order.append( v )
+            v = next( iter( subgraph.successors( v ) ) )
+            if v == start:
+                break
+
+    edges = list( zip( order, order[1:] + order[:1] ) )
+
+    return edges if all( graph.has_edge( u, v ) for (u,v) in edges ) else None
+
+def solve_tsp_dfj_constraint_generation( graph:nx.DiGraph|CostMatrix, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, draw_instance:bool= False, draw_solution:bool= False ) -> None:
     """
     Solves TSP as a MIP (DFJ formulation) with **OR-Tools MathOpt** iteratively,
     that is, subtour-elimination constraints are added to the model when needed.
 
+    The model is re-solved incrementally (the solver is kept between the rounds, hence it may reuse its state),
+    and the subtours of the previous solution are patched into a tour, which is given as a hint to the next round.
+
     Args
     ----
-    graph: nx.DiGraph
-        A digraph where each edge has the attribute 'cost'.
+    graph: nx.DiGraph | CostMatrix
+        A digraph where each edge has the attribute 'cost' (or its cost matrix).
     solver_type: mathopt.SolverType
         The underlying solver to use (e.g., GSCIP, HIGHS, GUROBI).
     draw_instance: bool
@@ -133,6 +208,8 @@ def solve_tsp_dfj_constraint_generation( graph:nx.DiGraph, solver_type:mathopt.S
     draw_solution:
         Should we draw the optimal Hamiltonian tour?
     """
+    graph = as_graph( graph ) # NOTE: the model needs the edges anyway
+
     if draw_instance:
         _draw_graph( graph )
 
@@ -165,9 +242,13 @@ def solve_tsp_dfj_constraint_generation( graph:nx.DiGraph, solver_type:mathopt.S
     
     solve_start = perf_counter()
 
+    index = EdgeIndex( graph, x )
+    solver = mathopt.IncrementalSolver( model, solver_type )
+    model_params = None
+
     while True:
-        # solve problem
-        result = mathopt.solve( model, solver_type= solver_type )
+        # solve problem (incremental)
+        result = solver.solve( model_params= model_params )
 
         if result.termination.reason != mathopt.TerminationReason.OPTIMAL:
             break
@@ -182,20 +263,279 @@ def solve_tsp_dfj_constraint_generation( graph:nx.DiGraph, solver_type:mathopt.S
             break # everything is awesome
         
         # add new subtour-elimination constraints to the model
-        for component in nx.strongly_connected_components( subgraph ):
-            vars = [ x[edge] for edge in graph.edges if edge[0] in component and edge[1] in component ]
+        for constraint in index.subtour_eliminations( nx.strongly_connected_components( subgraph ) ):
+            model.add_linear_constraint( constraint )
 
-            if 1 <= len(vars): # at least one variable is needed for a constraint
-                model.add_linear_constraint( sum(vars) <= len(component)-1 )
+        # hint: the subtours patched into a tour (feasible for all the constraints)
+        tour = _patch_subtours( graph, subgraph )
+        model_params = None if tour is None else mathopt.ModelSolveParameters( solution_hints= [ mathopt.SolutionHint( variable_values= { var : 0.0 for var in x.values() } | { x[edge] : 1.0 for edge in tour } ) ] )
 
     solve_end = perf_counter()
 
+    solver.close()
+
     _log( model, result, ncuts= model.get_num_linear_constraints()-noriginal_conss, build_time=build_end-build_start, solve_time= solve_end-solve_start )
 
+# solvers supporting lazy constraints in the MIP_SOLUTION callback
+LAZY_CONSTRAINT_SOLVERS = { mathopt.SolverType.GSCIP, mathopt.SolverType.GUROBI }
+
+def _subtours( graph:nx.DiGraph, x:dict, values:dict ) -> list[set]:
+    """
+    Returns the strongly connected components of the support graph of the given (integer) solution,
+    if there are more than one (otherwise, an empty list).
+    """
+    subgraph = graph.edge_subgraph( edge for edge in graph.edges if 0.5 < values[x[edge]] )
+
+    if nx.is_strongly_connected( subgraph ) and subgraph.number_of_nodes() == graph.number_of_nodes():
+        return []
+
+    return list( nx.strongly_connected_components( subgraph ) )
+
+def solve_tsp_dfj_lazy( graph:nx.DiGraph|CostMatrix, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, draw_instance:bool= False, draw_solution:bool= False ) -> None:
+    """
+    Solves TSP as a MIP (DFJ formulation) with **OR-Tools MathOpt** in a single branch-and-bound run,
+    that is, subtour-elimination constraints are separated lazily on integer solutions in a callback (MIP_SOLUTION event).
+
+    If the solver does not support lazy constraints (see LAZY_CONSTRAINT_SOLVERS), or it ignores them,
+    the model is re-solved with the violated constraints as in solve_tsp_dfj_constraint_generation.
+
+    Args
+    ----
+    graph: nx.DiGraph | CostMatrix
+        A digraph where each edge has the attribute 'cost' (or its cost matrix).
+    solver_type: mathopt.SolverType
+        The underlying solver to use (e.g., GSCIP, GUROBI; or HIGHS with the fallback).
+    draw_instance: bool
+        Should we draw the instance graph?
+    draw_solution:
+        Should we draw the optimal Hamiltonian tour?
+    """
+    graph = as_graph( graph ) # NOTE: the model needs the edges anyway
+
+    if draw_instance:
+        _draw_graph( graph )
+
+    # BUILD MODEL
+    build_start = perf_counter()
+
+    model = mathopt.Model( name= 'DFJ-LAZY' )
+
+    # variables: x[(u,v)] = 1 <-> edge (u,v) is included in the tour
+    x = { (u,v) : model.add_binary_variable( name= f'x{u}_{v}' ) for (u,v) in graph.edges }
+
+    # objective
+    edge_costs = nx.get_edge_attributes( graph, 'cost' )
+    model.minimize( sum( x[edge] * edge_costs[edge] for edge in graph.edges ) )
+
+    # constraints for nodes: in = out = 1
+    for v in graph.nodes:
+        model.add_linear_constraint( sum( x[edge] for edge in graph.out_edges(v) ) == 1 )
+        model.add_linear_constraint( sum( x[edge] for edge in graph.in_edges(v) ) == 1 )
+
+    # constraints: subtour-elimination for edges
+    for (u,v) in it.combinations(graph.nodes,2):
+        if (u,v) in graph.edges and (v,u) in graph.edges:
+            model.add_linear_constraint( x[(u,v)] + x[(v,u)] <= 1 )
+
+    build_end = perf_counter()
+
+    # LAZY CONSTRAINTS
+    index = EdgeIndex( graph, x )
+    nlazy_cuts = 0
+
+    def separate( callback_data:mathopt.CallbackData ) -> mathopt.CallbackResult:
+        nonlocal nlazy_cuts
+        result = mathopt.CallbackResult()
+
+        for constraint in index.subtour_eliminations( _subtours( graph, x, callback_data.solution ) ):
+            result.add_lazy_constraint( constraint )
+            nlazy_cuts += 1
+
+        return result
+
+    lazy = solver_type in LAZY_CONSTRAINT_SOLVERS
+    callback_reg = mathopt.CallbackRegistration( events= {mathopt.Event.MIP_SOLUTION}, add_lazy_constraints= True ) if lazy else None
+
+    # SOLVE PROBLEM (re-solve with the violated constraints, if the solver has not handled them)
+    noriginal_conss = model.get_num_linear_constraints()
+
+    solve_start = perf_counter()
+
+    while True:
+        result = mathopt.solve( model, solver_type= solver_type, callback_reg= callback_reg, cb= separate if lazy else None )
+
+        if result.termination.reason != mathopt.TerminationReason.OPTIMAL:
+            break
+
+        components = _subtours( graph, x, result.variable_values() )
+
+        if not components:
+            break # everything is awesome
+
+        for constraint in index.subtour_eliminations( components ):
+            model.add_linear_constraint( constraint )
+
+    solve_end = perf_counter()
+
+    _log( model, result, ncuts= nlazy_cuts + model.get_num_linear_constraints()-noriginal_conss, build_time=build_end-build_start, solve_time= solve_end-solve_start )
+
+    if draw_solution and result.termination.reason in [mathopt.TerminationReason.OPTIMAL, mathopt.TerminationReason.FEASIBLE]:
+        _draw_graph( graph.edge_subgraph( edge for edge in graph.edges if 0.9 < result.variable_values(x[edge]) ) )
+
+def separate_subtour_cuts( values:dict, nodes:list= None, min_violation:float= 0.1, max_cuts:int= None, method:str= 'gomory-hu', nodepairs:list= None ) -> list[tuple[frozenset,float]]:
+    """
+    Separates subtour-elimination constraints x(S) <= |S|-1 for a (fractional) solution satisfying the degree constraints,
+    that is, it finds node subsets S with x(δ+(S)) < 1.
+
+    Since x(δ+(S)) = x(δ-(S)), the support graph (edges with positive value) is handled as an undirected graph
+    with capacities x(u,v) + x(v,u), where a cut of capacity c gives the violation 1 - c/2:
+    1. if the support graph is disconnected, its components are returned (with violation 1);
+    2. otherwise, edges with capacity 1 are shrunk (if there is a violated cut, there is one not separating their nodes);
+    3. and minimum cuts of the shrunk graph are found by a Gomory-Hu tree ('gomory-hu', |V|-1 max-flows),
+       or by a max-flow for each of the given node pairs ('pairs').
+
+    Padberg, M., & Rinaldi, G. (1990).
+    *Facet identification for the symmetric traveling salesman polytope*.
+    Mathematical Programming, 47(1), 219-257.
+
+    Args
+    ----
+    values: dict
+        Values of the edges, i.e., values[(u,v)] = x(u,v).
+    nodes: list
+        Nodes (optional, default: the nodes of the edges).
+    min_violation: float
+        Minimum violation of the cuts.
+    max_cuts: int
+        Maximum number of cuts (optional).
+    method: str
+        Minimum cut method: 'gomory-hu' or 'pairs'.
+    nodepairs: list
+        Node pairs for the method 'pairs'.
+
+    Returns
+    -------
+    : list[tuple[frozenset,float]]
+        Distinct node subsets with their violations, in non-increasing order of violation.
+        Each subset is the smaller side of its cut (the complement gives an equivalent constraint), or the side without the first node on ties.
+    """
+    assert method in ( 'gomory-hu', 'pairs' ), f'unknown method: {method}'
+    assert method != 'pairs' or nodepairs is not None, 'node pairs are needed!'
+
+    EPS = 1e-6
+
+    # support graph (undirected, with capacities x(u,v) + x(v,u))
+    support = nx.Graph()
+    support.add_nodes_from( nodes if nodes is not None else it.chain.from_iterable( values ) )
+
+    for ((u,v),value) in values.items():
+        if EPS < value:
+            if support.has_edge( u, v ):
+                support[u][v]['capacity'] += value
+            else:
+                support.add_edge( u, v, capacity= value )
+
+    root = next( iter( support.nodes ) )
+    cuts = {}
+
+    def add_cut( subset:frozenset, capacity:float ) -> None:
+        if 2*len(subset) > len(support) or ( 2*len(subset) == len(support) and root in subset ):
+            subset = frozenset( support.nodes - subset ) # the smaller side gives a sparser constraint
+
+        violation = 1 - capacity/2
+
+        if min_violation < violation and 2 <= len(subset) and cuts.get( subset, -1 ) < violation:
+            cuts[subset] = violation
+
+    # 1. components
+    components = list( nx.connected_components( support ) )
+
+    if 1 < len(components):
+        for component in components:
+            add_cut( frozenset( component ), 0.0 )
+    else:
+        # 2. shrinking: edges with capacity at least 1
+        parent = { v : v for v in support.nodes }
+
+        def find( v ):
+            while parent[v] != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            return v
+
+        for (u,v,capacity) in support.edges( data= 'capacity' ):
+            if 1 + EPS < capacity: # the pair itself is violated (the shrinking rule needs capacities at most 1)
+                add_cut( frozenset( (u,v) ), support.degree( u, weight= 'capacity' ) + support.degree( v, weight= 'capacity' ) - 2*capacity )
+            elif 1 - EPS <= capacity:
+                parent[find(u)] = find(v)
+
+        members = {}
+        for v in support.nodes:
+            members.setdefault( find(v), set() ).add( v )
+
+        shrunk = nx.Graph()
+        shrunk.add_nodes_from( members )
+
+        for (u,v,capacity) in support.edges( data= 'capacity' ):
+            (u,v) = (find(u),find(v))
+
+            if u == v:
+                continue
+
+            if shrunk.has_edge( u, v ):
+                shrunk[u][v]['capacity'] += capacity
+            else:
+                shrunk.add_edge( u, v, capacity= capacity )
+
+        def expand( supernodes ) -> frozenset:
+            return frozenset( it.chain.from_iterable( members[v] for v in supernodes ) )
+
+        # 3. minimum cuts
+        if 2 <= shrunk.number_of_nodes():
+            if method == 'gomory-hu':
+                tree = nx.gomory_hu_tree( shrunk, capacity= 'capacity' )
+
+                for (u,v,capacity) in list( tree.edges( data= 'weight' ) ):
+                    if min_violation < 1 - capacity/2:
+                        tree.remove_edge( u, v )
+                        add_cut( expand( nx.node_connected_component( tree, v ) ), capacity )
+                        tree.add_edge( u, v, weight= capacity )
+            else:
+                for (s,t) in nodepairs:
+                    (s,t) = (find(s),find(t))
+
+                    if s != t:
+                        capacity, (subset, _) = nx.minimum_cut( shrunk, s, t, capacity= 'capacity' )
+                        add_cut( expand( subset ), capacity )
+
+    cuts = sorted( cuts.items(), key= lambda cut : cut[1], reverse= True )
+
+    return cuts if max_cuts is None else cuts[:max_cuts]
+
 class TSPCutSeparator:
-    def __init__( self, graph:nx.DiGraph, x:dict ):
+    """
+    Callable class to separate subtour-elimination constraints (see separate_subtour_cuts).
+
+    Args
+    ----
+    graph: nx.DiGraph
+        A digraph where each edge has the attribute 'cost'.
+    x: dict
+        Variables of the edges.
+    method: str
+        Minimum cut method: 'gomory-hu' or 'pairs' (each node with its farthest partner).
+    max_cuts: int
+        Maximum number of cuts per callback (optional).
+    pool: CutPool
+        Pool of the cuts (optional). The pooled cuts are re-checked first, and the separation runs only if none of them is violated.
+    """
+    def __init__( self, graph:nx.DiGraph, x:dict, method:str= 'gomory-hu', max_cuts:int= None, pool:CutPool= None ):
         self.graph:nx.DiGraph = graph
         self.x:dict = x
+        self.index:EdgeIndex = EdgeIndex( graph, x )
+        self.method:str = method
+        self.max_cuts:int = max_cuts
+        self.pool:CutPool = pool
         self.ncuts:int = 0
         self.nodepairs:list = []
         self.MINIMUM_VIOLATION = 0.1
@@ -209,28 +549,37 @@ class TSPCutSeparator:
                 if longest_edge is None or edge_costs[longest_edge] < edge_costs[(i,j)]:
                     longest_edge = (i,j)
 
-            self.nodepairs.append( (node,j) )
+            if longest_edge is not None:
+                self.nodepairs.append( longest_edge )
 
     def __call__( self, callback_data:mathopt.CallbackData ) -> mathopt.CallbackResult:
         result = mathopt.CallbackResult()
-        flowgraph = nx.DiGraph()
 
-        for (u,v) in self.graph.edges:
-            flowgraph.add_edge( u, v, capacity= callback_data.solution[self.x[(u,v)]] )
+        values = { edge : callback_data.solution[var] for (edge,var) in self.x.items() }
+        cuts = []
+
+        if self.pool is not None:
+            # violation of x(S) <= |S|-1
+            violation = lambda subset : sum( callback_data.solution[var] for var in self.index.induced( subset ) ) - len(subset) + 1
+            cuts = self.pool.violated( violation, self.MINIMUM_VIOLATION, self.max_cuts )
 
-        for (s,t) in self.nodepairs:           
-            value, (subset, _) = nx.minimum_cut( flowgraph, s, t )
+        if not cuts:
+            cuts = separate_subtour_cuts( values, self.graph.nodes, self.MINIMUM_VIOLATION, self.max_cuts, self.method, self.nodepairs )
 
-            if value + self.MINIMUM_VIOLATION < 1:
-                vars = [ self.x[(u,v)] for (u,v) in self.graph.edges if u in subset and v in subset ]
+            if self.pool is not None:
+                for (subset,value) in cuts:
+                    self.pool.add( subset, value )
 
-                if 1 <= len(vars): # at least one variable is needed for a constraint
-                    result.add_user_cut( sum( vars ) <= len(subset) - 1 )
-                    self.ncuts += 1
+        for (subset,_) in cuts:
+            constraint = self.index.subtour_elimination( subset )
+
+            if constraint is not None:
+                result.add_user_cut( constraint )
+                self.ncuts += 1
 
         return result
 
-def solve_tsp_mtz( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, strengthened:bool= False, separation:bool= False, draw_instance:bool= False, draw_solution:bool= False ) -> None:
+def solve_tsp_mtz( graph:nx.DiGraph|CostMatrix, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, strengthened:bool= False, separation:bool= False, cut_pool:CutPool= None, draw_instance:bool= False, draw_solution:bool= False ) -> None:
     """
     Solves TSP as a MIP (MTZ formulation) with **OR-Tools MathOpt**.
 
@@ -244,8 +593,8 @@ def solve_tsp_mtz( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.Sol
         
     Args
     ----
-    graph: nx.DiGraph
-        A digraph where each edge has the attribute 'cost'.
+    graph: nx.DiGraph | CostMatrix
+        A digraph where each edge has the attribute 'cost' (or its cost matrix).
     solver_type: mathopt.SolverType
         The underlying solver to use (e.g., GSCIP, GUROBI).
         NOTE that HIGHS does not support branch-and-cut.
@@ -253,11 +602,15 @@ def solve_tsp_mtz( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.Sol
         Should we use strengthened big-M constraints?
     separation: bool
         Should we separate subtour-elimination constraints?
+    cut_pool: CutPool
+        Pool of the separated constraints (optional), e.g., to reuse them in the next solve of the same instance.
     draw_instance: bool
         Should we draw the instance graph?
     draw_solution:
         Should we draw the optimal Hamiltonian tour?
     """
+    graph = as_graph( graph ) # NOTE: the model needs the edges anyway
+
     if draw_instance:
         _draw_graph( graph )
 
@@ -300,7 +653,7 @@ def solve_tsp_mtz( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.Sol
 
     # SOLVE PROBLEM
     callback_reg = mathopt.CallbackRegistration( events={mathopt.Event.MIP_NODE}, add_cuts= True ) if separation else None # TODO: MIP_NODE: GUROBI only ?
-    cb = TSPCutSeparator( graph, x ) if separation else None
+    cb = TSPCutSeparator( graph, x, pool= cut_pool ) if separation else None
 
     result = mathopt.solve( model, solver_type= solver_type, callback_reg= callback_reg, cb= cb )
 
@@ -309,7 +662,7 @@ def solve_tsp_mtz( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.Sol
     if draw_solution and result.termination.reason in [mathopt.TerminationReason.OPTIMAL, mathopt.TerminationReason.FEASIBLE]:
         _draw_graph( graph.edge_subgraph( edge for edge in graph.edges if 0.9 < x[edge].x ) )
 
-def solve_tsp_gg( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, draw_instance:bool= False, separation:bool= False, draw_solution:bool= False ) -> None:
+def solve_tsp_gg( graph:nx.DiGraph|CostMatrix, solver_type:mathopt.SolverType= mathopt.SolverType.GSCIP, draw_instance:bool= False, separation:bool= False, draw_solution:bool= False ) -> None:
     """
     Solves TSP as a MIP (GG formulation) with **OR-Tools MathOpt**.
 
@@ -318,8 +671,8 @@ def solve_tsp_gg( graph:nx.DiGraph, solver_type:mathopt.SolverType= mathopt.Solv
         
     Args
     ----
-    graph: nx.DiGraph
-        A digraph where each edge has the attribute 'cost'.
+    graph: nx.DiGraph | CostMatrix
+        A digraph where each edge has the attribute 'cost' (or its cost matrix).
     solver_type: mathopt.SolverType
         The underlying solver to use (e.g., GSCIP, GUROBI).
         NOTE that HIGHS does not support branch-and-cut.
@@ -346,10 +699,12 @@ if __name__ == '__main__':
 
     solve_tsp_dfj( D, solver_type= solver_type, draw_solution= True ) # check D with nnodes= 15
     # solve_tsp_dfj_constraint_generation( D, solver_type= solver_type, draw_solution= False )
+    # solve_tsp_dfj_lazy( D, solver_type= solver_type, draw_solution= False )
     # solve_tsp_mtz( D, solver_type= solver_type )
     # solve_tsp_mtz( D, solver_type= solver_type, strengthened= True )
     # solve_tsp_mtz( D, solver_type= solver_type, separation= True )
     # solve_tsp_mtz( D, solver_type= solver_type, strengthened= True, separation= True )
+    # solve_tsp_mtz( D, solver_type= solver_type, separation= True, cut_pool= CutPool() )
     # solve_tsp_gg( D, separation= False )
     # solve_tsp_gg( D, separation= True )
 
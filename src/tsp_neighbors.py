@@ -0,0 +1,133 @@
+import networkx as nx
+import numpy as np
+import math
+
+from tsp_matrix import CostMatrix, as_cost_matrix
+
+def _grid_neighbors( coords:np.ndarray, k:int ) -> np.ndarray:
+    """
+    Returns the k nearest neighbors of the given points by grid bucketing.
+
+    The points are bucketed into a uniform grid (about two points per cell).
+    For each point, square windows of cells around its cell are scanned with increasing radius r
+    until at least k points are found and the k-th distance is at most r times the cell size
+    (points outside of the window cannot be closer).
+
+    Args
+    ----
+    coords: np.ndarray
+        Coordinates of the points as an (n,2) array.
+    k: int
+        Number of neighbors (less than n).
+
+    Returns
+    -------
+    neighbors: np.ndarray
+        An (n,k) index array: neighbors[i] are the k nearest points of point i in increasing order of distance.
+    """
+    n = len(coords)
+
+    # BUILD GRID
+    lower = coords.min( axis= 0 )
+    extent = max( float( (coords.max( axis= 0 ) - lower).max() ), 1e-9 )
+
+    ncells = max( 1, int( math.sqrt( n/2 ) ) )  # number of cells per axis
+    size = extent / ncells                       # cell size
+
+    cell_xy = np.minimum( ((coords - lower) / size).astype( np.intp ), ncells-1 )
+    cell_id = cell_xy[:,1] * ncells + cell_xy[:,0]
+
+    # points sorted by cell, cell_start[c]:cell_start[c+1] are the points of cell c
+    points = np.argsort( cell_id, kind= 'stable' )
+    cell_start = np.searchsorted( cell_id[points], np.arange( ncells*ncells+1 ) )
+
+    # SEARCH NEIGHBORS
+    neighbors = np.empty( (n,k), dtype= np.intp )
+
+    for u in range(n):
+        cx, cy = cell_xy[u]
+        r = 1
+
+        while True:
+            x0, x1 = max( cx-r, 0 ), min( cx+r, ncells-1 )
+
+            # each row of the window is a contiguous range of cells
+            candidates = np.concatenate( [ points[cell_start[y*ncells+x0]:cell_start[y*ncells+x1+1]] for y in range( max( cy-r, 0 ), min( cy+r, ncells-1 )+1 ) ] )
+            candidates = candidates[candidates != u]
+
+            if k <= len(candidates):
+                diff = coords[candidates] - coords[u]
+                dists = np.einsum( 'ij,ij->i', diff, diff )
+                nearest = np.argpartition( dists, k-1 )[:k]
+
+                if dists[nearest].max() <= (r*size)**2 or ncells <= r:
+                    nearest = nearest[np.argsort( dists[nearest], kind= 'stable' )]
+                    neighbors[u] = candidates[nearest]
+                    break
+
+            r += 1
+
+    return neighbors
+
+def _matrix_neighbors( matrix:np.ndarray, k:int, chunk_size:int= 1024 ) -> np.ndarray:
+    """
+    Returns the k cheapest out-neighbors of the nodes based on the rows of the cost matrix.
+
+    Args
+    ----
+    matrix: np.ndarray
+        An (n,n) cost matrix.
+    k: int
+        Number of neighbors (less than n).
+    chunk_size: int
+        Number of rows processed at once.
+
+    Returns
+    -------
+    neighbors: np.ndarray
+        An (n,k) index array: neighbors[i] are the k cheapest out-neighbors of node i in increasing order of cost.
+    """
+    n = len(matrix)
+    neighbors = np.empty( (n,k), dtype= np.intp )
+
+    for start in range(0,n,chunk_size):
+        rows = np.array( matrix[start:start+chunk_size], dtype= np.float64 )
+        rows[np.arange(len(rows)),np.arange(start,start+len(rows))] = np.inf # exclude the node itself
+
+        nearest = np.argpartition( rows, k-1, axis= 1 )[:,:k]
+        order = np.argsort( np.take_along_axis( rows, nearest, axis= 1 ), axis= 1, kind= 'stable' )
+        neighbors[start:start+len(rows)] = np.take_along_axis( nearest, order, axis= 1 )
+
+    return neighbors
+
+def neighbor_lists( instance:nx.DiGraph|CostMatrix, k:int= 10 ) -> np.ndarray:
+    """
+    Returns the k-nearest-neighbor candidate lists of the nodes.
+
+    If coordinates are known (node attribute 'pos'), a grid bucketing is used (no distance matrix is needed),
+    otherwise the rows of the cost matrix are scanned.
+
+    Args
+    ----
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or its cost matrix.
+    k: int
+        Number of neighbors per node (capped at n-1).
+
+    Returns
+    -------
+    neighbors: np.ndarray
+        An (n,k) array of node indices: neighbors[i] are the k nearest nodes of the node with index i.
+    """
+    if isinstance( instance, CostMatrix ):
+        coords = instance.coords
+    else:
+        pos = nx.get_node_attributes( instance, 'pos' )
+        coords = np.array( [ pos[node] for node in instance.nodes ], dtype= np.float64 ) if len(pos) == len(instance) else None
+
+    k = min( k, len(instance)-1 )
+
+    if coords is not None:
+        return _grid_neighbors( coords, k )
+
+    return _matrix_neighbors( as_cost_matrix( instance ).matrix, k )
@@ -0,0 +1,314 @@
+import networkx as nx
+import numpy as np
+import concurrent.futures
+import contextlib
+import inspect
+import io
+import multiprocessing
+import os
+import queue
+import random
+import time
+
+from multiprocessing import shared_memory
+
+from progress import NullProgress
+from tsp_instances import random_euclidean_matrix
+from tsp_matrix import CostMatrix, as_cost_matrix
+from tsp_ls_2 import _fitness, _mating, _next_generation, _select
+
+# cost matrix of the worker process (attached to the shared memory block of the parent)
+_INSTANCE:CostMatrix = None
+_SHARED_MEMORY:shared_memory.SharedMemory = None
+
+def _attach( name:str, shape:tuple, dtype:np.dtype, nodes:list, coords:np.ndarray ) -> None:
+    """
+    Initializes a worker process: attaches the cost matrix stored in shared memory (without copying it).
+    """
+    global _INSTANCE, _SHARED_MEMORY
+
+    _SHARED_MEMORY = shared_memory.SharedMemory( name= name )
+
+    matrix = np.ndarray( shape, dtype= dtype, buffer= _SHARED_MEMORY.buf )
+    _INSTANCE = CostMatrix( matrix, nodes, coords )
+
+@contextlib.contextmanager
+def _shared_instance( costs:CostMatrix ):
+    """
+    Copies the cost matrix into a shared memory block, and yields the arguments of _attach.
+    The block is released on exit.
+    """
+    matrix = np.ascontiguousarray( costs.matrix )
+
+    block = shared_memory.SharedMemory( create= True, size= max( matrix.nbytes, 1 ) )
+
+    try:
+        np.ndarray( matrix.shape, dtype= matrix.dtype, buffer= block.buf )[:] = matrix
+
+        yield ( block.name, matrix.shape, matrix.dtype, costs.nodes, costs.coords )
+    finally:
+        block.close()
+        block.unlink()
+
+def _solver_kwargs( solver, seed:int, nodes:list, kwargs:dict ) -> dict:
+    """
+    Returns the keyword arguments of a seeded run: the seed and a random initial solution are passed, if the solver accepts them,
+    and drawing is turned off.
+    """
+    parameters = inspect.signature( solver ).parameters
+    kwargs = dict( kwargs )
+
+    if 'seed' in parameters:
+        kwargs.setdefault( 'seed', seed )
+
+    if 'initial_solution' in parameters and 'initial_solution' not in kwargs:
+        kwargs['initial_solution'] = [ nodes[i] for i in np.random.default_rng( seed ).permutation( len(nodes) ).tolist() ]
+
+    for flag in ( 'draw_progress', 'draw_solutions' ):
+        if flag in parameters:
+            kwargs[flag] = False
+
+    return kwargs
+
+def _run( solver, seed:int, kwargs:dict, quiet:bool ) -> dict:
+    """
+    Runs the solver on the instance of the worker with the given seed, and returns the statistics of the run.
+    """
+    random.seed( seed )
+    np.random.seed( seed % 2**32 )
+
+    kwargs = _solver_kwargs( solver, seed, _INSTANCE.nodes, kwargs )
+
+    if quiet and 'progress' in inspect.signature( solver ).parameters:
+        kwargs.setdefault( 'progress', NullProgress() ) # cheaper than printing into a buffer
+
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout( io.StringIO() ) if quiet else contextlib.nullcontext():
+        result = solver( _INSTANCE, **kwargs )
+
+    wall_time = time.perf_counter() - start
+
+    solution = result[0] if isinstance( result, tuple ) else result # some solvers also return their history
+
+    return { 'seed' : seed, 'cost' : _INSTANCE.tour_cost( _INSTANCE.indices( solution ) ), 'time' : wall_time, 'pid' : os.getpid(), 'solution' : solution }
+
+def multi_start( graph:nx.DiGraph|CostMatrix, solver, nruns:int, max_workers:int= None, seed:int= 0, quiet:bool= True, **kwargs ) -> tuple[list,list[dict]]:
+    """
+    Runs independent seeded runs of a TSP solver in parallel (in a process pool), and returns the best solution.
+
+    The cost matrix is placed in shared memory once, and the workers attach to it (instead of receiving a pickled copy per run).
+    Run i gets seed 'seed + i': it is passed to the solver (if it has a 'seed' parameter), and it also seeds
+    the 'random' and 'numpy.random' modules and a random initial solution (if the solver has an 'initial_solution' parameter
+    that is not given).
+
+    Args
+    ----
+    graph: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or its cost matrix.
+    solver:
+        A (module-level) solver function taking the instance as its first argument, e.g., tsp_ls_2.tabu_search.
+        It returns a solution (or a tuple whose first element is a solution).
+    nruns: int
+        Number of runs.
+    max_workers: int
+        Number of worker processes (optional, default: number of CPUs).
+    seed: int
+        Seed of the first run.
+    quiet: bool
+        Should we suppress the output of the solver?
+    kwargs:
+        Further arguments of the solver.
+
+    Returns
+    -------
+    best_solution: list
+        Best found solution (a permutation of the nodes).
+    stats: list[dict]
+        Statistics of the runs in the order of their seeds: 'seed', 'cost', 'time' (wall-clock seconds), 'pid' (worker process).
+    """
+    costs = as_cost_matrix( graph )
+
+    # RUNS
+    with _shared_instance( costs ) as instance, \
+         concurrent.futures.ProcessPoolExecutor( max_workers= max_workers, initializer= _attach, initargs= instance ) as executor:
+        futures = [ executor.submit( _run, solver, seed+i, kwargs, quiet ) for i in range(nruns) ]
+        results = [ future.result() for future in futures ]
+
+    best = min( results, key= lambda result: result['cost'] )
+    stats = [ { key : value for key, value in result.items() if key != 'solution' } for result in results ]
+
+    return best['solution'], stats
+
+def _migration_targets( topology:str, island:int, nislands:int ) -> list[int]:
+    """
+    Returns the islands receiving the migrants of the given island.
+    """
+    if topology == 'ring':
+        return [ (island+1) % nislands ] if 1 < nislands else []
+
+    return [ other for other in range(nislands) if other != island ] # complete
+
+def _island( island:int, instance:tuple, inboxes:list, results, params:dict ) -> None:
+    """
+    Evolves the population of an island (in a worker process), and puts its best individual to the result queue.
+    The fittest individuals are sent to the target islands after every 'migration_interval' generations,
+    and the received migrants compete with the population (the worst individuals are dropped).
+    In deterministic mode, the island waits for the migrants of all of its source islands of the same migration.
+    """
+    _attach( *instance )
+
+    costs = _INSTANCE
+    matrix, n = costs.matrix, len(costs)
+    nislands, topology = params['nislands'], params['topology']
+    population_size = params['population_size']
+
+    rng = np.random.default_rng( params['seed'] + island )
+    mate = _mating( params['crossover'], costs, rng )
+
+    targets = _migration_targets( topology, island, nislands )
+    nsources = sum( island in _migration_targets( topology, other, nislands ) for other in range(nislands) )
+    nmigrants = max( 1, int( params['migration_rate'] * population_size ) )
+
+    population = rng.permuted( np.tile( np.arange(n), (population_size,1) ), axis= 1 )
+    population, fitness = _select( population, _fitness( matrix, population ), population_size )
+
+    pending = {} # received migrations by their number: list of (source,individuals,fitness)
+    history = []
+
+    for generation in range(1,params['generations']+1):
+        population, fitness = _next_generation( matrix, population, fitness, population_size, params['mutation_rate'], mate, rng )
+
+        # MIGRATION
+        if generation % params['migration_interval'] == 0:
+            migration = generation // params['migration_interval']
+
+            for target in targets:
+                inboxes[target].put( ( migration, island, population[:nmigrants], fitness[:nmigrants] ) )
+
+            # receive migrants
+            if params['deterministic']:
+                while len( pending.get( migration, [] ) ) < nsources:
+                    message = inboxes[island].get()
+                    pending.setdefault( message[0], [] ).append( message[1:] )
+
+                received = sorted( pending.pop( migration, [] ), key= lambda message: message[0] )
+            else:
+                received = []
+                with contextlib.suppress( queue.Empty ):
+                    while True:
+                        received.append( inboxes[island].get_nowait()[1:] )
+
+            for (_,individuals,individual_fitness) in received:
+                population, fitness = _select( np.concatenate( [ population, individuals ] ), np.concatenate( [ fitness, individual_fitness ] ), population_size )
+
+        history.append( float( fitness[0] ) )
+
+    results.put( ( island, population[0], float( fitness[0] ), history ) )
+
+def island_genetic_algorithm( graph:nx.DiGraph|CostMatrix, nislands:int= 4, population_size:int= 50, generations:int= 100, mutation_rate:float= 0.1,
+                              crossover:str= 'one-point', topology:str= 'ring', migration_rate:float= 0.1, migration_interval:int= 10,
+                              deterministic:bool= False, seed:int= 0 ) -> tuple[list,list[dict]]:
+    """
+    Solves TSP with an island-model genetic algorithm: the populations of the islands evolve in separate processes
+    (see tsp_ls_2.genetic_algorithm), and periodically send copies of their fittest individuals to other islands over queues.
+
+    The cost matrix is shared by the processes via shared memory (see multi_start).
+    Island i is seeded by 'seed + i'. In deterministic mode, migrations are synchronized, and migrants are received
+    in a fixed order, hence the result does not depend on the scheduling of the processes.
+
+    Args
+    ----
+    graph: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or its cost matrix.
+    nislands: int
+        Number of islands (processes).
+    population_size: int
+        Size of the population of an island.
+    generations: int
+        Number of generations.
+    mutation_rate: float
+        Probability of mutation.
+    crossover: str
+        Crossover operator: 'one-point', 'ox', 'pmx', or 'eax' (see tsp_ls_2.genetic_algorithm).
+    topology: str
+        Migration topology: 'ring' (to the next island) or 'complete' (to all other islands).
+    migration_rate: float
+        Ratio of the population sent to each target island in a migration (at least one individual).
+    migration_interval: int
+        Number of generations between migrations.
+    deterministic: bool
+        Should we synchronize migrations for reproducible results?
+    seed: int
+        Seed of the first island.
+
+    Returns
+    -------
+    best_solution: list
+        Best found solution (a permutation of the nodes).
+    stats: list[dict]
+        Statistics of the islands: 'island', 'cost' (of the best individual), 'history' (best cost per generation).
+    """
+    assert topology in ( 'ring', 'complete' ), f'unknown topology: {topology}'
+
+    costs = as_cost_matrix( graph )
+    params = { 'nislands' : nislands, 'population_size' : population_size, 'generations' : generations, 'mutation_rate' : mutation_rate,
+               'crossover' : crossover, 'topology' : topology, 'migration_rate' : migration_rate, 'migration_interval' : migration_interval,
+               'deterministic' : deterministic, 'seed' : seed }
+
+    context = multiprocessing.get_context()
+
+    with _shared_instance( costs ) as instance:
+        inboxes = [ context.Queue() for _ in range(nislands) ]
+        results = context.Queue()
+
+        processes = [ context.Process( target= _island, args= ( island, instance, inboxes, results, params ) ) for island in range(nislands) ]
+
+        try:
+            for process in processes:
+                process.start()
+
+            islands = sorted( [ results.get() for _ in range(nislands) ], key= lambda result: result[0] )
+
+            # NOTE: migrants sent after the last receive of their target are never read, and a process cannot exit
+            #       until its queued messages are flushed, hence the inboxes are drained while joining the processes
+            while any( process.is_alive() for process in processes ):
+                for inbox in inboxes:
+                    with contextlib.suppress( queue.Empty ):
+                        while True:
+                            inbox.get_nowait()
+
+                for process in processes:
+                    process.join( timeout= 0.01 )
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+
+    best = min( islands, key= lambda result: result[2] )
+    stats = [ { 'island' : island, 'cost' : cost, 'history' : history } for (island,_,cost,history) in islands ]
+
+    return costs.nodes_of( best[1].tolist() ), stats
+
+if __name__ == '__main__':
+    from tsp_ls_2 import simulated_annealing
+
+    instance = random_euclidean_matrix( 100 )
+
+    solution, stats = multi_start( instance, simulated_annealing, nruns= 8, temperature= 100, cooling_rate= 0.9999, move= '2-opt', silent= True )
+
+    print( '─────┬────────────┬──────────┬─────────' )
+    print( 'seed │ cost       │ time (s) │ pid     ' )
+    print( '─────┼────────────┼──────────┼─────────' )
+
+    for run in stats:
+        print( f'{run["seed"]:4d} │ {run["cost"]:10.2f} │ {run["time"]:8.2f} │ {run["pid"]:7d}' )
+
+    print( '─────┴────────────┴──────────┴─────────' )
+    print( f'best: {instance.tour_cost( instance.indices( solution ) ):.2f}' )
+
+    solution, stats = island_genetic_algorithm( instance, nislands= 4, population_size= 50, generations= 200, crossover= 'eax', deterministic= True )
+
+    for island in stats:
+        print( f'island {island["island"]}: {island["cost"]:.2f}' )
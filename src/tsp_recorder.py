@@ -0,0 +1,168 @@
+import networkx as nx
+import numpy as np
+import os
+
+from matplotlib import animation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from tsp_matrix import CostMatrix, as_cost_matrix
+from tsp_tour import Tour
+
+# Streaming recorder of the tours visited by a search, rendered to a file without a GUI.
+#
+# Frames are stored as diffs of the successor arrays (only the changed successors), with a full keyframe after every
+# 'keyframe_interval' frames, hence a local search move takes O(1) memory instead of O(n).
+# Frames can be subsampled: only every k-th recorded tour is kept, and if the number of frames exceeds 'max_frames',
+# every second frame is dropped (and k is doubled), hence the memory is bounded for arbitrarily long runs.
+# Frames are decoded one by one while rendering, and they are drawn on an Agg canvas (without pyplot).
+
+class TourRecorder:
+    """
+    Records tours (over the node indices of a cost matrix) as compact frames.
+
+    Args
+    ----
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'pos' node attributes) or its cost matrix (with coordinates).
+    every: int
+        Only every k-th recorded tour is kept (the last one is always kept).
+    max_frames: int
+        Maximum number of frames (optional).
+    keyframe_interval: int
+        Number of frames between full keyframes.
+    """
+    def __init__( self, instance:nx.DiGraph|CostMatrix, every:int= 1, max_frames:int= None, keyframe_interval:int= 50 ):
+        self.costs:CostMatrix = as_cost_matrix( instance )
+        self.every:int = every
+        self.max_frames:int = max_frames
+        self.keyframe_interval:int = keyframe_interval
+
+        self._frames:list[tuple[np.ndarray,np.ndarray,float]] = [] # (changed nodes, their successors, cost)
+        self._last:np.ndarray = None # successors of the last kept frame
+        self._pending:tuple[np.ndarray,float] = None # last skipped tour
+        self._count:int = 0
+
+    def __len__( self ) -> int:
+        return len(self._frames) + (self._pending is not None)
+
+    @property
+    def nbytes( self ) -> int:
+        """ Memory used by the frames in bytes."""
+        return sum( nodes.nbytes + succ.nbytes for (nodes,succ,_) in self._frames )
+
+    def record( self, tour:Tour|list[int], cost:float= None ) -> None:
+        """
+        Records a tour given as a Tour or as a sequence of node indices (and its cost, optional).
+        """
+        if isinstance( tour, Tour ):
+            succ = tour.succ.copy()
+        else:
+            order = np.asarray( tour, dtype= np.intp )
+            succ = np.empty_like( order )
+            succ[order] = np.roll( order, -1 )
+
+        if cost is None:
+            cost = float( self.costs.matrix[np.arange(len(succ)),succ].sum() )
+
+        self._count += 1
+
+        if self._count % self.every != 0:
+            self._pending = ( succ, cost )
+            return
+
+        self._pending = None
+        self._append( succ, cost )
+
+        if self.max_frames is not None and self.max_frames < len(self._frames):
+            self._thin()
+
+    def _append( self, succ:np.ndarray, cost:float ) -> None:
+        """
+        Appends a frame (a keyframe or a diff to the last frame).
+        """
+        if self._last is None or len(self._frames) % self.keyframe_interval == 0:
+            nodes = np.arange( len(succ), dtype= np.int32 )
+        else:
+            nodes = np.flatnonzero( succ != self._last ).astype( np.int32 )
+
+        self._frames.append( ( nodes, succ[nodes].astype( np.int32 ), cost ) )
+        self._last = succ
+
+    def _thin( self ) -> None:
+        """
+        Drops every second frame (re-encoding the remaining ones), and doubles the sampling interval.
+        """
+        frames = [ (succ.copy(),cost) for (t,(succ,cost)) in enumerate( self.frames( pending= False ) ) if t % 2 == 1 or t == len(self._frames)-1 ]
+
+        self._frames, self._last = [], None
+        for (succ,cost) in frames:
+            self._append( succ, cost )
+
+        self.every *= 2
+
+    def frames( self, pending:bool= True ):
+        """
+        Yields the frames as (successors, cost) pairs, where the successors are decoded in place (copy them to keep them).
+        """
+        succ = None
+
+        for (nodes,values,cost) in self._frames:
+            if succ is None:
+                succ = np.empty( len(nodes), dtype= np.intp ) # the first frame is a keyframe
+
+            succ[nodes] = values
+            yield succ, cost
+
+        if pending and self._pending is not None:
+            yield self._pending
+
+    def render( self, path:str, fps:float= 2, dpi:int= 100, figsize:tuple[float,float]= (6,6) ) -> None:
+        """
+        Renders the frames to a file with the Agg backend (no display is needed).
+
+        Args
+        ----
+        path: str
+            Output file: '*.gif' (animated GIF, with Pillow), '*.mp4' (video, with ffmpeg),
+            or '*.png' (one image per frame, numbered as 'name_00000.png', 'name_00001.png', ...).
+        fps: float
+            Frames per second.
+        dpi: int
+            Resolution.
+        figsize: tuple[float,float]
+            Size of the figure in inches.
+        """
+        coords = self.costs.coords
+        assert coords is not None, 'coordinates are needed!'
+
+        fig = Figure( figsize= figsize )
+        FigureCanvasAgg( fig )
+        ax = fig.add_subplot()
+
+        ax.scatter( coords[:,0], coords[:,1], s= 10, zorder= 2 )
+        edges = LineCollection( [], linewidths= 1, colors= 'black', zorder= 1 )
+        ax.add_collection( edges )
+        ax.set_aspect( 'equal' )
+
+        def draw( succ:np.ndarray, cost:float ) -> None:
+            edges.set_segments( np.stack( [ coords, coords[succ] ], axis= 1 ) )
+            ax.set_xlabel( f'Length: {cost:.2f}' )
+
+        root, extension = os.path.splitext( path )
+
+        if extension == '.png':
+            for (t,(succ,cost)) in enumerate( self.frames() ):
+                draw( succ, cost )
+                fig.savefig( f'{root}_{t:05d}.png', dpi= dpi )
+            return
+
+        assert extension in ( '.gif', '.mp4' ), f'unknown file type: {extension}'
+
+        writer = animation.PillowWriter( fps= fps ) if extension == '.gif' else animation.FFMpegWriter( fps= fps )
+
+        with writer.saving( fig, path, dpi ):
+            for (succ,cost) in self.frames():
+                draw( succ, cost )
+                writer.grab_frame()
@@ -0,0 +1,205 @@
+import numpy as np
+
+class Tour:
+    """
+    Hamiltonian tour over the node indices 0,...,n-1 stored in arrays.
+
+    Successors and predecessors are always up to date, hence
+    - adjacency queries, node relocations/swaps and segment moves take O(1) time;
+    - a 2-opt segment reversal takes O(min(L,n-L)) time, where L is the length of the segment
+      (the shorter side of the tour is reversed, with vectorized array operations).
+
+    Positions (and the sequence of nodes) are maintained by swaps and reversals,
+    but they are invalidated by relocations and segment moves, and rebuilt in O(n) time on the next query.
+
+    NOTE: Reversals assume symmetric costs (the orientation of the tour may change).
+    """
+    __slots__ = ( 'succ', 'pred', 'first', '_order', '_pos' )
+
+    def __init__( self, order ):
+        order = np.array( order, dtype= np.intp )
+
+        self.succ:np.ndarray = np.empty_like( order )
+        self.pred:np.ndarray = np.empty_like( order )
+        self.succ[order] = np.roll( order, -1 )
+        self.pred[order] = np.roll( order, 1 )
+
+        self.first:int = int( order[0] ) # the sequence of nodes starts with this node
+        self._order:np.ndarray = order
+        self._pos:np.ndarray = np.argsort( order )
+
+    def __len__( self ) -> int:
+        return len(self.succ)
+
+    def copy( self ) -> 'Tour':
+        """ Returns an independent copy of the tour."""
+        tour = Tour.__new__( Tour )
+        tour.succ, tour.pred, tour.first = self.succ.copy(), self.pred.copy(), self.first
+        tour._order = self._order.copy() if self._order is not None else None
+        tour._pos = self._pos.copy() if self._pos is not None else None
+
+        return tour
+
+    def next( self, v:int ) -> int:
+        """ Returns the successor of node v."""
+        return int( self.succ[v] )
+
+    def prev( self, v:int ) -> int:
+        """ Returns the predecessor of node v."""
+        return int( self.pred[v] )
+
+    def adjacent( self, u:int, v:int ) -> bool:
+        """ Returns whether nodes u and v are neighbors in the tour."""
+        return self.succ[u] == v or self.pred[u] == v
+
+    def _rebuild( self ) -> None:
+        """ Rebuilds positions by following the successors."""
+        succ = self.succ.tolist()
+        order = [ self.first ]
+
+        for _ in range(len(succ)-1):
+            order.append( succ[order[-1]] )
+
+        self._order = np.array( order, dtype= np.intp )
+        self._pos = np.argsort( self._order )
+
+    @property
+    def order( self ) -> np.ndarray:
+        """ Sequence of nodes (NOTE: the first node is not necessarily first, see to_list)."""
+        if self._order is None:
+            self._rebuild()
+
+        return self._order
+
+    @property
+    def pos( self ) -> np.ndarray:
+        """ Positions of the nodes in the sequence of nodes."""
+        if self._pos is None:
+            self._rebuild()
+
+        return self._pos
+
+    def to_list( self ) -> list[int]:
+        """ Returns the tour as a list of nodes starting with the first node."""
+        return np.roll( self.order, -int( self.pos[self.first] ) ).tolist()
+
+    def cost( self, costs:np.ndarray ) -> float:
+        """ Returns the cost of the tour w.r.t. the given cost matrix."""
+        return float( costs[np.arange(len(self.succ)),self.succ].sum() )
+
+    def between( self, a:int, b:int, c:int ) -> bool:
+        """ Returns whether node b is on the path from node a to node c (following successors)."""
+        pos = self.pos
+        n = len(pos)
+
+        return (pos[b] - pos[a]) % n <= (pos[c] - pos[a]) % n
+
+    def relocate( self, v:int, after:int ) -> None:
+        """
+        Moves node v right after node 'after' in O(1) time.
+        """
+        if v == after or self.pred[v] == after:
+            return
+
+        # remove v
+        p, s = self.pred[v], self.succ[v]
+        self.succ[p] = s
+        self.pred[s] = p
+
+        # insert v
+        q = self.succ[after]
+        self.succ[after] = v
+        self.pred[v] = after
+        self.succ[v] = q
+        self.pred[q] = v
+
+        self._order = self._pos = None
+
+    def move_segment( self, first:int, last:int, after:int, reverse:bool= False ) -> None:
+        """
+        Moves the path from node 'first' to node 'last' (following successors) right after node 'after'
+        in O(1) time, or in O(L) time if the segment (of length L) is reversed.
+        Node 'after' is neither in the segment nor the predecessor of node 'first'.
+        """
+        succ, pred = self.succ, self.pred
+
+        segment = [ first ]
+        if reverse:
+            while segment[-1] != last:
+                segment.append( succ[segment[-1]] )
+
+        # remove segment
+        p, f = pred[first], succ[last]
+        succ[p] = f
+        pred[f] = p
+
+        # insert segment
+        d = succ[after]
+
+        if reverse:
+            succ[segment], pred[segment] = pred[segment], succ[segment].copy()
+            first, last = last, first
+
+        succ[after] = first
+        pred[first] = after
+        succ[last] = d
+        pred[d] = last
+
+        self._order = self._pos = None
+
+    def swap( self, u:int, v:int ) -> None:
+        """
+        Swaps the positions of nodes u and v in O(1) time.
+        """
+        if u == v:
+            return
+
+        succ, pred = self.succ, self.pred
+
+        if succ[u] == v:
+            sequences = [ (pred[u],v,u,succ[v]) ]
+        elif succ[v] == u:
+            sequences = [ (pred[v],u,v,succ[u]) ]
+        else:
+            sequences = [ (pred[u],v,succ[u]), (pred[v],u,succ[v]) ]
+
+        for sequence in sequences:
+            for (a,b) in zip( sequence, sequence[1:] ):
+                succ[a] = b
+                pred[b] = a
+
+        if self._pos is not None:
+            i, j = self._pos[u], self._pos[v]
+            self._order[i], self._order[j] = v, u
+            self._pos[u], self._pos[v] = j, i
+
+    def reverse( self, b:int, c:int ) -> None:
+        """
+        Reverses the path from node b to node c (following successors), that is,
+        edges (a,b) and (c,d) are replaced with edges (a,c) and (b,d), where a is the predecessor of b and d is the successor of c.
+
+        The shorter of the path and its complement is reversed (which gives the same tour for symmetric costs).
+        """
+        pos = self.pos
+        n = len(pos)
+
+        if (pos[c] - pos[b]) % n + 1 > n // 2:
+            b, c = self.succ[c], self.pred[b] # reverse the complement instead
+
+        i = pos[b]
+        length = (pos[c] - i) % n + 1
+        positions = np.arange( i, i+length ) % n
+        segment = self._order[positions]
+
+        a, d = self.pred[b], self.succ[c]
+
+        # inner edges change direction
+        self.succ[segment], self.pred[segment] = self.pred[segment], self.succ[segment].copy()
+
+        # boundary edges
+        if length < n:
+            self.succ[a], self.pred[c] = c, a
+            self.succ[b], self.pred[d] = d, b
+
+        self._order[positions] = segment[::-1]
+        self._pos[segment[::-1]] = positions
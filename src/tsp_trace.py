@@ -0,0 +1,147 @@
+import numpy as np
+import statistics
+import time
+
+# Anytime traces of solver runs.
+#
+# A trace records the incumbent (best-so-far) cost over time: a point (elapsed seconds, evaluations, incumbent cost) is added
+# whenever the incumbent improves, and a last point marks the end of the run.
+# Runs (of different algorithms) can then be compared by their latency instead of their iteration counts:
+# - time-to-target: the first time when the incumbent reaches a target cost;
+# - primal integral: the integral of the primal gap over time (Berthold, 2013),
+#   where the primal gap of cost c w.r.t. a reference cost c* is |c - c*| / max(|c|,|c*|), and it is 1 before the first incumbent.
+
+class Trace:
+    """
+    Anytime trace of a solver run. The clock starts when the solver calls start().
+
+    Attributes
+    ----------
+    points: list[tuple[float,int,float]]
+        Incumbent cost over time as (elapsed seconds, evaluations, incumbent cost) triples.
+    """
+    __slots__ = ( 'points', '_start' )
+
+    def __init__( self ):
+        self.points:list[tuple[float,int,float]] = []
+        self._start:float = time.perf_counter()
+
+    def start( self ) -> None:
+        """ Starts the clock, and clears the points."""
+        self.points = []
+        self._start = time.perf_counter()
+
+    def elapsed( self ) -> float:
+        """ Returns the seconds elapsed since start."""
+        return time.perf_counter() - self._start
+
+    def record( self, evaluations:int, cost:float ) -> None:
+        """ Adds a point, if the cost improves the incumbent."""
+        if not self.points or cost < self.points[-1][2]:
+            self.points.append( ( self.elapsed(), int( evaluations ), float( cost ) ) )
+
+    def finish( self, evaluations:int ) -> None:
+        """ Adds the last point (with the incumbent cost) at the end of the run."""
+        if self.points:
+            self.points.append( ( self.elapsed(), int( evaluations ), self.points[-1][2] ) )
+
+    @property
+    def best( self ) -> float:
+        """ Final incumbent cost (inf, if there is no incumbent)."""
+        return self.points[-1][2] if self.points else float('inf')
+
+    @property
+    def duration( self ) -> float:
+        """ Length of the run in seconds."""
+        return self.points[-1][0] if self.points else 0.0
+
+def _points( trace:Trace|list ) -> list[tuple[float,int,float]]:
+    """
+    Returns the points of a trace (or a history list of (elapsed seconds, evaluations, cost) triples).
+    """
+    return trace.points if isinstance( trace, Trace ) else trace
+
+def time_to_target( trace:Trace|list, target:float ) -> float:
+    """
+    Returns the first time when the incumbent cost is at most the target (None, if the target is not reached).
+    """
+    return next( ( t for (t,_,cost) in _points( trace ) if cost <= target ), None )
+
+def primal_integral( trace:Trace|list, reference:float, horizon:float= None ) -> float:
+    """
+    Returns the primal integral of a run, i.e., the integral of the primal gap (w.r.t. the reference cost) over [0,horizon].
+
+    Args
+    ----
+    trace: Trace | list
+        A trace (or a history list of (elapsed seconds, evaluations, cost) triples).
+    reference: float
+        Reference cost (e.g., the optimum or the best known cost).
+    horizon: float
+        End of the time interval (optional, default: end of the run).
+        After the end of the run, the final incumbent is assumed.
+
+    Returns
+    -------
+    : float
+        Primal integral in seconds (the smaller, the better; it equals the horizon for a run without any incumbent).
+    """
+    points = _points( trace )
+
+    if horizon is None:
+        horizon = points[-1][0] if points else 0.0
+
+    if not points:
+        return horizon
+
+    times = np.clip( np.array( [ t for (t,_,_) in points ] + [ horizon ] ), 0.0, horizon )
+    costs = np.array( [ cost for (_,_,cost) in points ] )
+
+    denominators = np.maximum( np.abs( costs ), abs( reference ) )
+    gaps = np.divide( np.abs( costs - reference ), denominators, out= np.zeros_like( costs ), where= 0 < denominators )
+
+    return float( times[0] + np.dot( gaps, np.diff( times ) ) )
+
+def trace_statistics( traces:list[Trace|list], target:float, reference:float= None, horizon:float= None ) -> dict:
+    """
+    Returns the time-to-target and primal-integral statistics of runs (e.g., of the same algorithm with different seeds).
+
+    Args
+    ----
+    traces: list[Trace|list]
+        Traces of the runs (or history lists of (elapsed seconds, evaluations, cost) triples).
+    target: float
+        Target cost.
+    reference: float
+        Reference cost for the primal integral (optional, default: target).
+    horizon: float
+        End of the time interval of the primal integral (optional, default: end of the longest run).
+
+    Returns
+    -------
+    : dict
+        'runs': number of runs;
+        'success_rate': ratio of the runs reaching the target;
+        'median_ttt': median time-to-target of the successful runs (None, if there is no such run);
+        'ert': expected running time, i.e., the total time spent by the runs until they reach the target (or stop),
+               divided by the number of successful runs (inf, if there is no such run);
+        'primal_integral': mean primal integral of the runs.
+    """
+    points = [ _points( trace ) for trace in traces ]
+
+    if reference is None:
+        reference = target
+
+    if horizon is None:
+        horizon = max( ( p[-1][0] for p in points if p ), default= 0.0 )
+
+    times = [ time_to_target( p, target ) for p in points ]
+    successful = [ t for t in times if t is not None ]
+
+    total_time = sum( t if t is not None else ( p[-1][0] if p else 0.0 ) for (t,p) in zip( times, points ) )
+
+    return { 'runs' : len(points),
+             'success_rate' : len(successful) / len(points) if points else 0.0,
+             'median_ttt' : statistics.median( successful ) if successful else None,
+             'ert' : total_time / len(successful) if successful else float('inf'),
+             'primal_integral' : statistics.fmean( primal_integral( p, reference, horizon ) for p in points ) if points else 0.0 }
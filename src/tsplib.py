@@ -0,0 +1,374 @@
+import numpy as np
+import math
+
+from tsp_matrix import CostMatrix, as_cost_matrix
+
+# Reader and writer of TSPLIB files (Reinelt, 1991): instances ('.tsp', '.atsp') and tours ('.tour').
+#
+# Sections are parsed line by line into preallocated arrays (no networkx graph and no list of tokens is built),
+# and the distances are computed in row chunks with NumPy. The returned CostMatrix can be passed to both the heuristics
+# and the MIP models (which build the graph by CostMatrix.to_graph).
+#
+# Supported edge weight types: EUC_2D, CEIL_2D, ATT, GEO (with TSPLIB rounding) and EXPLICIT
+# (FULL_MATRIX, UPPER_ROW, LOWER_ROW, UPPER_DIAG_ROW, LOWER_DIAG_ROW, and their column-wise counterparts).
+
+EDGE_WEIGHT_TYPES = ( 'EUC_2D', 'CEIL_2D', 'ATT', 'GEO', 'EXPLICIT' )
+
+class TSPLIBInstance( CostMatrix ):
+    """
+    Cost matrix of a TSPLIB instance (see read_tsplib).
+
+    Attributes
+    ----------
+    edge_weight_type: str
+        Edge weight type of the file.
+    display: np.ndarray
+        Display coordinates of an EXPLICIT instance as an (n,2) array, or None.
+        NOTE: They are not stored as 'coords', since they do not define the costs (e.g., for the candidate lists of tsp_neighbors).
+    """
+    edge_weight_type:str = 'EXPLICIT'
+    display:np.ndarray = None
+
+def _read_numbers( file, count:int, dtype:np.dtype= np.float64 ) -> np.ndarray:
+    """
+    Reads the given number of numbers from the following lines of the file (any number of numbers per line).
+    """
+    numbers = np.empty( count, dtype= dtype )
+    filled = 0
+
+    while filled < count:
+        line = file.readline()
+        assert line, f'TSPLIB: unexpected end of file ({filled} of {count} numbers read)!'
+
+        values = line.split()
+        if values and values[0] == 'EOF':
+            break
+
+        values = values[:count-filled]
+        numbers[filled:filled+len(values)] = values
+        filled += len(values)
+
+    assert filled == count, f'TSPLIB: {filled} of {count} numbers read!'
+
+    return numbers
+
+def _geo_radians( coords:np.ndarray ) -> np.ndarray:
+    """
+    Returns the latitudes and longitudes (given in DDD.MM format) in radians as defined by TSPLIB.
+    """
+    degrees = np.trunc( coords )
+    return 3.141592 * (degrees + 5.0 * (coords - degrees) / 3.0) / 180.0
+
+def tsplib_metric( edge_weight_type:str ):
+    """
+    Returns the distance function (of two broadcastable coordinate arrays) of the edge weight type as defined by TSPLIB
+    (rounded to integers): 'EUC_2D' (rounded Euclidean), 'CEIL_2D' (Euclidean rounded up), 'ATT' (pseudo-Euclidean), or 'GEO' (geographical).
+    """
+    assert edge_weight_type in ( 'EUC_2D', 'CEIL_2D', 'ATT', 'GEO' ), f'unsupported edge weight type: {edge_weight_type}'
+
+    def metric( a:np.ndarray, b:np.ndarray ) -> np.ndarray:
+        if edge_weight_type == 'GEO':
+            a, b = _geo_radians( a ), _geo_radians( b )
+
+            q1 = np.cos( a[...,1] - b[...,1] )
+            q2 = np.cos( a[...,0] - b[...,0] )
+            q3 = np.cos( a[...,0] + b[...,0] )
+            distances = np.trunc( 6378.388 * np.arccos( np.clip( 0.5 * ((1.0+q1)*q2 - (1.0-q1)*q3), -1.0, 1.0 ) ) + 1.0 )
+
+            return np.where( (a == b).all( axis= -1 ), 0.0, distances )
+
+        diff = a - b
+        squares = np.einsum( '...k,...k->...', diff, diff )
+
+        if edge_weight_type == 'ATT':
+            r = np.sqrt( squares / 10.0 )
+            t = np.floor( r + 0.5 )
+            return np.where( t < r, t + 1.0, t )
+
+        if edge_weight_type == 'CEIL_2D':
+            return np.ceil( np.sqrt( squares ) )
+
+        return np.floor( np.sqrt( squares ) + 0.5 )
+
+    return metric
+
+def tsplib_distances( coords:np.ndarray, edge_weight_type:str, dtype:np.dtype= np.float64, chunk_size:int= 1024 ) -> np.ndarray:
+    """
+    Returns the matrix of pairwise distances of the given points as defined by TSPLIB (see tsplib_metric).
+    Distances are computed by NumPy broadcasting in row chunks to keep temporary arrays small.
+
+    Args
+    ----
+    coords: np.ndarray
+        Coordinates of the points as an (n,2) array.
+    edge_weight_type: str
+        'EUC_2D', 'CEIL_2D', 'ATT', or 'GEO'.
+    dtype: np.dtype
+        Data type of the matrix.
+    chunk_size: int
+        Number of rows computed at once.
+
+    Returns
+    -------
+    matrix: np.ndarray
+        An (n,n) distance matrix.
+    """
+    metric = tsplib_metric( edge_weight_type )
+
+    n = len(coords)
+    matrix = np.empty( (n,n), dtype= dtype )
+
+    for start in range(0,n,chunk_size):
+        matrix[start:start+chunk_size] = metric( coords[start:start+chunk_size,None,:], coords[None,:,:] )
+
+    return matrix
+
+def _explicit_matrix( weights:np.ndarray, n:int, edge_weight_format:str, dtype:np.dtype ) -> np.ndarray:
+    """
+    Returns the (n,n) matrix of the weights given in the edge weight format.
+    """
+    # column-wise formats are the transposes of the row-wise ones
+    edge_weight_format = { 'UPPER_COL' : 'LOWER_ROW', 'LOWER_COL' : 'UPPER_ROW',
+                           'UPPER_DIAG_COL' : 'LOWER_DIAG_ROW', 'LOWER_DIAG_COL' : 'UPPER_DIAG_ROW' }.get( edge_weight_format, edge_weight_format )
+
+    if edge_weight_format == 'FULL_MATRIX':
+        return weights.reshape( n, n ).astype( dtype, copy= False )
+
+    matrix = np.zeros( (n,n), dtype= dtype )
+
+    if edge_weight_format == 'UPPER_ROW':
+        rows, cols = np.triu_indices( n, 1 )
+    elif edge_weight_format == 'LOWER_ROW':
+        rows, cols = np.tril_indices( n, -1 )
+    elif edge_weight_format == 'UPPER_DIAG_ROW':
+        rows, cols = np.triu_indices( n )
+    elif edge_weight_format == 'LOWER_DIAG_ROW':
+        rows, cols = np.tril_indices( n )
+    else:
+        raise ValueError( f'unsupported edge weight format: {edge_weight_format}' )
+
+    matrix[rows,cols] = weights
+    matrix[cols,rows] = weights
+
+    return matrix
+
+def _weight_count( n:int, edge_weight_format:str ) -> int:
+    """
+    Returns the number of weights in the EDGE_WEIGHT_SECTION.
+    """
+    if edge_weight_format == 'FULL_MATRIX':
+        return n * n
+
+    return n * (n-1) // 2 + ( n if 'DIAG' in edge_weight_format else 0 )
+
+def read_tsplib( path:str, dtype:np.dtype= np.float64, storage:str= 'dense', matrix_path:str= None ) -> CostMatrix:
+    """
+    Reads a TSP (or ATSP) instance from a TSPLIB file.
+
+    Args
+    ----
+    path: str
+        Path of the file.
+    dtype: np.dtype
+        Data type of the matrix (e.g., np.float32, np.float64, or an integer type).
+    storage: str
+        Storage of the matrix for coordinate-based instances: 'dense', 'memmap', or 'coordinates' (see CostMatrix.from_coordinates).
+    matrix_path: str
+        Path of the file of the memory-mapped matrix (optional, default: a temporary file).
+
+    Returns
+    -------
+    : TSPLIBInstance
+        Cost matrix of the instance, where the nodes are the node numbers of the file (1,...,n),
+        and the coordinates are the node coordinates, if any (the display data of an EXPLICIT instance is stored as 'display').
+    """
+    specification = {}
+    coords, nodes, weights = None, None, None
+
+    with open( path ) as file:
+        while True:
+            line = file.readline()
+            if not line or line.strip() == 'EOF':
+                break
+
+            line = line.strip()
+            if not line:
+                continue
+
+            section = line.split( ':', 1 )[0].strip().upper()
+
+            # specification part
+            if not section.endswith( '_SECTION' ):
+                key, value = line.split( ':', 1 )
+                specification[key.strip().upper()] = value.strip()
+                continue
+
+            # data part
+            n = int( specification['DIMENSION'] )
+
+            if section in ( 'NODE_COORD_SECTION', 'DISPLAY_DATA_SECTION' ):
+                assert specification.get( 'NODE_COORD_TYPE', 'TWOD_COORDS' ) != 'THREED_COORDS', 'TSPLIB: 3-D coordinates are not supported!'
+
+                data = _read_numbers( file, 3*n ).reshape( n, 3 )
+                nodes = data[:,0].astype( np.int64 ).tolist()
+                coords = data[:,1:]
+            elif section == 'EDGE_WEIGHT_SECTION':
+                weights = _read_numbers( file, _weight_count( n, specification.get( 'EDGE_WEIGHT_FORMAT', 'FULL_MATRIX' ) ) )
+            elif section == 'FIXED_EDGES_SECTION':
+                while True: # NOTE: fixed edges are skipped
+                    line = file.readline()
+                    if not line:
+                        break
+
+                    values = line.split()
+                    if values and values[0] in ( '-1', 'EOF' ):
+                        break
+            else:
+                raise ValueError( f'TSPLIB: unsupported section: {section}' )
+
+    n = int( specification['DIMENSION'] )
+    edge_weight_type = specification.get( 'EDGE_WEIGHT_TYPE', 'EXPLICIT' )
+
+    assert edge_weight_type in EDGE_WEIGHT_TYPES, f'unsupported edge weight type: {edge_weight_type}'
+
+    display = None
+
+    if edge_weight_type == 'EXPLICIT':
+        assert weights is not None, 'TSPLIB: EDGE_WEIGHT_SECTION is missing!'
+        matrix = _explicit_matrix( weights, n, specification.get( 'EDGE_WEIGHT_FORMAT', 'FULL_MATRIX' ), dtype )
+        display, coords = coords, None
+    else:
+        assert coords is not None, 'TSPLIB: NODE_COORD_SECTION is missing!'
+
+    if edge_weight_type != 'EXPLICIT' and storage != 'dense':
+        instance = TSPLIBInstance.from_coordinates( coords, nodes, dtype= dtype, storage= storage, path= matrix_path, metric= tsplib_metric( edge_weight_type ) )
+    else:
+        if edge_weight_type != 'EXPLICIT':
+            matrix = tsplib_distances( coords, edge_weight_type, dtype= dtype )
+
+        instance = TSPLIBInstance( matrix, nodes if nodes is not None else list(range(1,n+1)), coords )
+
+    instance.edge_weight_type = edge_weight_type
+    instance.display = display
+
+    return instance
+
+def write_tsplib( path:str, instance, name:str= 'instance', edge_weight_type:str= None, comment:str= None ) -> None:
+    """
+    Writes a TSP instance to a TSPLIB file.
+
+    Args
+    ----
+    path: str
+        Path of the file.
+    instance: nx.DiGraph | CostMatrix
+        A networkx digraph (with 'cost' edge attributes) or its cost matrix.
+    name: str
+        Name of the instance.
+    edge_weight_type: str
+        'EUC_2D', 'CEIL_2D', 'ATT', 'GEO' (the coordinates are written), or 'EXPLICIT' (the full matrix is written)
+        (optional, default: the edge weight type of a TSPLIBInstance, otherwise 'EXPLICIT', since the costs
+        are not necessarily given by a TSPLIB metric of the coordinates, e.g., unrounded Euclidean distances).
+    comment: str
+        Comment (optional).
+    """
+    costs = as_cost_matrix( instance )
+    n = len(costs)
+
+    if edge_weight_type is None:
+        edge_weight_type = costs.edge_weight_type if isinstance( costs, TSPLIBInstance ) else 'EXPLICIT'
+
+    assert edge_weight_type in EDGE_WEIGHT_TYPES, f'unsupported edge weight type: {edge_weight_type}'
+    assert edge_weight_type == 'EXPLICIT' or costs.coords is not None, 'coordinates are needed!'
+
+    with open( path, 'w' ) as file:
+        file.write( f'NAME : {name}\n' )
+        if comment is not None:
+            file.write( f'COMMENT : {comment}\n' )
+        file.write( f'TYPE : TSP\n' )
+        file.write( f'DIMENSION : {n}\n' )
+        file.write( f'EDGE_WEIGHT_TYPE : {edge_weight_type}\n' )
+
+        if edge_weight_type == 'EXPLICIT':
+            display = costs.display if isinstance( costs, TSPLIBInstance ) else None
+
+            file.write( 'EDGE_WEIGHT_FORMAT : FULL_MATRIX\n' )
+            if display is not None:
+                file.write( 'DISPLAY_DATA_TYPE : TWOD_DISPLAY\n' )
+            file.write( 'EDGE_WEIGHT_SECTION\n' )
+            for row in costs.matrix:
+                file.write( ' '.join( map( _format_number, row.tolist() ) ) + '\n' )
+
+            if display is not None:
+                file.write( 'DISPLAY_DATA_SECTION\n' )
+                for i, (x,y) in enumerate( display.tolist() ):
+                    file.write( f'{i+1} {_format_number(x)} {_format_number(y)}\n' )
+        else:
+            file.write( 'NODE_COORD_SECTION\n' )
+            for i, (x,y) in enumerate( costs.coords.tolist() ):
+                file.write( f'{i+1} {_format_number(x)} {_format_number(y)}\n' )
+
+        file.write( 'EOF\n' )
+
+def _format_number( value:float ) -> str:
+    """
+    Returns the number as an integer, if it is integral.
+    """
+    return str( int(value) ) if math.isfinite( value ) and value == int(value) else repr( value )
+
+def read_tour( path:str ) -> list[int]:
+    """
+    Reads a tour from a TSPLIB tour file.
+
+    Args
+    ----
+    path: str
+        Path of the file.
+
+    Returns
+    -------
+    : list[int]
+        The tour as a sequence of node numbers (as in the instance file).
+    """
+    tour = []
+
+    with open( path ) as file:
+        for line in file:
+            if line.strip().upper() == 'TOUR_SECTION':
+                break
+
+        for line in file:
+            values = line.split()
+
+            if 'EOF' in values or '-1' in values:
+                tour.extend( int(value) for value in values[:values.index( 'EOF' if 'EOF' in values else '-1' )] )
+                break
+
+            tour.extend( int(value) for value in values )
+
+    return tour
+
+def write_tour( path:str, tour:list[int], name:str= 'tour', comment:str= None ) -> None:
+    """
+    Writes a tour to a TSPLIB tour file.
+
+    Args
+    ----
+    path: str
+        Path of the file.
+    tour: list[int]
+        The tour as a sequence of node numbers (as in the instance file, e.g., the solution of a solver for read_tsplib(...)).
+    name: str
+        Name of the tour.
+    comment: str
+        Comment, e.g., the length of the tour (optional).
+    """
+    with open( path, 'w' ) as file:
+        file.write( f'NAME : {name}\n' )
+        if comment is not None:
+            file.write( f'COMMENT : {comment}\n' )
+        file.write( 'TYPE : TOUR\n' )
+        file.write( f'DIMENSION : {len(tour)}\n' )
+        file.write( 'TOUR_SECTION\n' )
+        file.writelines( f'{node}\n' for node in tour )
+        file.write( '-1\nEOF\n' )